@@ -140,17 +140,12 @@ hr {
 </style>
 """, unsafe_allow_html=True)
 
-# DB 자동 빌드 (최초 실행 또는 재시작 후 DB 없을 때)
-from utils.db import ensure_db, DB_PATH
-if not os.path.exists(DB_PATH):
-    with st.spinner("데이터베이스를 처음 구축하는 중입니다... (수 분 소요)"):
-        try:
-            ensure_db()
-            st.success("데이터베이스 구축 완료!")
-            st.rerun()
-        except Exception as e:
-            st.error(f"DB 빌드 실패: {e}")
-            st.stop()
+# DB 준비 — 스냅샷이 있으면 바로 풀고, 없으면 백그라운드 빌드를 띄운 뒤 홈 화면은 그대로 보여준다
+from utils.bootstrap import ensure_db, render_build_status, start_warm_up
+if ensure_db():
+    start_warm_up()
+else:
+    render_build_status()
 
 st.markdown("""
 <div style="text-align:center; padding: 2rem 0 1rem 0;">
@@ -2,16 +2,21 @@ import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import streamlit as st
-import pandas as pd
-import folium
-from folium.plugins import FastMarkerCluster
-from streamlit_folium import st_folium
+
+from utils.db import (
+    get_conn, get_db_version, get_item_by_id, get_item_text,
+    get_items_with_lat_lng, get_category_stats, count_items_without_coords, get_regions, get_region_tree,
+    get_items_in_box, get_density_grid,
+)
+from utils.density import cell_for_zoom
 
 st.set_page_config(page_title="지도시각화", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
 from utils.style import inject_css, page_title
 inject_css()
-
-DATA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'items_설화.csv'))
+require_db()
+start_page(__file__)
 
 CATEGORY_COLORS = {
     "설화": "#3B82F6",
@@ -21,33 +26,37 @@ CATEGORY_COLORS = {
 }
 
 # ── 데이터 로드 ────────────────────────────────────────────────────────────────
-@st.cache_data
-def load_data():
-    df = pd.read_csv(DATA_PATH, dtype=str)
-    df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
-    df['lng'] = pd.to_numeric(df['lng'], errors='coerce')
-    return df
+# 기여 승격 등으로 DB가 바뀌면 db_version 이 달라져 캐시가 자동으로 갱신된다
+conn = get_conn()
+db_version = get_db_version(conn)
+
+DEFAULT_VIEW = {'center': {'lat': 36.5, 'lng': 127.5}, 'zoom': 6}
+BOX_LIMIT = 5000   # 확대했을 때 보이는 범위에서 그릴 점 수 상한
+
+def marker_rows(items):
+    """FastMarkerCluster용 [lat, lng, color, title, id] 리스트"""
+    return [
+        [r['lat'], r['lng'], CATEGORY_COLORS.get(r['category'] or '', '#888888'),
+         str(r['title'] or '(제목 없음)'), str(r['id'])]
+        for r in items
+    ]
 
 @st.cache_data
-def prepare_map_rows(cats: tuple):
-    """FastMarkerCluster용 [lat, lng, color, title, id] 리스트 — 캐싱"""
-    sub = df[df['category'].isin(cats)].dropna(subset=['lat', 'lng'])
-    rows = []
-    for _, r in sub.iterrows():
-        color = CATEGORY_COLORS.get(r.get('category', ''), '#888888')
-        rows.append([
-            r['lat'], r['lng'], color,
-            str(r.get('title', '(제목 없음)')),
-            str(r.get('id', '')),
-        ])
-    return rows
+def prepare_map_rows(cats: tuple, region_code, db_version):
+    """지역을 골랐을 때 그 지역 전체의 점 — 캐싱"""
+    return marker_rows(get_items_with_lat_lng(conn, list(cats), region_code))
 
 @st.cache_data
-def build_coord_list(cats: tuple):
-    """클릭 매칭용 (lat, lng, id) 튜플 리스트 — 캐싱"""
-    return [(row[0], row[1], row[4]) for row in prepare_map_rows(cats)]
+def density_layer(layer, values: tuple, cell, db_version):
+    """HeatMap용 [lat, lng, 가중치(0–1)] — 빌드 때 계산된 격자 칸이라 자료 수와 무관하게 가볍다"""
+    cells = get_density_grid(conn, layer, cell, list(values))
+    top = max((r['n'] for r in cells), default=1)
+    return [[r['lat'], r['lng'], r['n'] / top] for r in cells]
 
-df = load_data()
+@st.cache_data
+def region_options(db_version):
+    """지역 선택지 {code: 표시 이름} — 권역 아래 시도를 들여 쓴다"""
+    return {code: f"{'└ ' if level else ''}{name}" for code, name, level in get_region_tree(conn)}
 
 # ── 사이드바: 카테고리 필터 ────────────────────────────────────────────────────
 st.sidebar.header("카테고리 필터")
@@ -56,23 +65,63 @@ for cat, color in CATEGORY_COLORS.items():
     if st.sidebar.checkbox(cat, value=True, key=f"cat_{cat}"):
         selected_cats.append(cat)
 
+# ── 사이드바: 지역 필터 — 권역·시도·시군 코드 범위로 거른다 (utils/regions) ────────
+st.sidebar.header("지역 필터")
+regions = region_options(db_version)
+region_code = st.sidebar.selectbox("권역 · 시도", [""] + list(regions),
+                                   format_func=lambda c: regions.get(c, "전체"))
+if len(region_code) == 3:
+    districts = {r['code']: r['name'] for r in get_regions(conn, region_code)}
+    district_code = st.sidebar.selectbox("시군", [""] + list(districts),
+                                         format_func=lambda c: districts.get(c, "전체"))
+    region_code = district_code or region_code
+
+st.sidebar.header("밀도 레이어")
+show_places = st.sidebar.checkbox("서사 지명 밀도 겹쳐 보기", value=False,
+                                  help="전국·광역 단위로 볼 때 이야기 속 배경 지명의 분포를 함께 그립니다.")
+
 # ── 레이아웃 ──────────────────────────────────────────────────────────────────
 page_title("탐색", "지도시각화")
 
 map_col, info_col = st.columns([7, 3])
 
 # ── 데이터 필터링 ──────────────────────────────────────────────────────────────
+# 직전 지도 상태(확대 단계·보이는 범위)는 st_folium 의 반환값이 key 로 세션에 남아 있다.
+# 지역을 고르지 않았으면 낮은 확대 단계에서는 밀도 격자 열지도, 확대하면 보이는 범위의 점만 그린다.
+view = st.session_state.get("main_map") or {}
+zoom = view.get('zoom') or DEFAULT_VIEW['zoom']
+center = view.get('center') or DEFAULT_VIEW['center']
+cell = None if region_code else cell_for_zoom(zoom)
+
+map_rows, heat_sites, heat_places = [], [], []
 if selected_cats:
-    filtered = df[df['category'].isin(selected_cats)]
+    with section("조회"):
+        if region_code:
+            map_rows = prepare_map_rows(tuple(selected_cats), region_code, db_version)
+            no_coords = count_items_without_coords(conn, selected_cats, region_code)
+            total = no_coords + len(map_rows)
+        else:
+            if cell:
+                heat_sites = density_layer('site', tuple(selected_cats), cell, db_version)
+            elif view.get('bounds'):
+                sw, ne = view['bounds']['_southWest'], view['bounds']['_northEast']
+                map_rows = marker_rows(get_items_in_box(
+                    conn, sw['lat'], sw['lng'], ne['lat'], ne['lng'], selected_cats, limit=BOX_LIMIT))
+            # 지역을 고르지 않으면 좌표 누락 건수는 빌드 때 계산된 stats_category 에서 읽는다
+            cat_stats = get_category_stats(conn, selected_cats)
+            total = sum(r['n_items'] for r in cat_stats)
+            no_coords = total - sum(r['n_with_coords'] for r in cat_stats)
 else:
-    filtered = df.iloc[0:0]
-
-total = len(filtered)
-no_coords = filtered[filtered['lat'].isna() | filtered['lng'].isna()]
-has_coords = filtered.dropna(subset=['lat', 'lng'])
+    total, no_coords = 0, 0
+if show_places and cell:
+    heat_places = density_layer('place', ('',), cell, db_version)
 
-if len(no_coords) > 0:
-    st.info(f"좌표 정보 없어 지도에서 제외된 자료: {len(no_coords)}건 (전체 {total}건 중)")
+if no_coords > 0:
+    st.info(f"좌표 정보 없어 지도에서 제외된 자료: {no_coords}건 (전체 {total}건 중)")
+if cell:
+    st.caption("전국·광역 단위에서는 자료 밀도를 열지도로 보여 줍니다. 확대하면 개별 자료가 나타납니다.")
+elif len(map_rows) >= BOX_LIMIT:
+    st.caption(f"보이는 범위의 자료 중 {BOX_LIMIT:,}건만 표시합니다. 더 확대해 보세요.")
 
 # ── 지도 생성 ──────────────────────────────────────────────────────────────────
 
@@ -93,14 +142,29 @@ function(row) {
 """
 
 with map_col:
-    m = folium.Map(location=[36.5, 127.5], zoom_start=6, tiles="CartoDB positron")
-
-    if selected_cats:
-        map_rows = prepare_map_rows(tuple(selected_cats))
+    # folium 은 제목·사이드바를 먼저 그린 뒤 불러온다 (첫 화면이 import 를 기다리지 않도록)
+    import folium
+    from folium.plugins import FastMarkerCluster, HeatMap
+    from streamlit_folium import st_folium
+
+    with section("지도 생성"):
+        # 다시 그려도 보던 위치·확대 단계를 유지한다. 지역을 새로 고르면 그 지역에 맞춘다
+        m = folium.Map(location=[center['lat'], center['lng']], zoom_start=zoom, tiles="CartoDB positron")
+        if region_code and map_rows and st.session_state.get('map_region') != region_code:
+            m.fit_bounds([[min(r[0] for r in map_rows), min(r[1] for r in map_rows)],
+                          [max(r[0] for r in map_rows), max(r[1] for r in map_rows)]])
+        st.session_state['map_region'] = region_code
+        if heat_sites:
+            HeatMap(heat_sites, name="채록지 밀도", radius=25, blur=18, min_opacity=0.25).add_to(m)
+        if heat_places:
+            HeatMap(heat_places, name="서사 지명 밀도", radius=25, blur=18, min_opacity=0.25,
+                    gradient={0.4: '#FDE68A', 0.7: '#F97316', 1.0: '#B91C1C'}).add_to(m)
         if map_rows:
             FastMarkerCluster(data=map_rows, callback=MARKER_CALLBACK).add_to(m)
 
-    map_data = st_folium(m, width="100%", height=600, returned_objects=["last_object_clicked"])
+    with section("st_folium 렌더링"):
+        map_data = st_folium(m, width="100%", height=600, key="main_map",
+                             returned_objects=["last_object_clicked", "zoom", "center", "bounds"])
 
 # ── 클릭 이벤트 처리 ──────────────────────────────────────────────────────────
 # FastMarkerCluster는 JS 콜백 마커라 last_object_clicked_popup이 동작하지 않음
@@ -108,11 +172,10 @@ with map_col:
 clicked = map_data.get("last_object_clicked") if map_data else None
 if clicked and clicked.get("lat") is not None and clicked.get("lng") is not None:
     clat, clng = clicked["lat"], clicked["lng"]
-    if selected_cats:
-        coord_list = build_coord_list(tuple(selected_cats))
+    if map_rows:
         threshold = 0.01 ** 2  # 0.01도² ≈ 1km 이내
         best_id, best_d2 = None, threshold
-        for lat, lng, item_id in coord_list:
+        for lat, lng, _, _, item_id in map_rows:
             d2 = (lat - clat) ** 2 + (lng - clng) ** 2
             if d2 < best_d2:
                 best_d2 = d2
@@ -126,11 +189,11 @@ with info_col:
     if not selected_id:
         st.info("지도에서 자료를 클릭하세요")
     else:
-        row = df[df['id'] == selected_id]
-        if row.empty:
+        row = get_item_by_id(conn, selected_id)
+        if not row:
             st.warning("선택된 자료를 찾을 수 없습니다.")
         else:
-            r = row.iloc[0]
+            r = dict(row)
             cat = r.get('category', '')
             color = CATEGORY_COLORS.get(cat, '#888888')
 
@@ -152,11 +215,12 @@ with info_col:
             st.markdown(f"**조사자** {r.get('collectors', '-')}")
             st.markdown(f"**제보자** {r.get('narrator', '-')}")
 
-            context = str(r.get('context', '') or '')
+            text = get_item_text(conn, selected_id)
+            context = text['context']
             if context:
                 st.markdown(f"**구연 상황** {context}")
 
-            content = str(r.get('content', '') or '')
+            content = text['content']
             if content:
                 st.markdown("**본문 미리보기**")
                 if len(content) > 200:
@@ -167,3 +231,6 @@ with info_col:
                     st.write(content)
             else:
                 st.caption("본문 전사 없음")
+
+render_debug_panel()
+conn.close()
@@ -2,30 +2,50 @@ import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import streamlit as st
-from dotenv import load_dotenv
-import anthropic
-
-import folium
-from streamlit_folium import st_folium
 
+from utils.llm import (
+    ANSWER_OUTPUT_RATIO, MODEL, TRANSCRIPT_TOKEN_BUDGET, get_api_key, get_client, output_budget,
+)
 from utils.db import (
-    get_conn, get_item_by_id, search_items_by_title, search_items_by_motif,
-    get_all_motifs, get_motifs_for_item, get_atu_types_for_item,
+    get_conn, get_db_version, get_item_by_id, get_item_text, get_item_llm_text,
+    search_items_by_title, search_items_by_motif,
+    search_motifs, count_motifs, get_motifs_for_item, get_atu_types_for_item,
     get_subjects_for_item, get_narrative_units, get_item_meta,
     get_similar_items_by_motif, get_places_for_item,
+    count_motif_range, get_motif_blocks, get_motifs_in_range, search_items_by_motif_range,
 )
+from utils.motif_codes import THOMPSON_CHAPTERS, motif_code_range
 
-load_dotenv()
 st.set_page_config(page_title="모티프탐색 & 이본 대조", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
 from utils.style import inject_css, page_title, ICONS
 inject_css()
 page_title("이해", "모티프탐색 & 이본 대조")
+require_db()
+start_page(__file__)
 
 conn = get_conn()
+db_version = get_db_version(conn)
+
+MOTIF_PAGE_SIZE = 20
+
+
+# 모티프 찾기 결과는 질의·커서·db_version 별로 캐싱 — 다시 그릴 때마다 모티프 전체를 읽지 않는다
+@st.cache_data
+def find_motifs(query, cursor, db_version):
+    rows, next_cursor = search_motifs(conn, query, cursor=cursor, limit=MOTIF_PAGE_SIZE)
+    return [(r['motif_code'], r['motif_name'], r['n_items']) for r in rows], next_cursor
+
+
+@st.cache_data
+def count_found_motifs(query, db_version):
+    return count_motifs(conn, query)
+
 
 # ── 설화 선택 ─────────────────────────────────────────────────────────────────
 st.subheader("설화 선택")
-search_mode = st.radio("검색 방법", ["제목 검색", "모티프로 검색"], horizontal=True)
+search_mode = st.radio("검색 방법", ["제목 검색", "모티프로 검색", "모티프 코드 범위"], horizontal=True)
 
 if search_mode == "제목 검색":
     keyword = st.text_input("제목 검색", placeholder="제목 키워드 입력")
@@ -33,10 +53,58 @@ if search_mode == "제목 검색":
         results = search_items_by_title(conn, keyword)
     else:
         results = []
+elif search_mode == "모티프 코드 범위":
+    code_query = st.text_input(
+        "Thompson 코드 범위", placeholder="D · D17xx · D1700-D1799 · D1711 (하위 코드 포함)"
+    )
+    results = []
+    if code_query and motif_code_range(code_query) is None:
+        st.warning("알아볼 수 없는 코드 범위입니다. 예: D, D17xx, D1700-D1799, D1711")
+    elif code_query:
+        n_motifs, n_items = count_motif_range(conn, code_query)
+        chapter = THOMPSON_CHAPTERS.get(code_query.strip().upper()[:1], '')
+        st.caption(f"{chapter + ' · ' if chapter else ''}모티프 {n_motifs}개 · 설화 {n_items}편")
+        if len(code_query.strip()) == 1:
+            blocks = get_motif_blocks(conn, code_query)
+            if blocks:
+                with st.expander("번호 구간별 분포", expanded=False):
+                    st.dataframe(
+                        [{'구간': b['block'], '모티프': b['n_motifs'], '설화': b['n_items']} for b in blocks],
+                        use_container_width=True, hide_index=True,
+                    )
+        in_range = get_motifs_in_range(conn, code_query)
+        if in_range:
+            with st.expander(f"범위 안 모티프 ({len(in_range)}{'+' if len(in_range) >= 200 else ''})", expanded=False):
+                st.dataframe(
+                    [{'코드': m['motif_code'], '모티프': m['motif_name'], '설화': m['n_items']} for m in in_range],
+                    use_container_width=True, hide_index=True,
+                )
+        results = search_items_by_motif_range(conn, code_query)
 else:
-    motifs = get_all_motifs(conn)
-    motif_options = {f"{m['motif_code']} - {m['motif_name']}": m['motif_code'] for m in motifs}
+    motif_query = st.text_input("모티프 찾기", placeholder="코드 앞부분 또는 이름 (예: D17, 도술)").strip()
+    # 질의가 바뀌면 첫 페이지로 — 커서 스택으로 이전 페이지 이동 지원
+    if st.session_state.get('motif_query') != motif_query:
+        st.session_state['motif_query'] = motif_query
+        st.session_state['motif_cursors'] = [None]
+    motif_cursors = st.session_state['motif_cursors']
+
+    motifs, next_motif_cursor = find_motifs(motif_query, motif_cursors[-1], db_version)
+    st.caption(f"모티프 {count_found_motifs(motif_query, db_version)}개 · 설화 많은 순")
+    motif_options = {f"{code} {name} ({n}편)": code for code, name, n in motifs}
     selected_motif_label = st.selectbox("모티프 선택", [""] + list(motif_options.keys()))
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if len(motif_cursors) > 1 and st.button("← 이전", key="motif_prev"):
+            motif_cursors.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"{len(motif_cursors)} 페이지")
+    with next_col:
+        if next_motif_cursor and st.button("다음 →", key="motif_next"):
+            motif_cursors.append(next_motif_cursor)
+            st.rerun()
+
     if selected_motif_label:
         results = search_items_by_motif(conn, motif_options[selected_motif_label])
     else:
@@ -101,11 +169,11 @@ with badge_col:
         st.markdown("**주제어**")
         st.write(", ".join(s['subject'] for s in subjects))
 
-# 본문
-content = item.get('content', '') or ''
-if content:
+# 본문 — 있는지는 content_len 으로 알고, 전사본은 펼쳐서 켰을 때만 읽어 압축을 푼다
+if item['content_len']:
     with st.expander("본문 전문 보기", expanded=False):
-        st.write(content)
+        if st.toggle("전사본 불러오기", key=f"full_text_{focus_id}"):
+            st.write(get_item_text(conn, focus_id)['content'])
 
 # 서사 단락
 if narrative_units:
@@ -131,30 +199,35 @@ if has_collect or geo_places:
     for p in geo_places:
         all_lats.append(p['lat']); all_lngs.append(p['lng'])
 
-    center = [sum(all_lats) / len(all_lats), sum(all_lngs) / len(all_lngs)]
-    m = folium.Map(location=center, zoom_start=7, tiles="CartoDB positron")
+    # 지도는 지명 좌표가 있을 때만 그리므로 folium 도 이때 불러온다
+    import folium
+    from streamlit_folium import st_folium
 
-    if has_collect:
-        folium.CircleMarker(
-            location=[item['lat'], item['lng']],
-            radius=8, color="#1D4ED8", fill=True, fill_color="#3B82F6", fill_opacity=0.85,
-            tooltip=f"채록지: {item.get('location') or item.get('district') or ''}",
-        ).add_to(m)
+    with section("지도 생성"):
+        center = [sum(all_lats) / len(all_lats), sum(all_lngs) / len(all_lngs)]
+        m = folium.Map(location=center, zoom_start=7, tiles="CartoDB positron")
 
-    for p in geo_places:
-        folium.Marker(
-            location=[p['lat'], p['lng']],
-            icon=folium.DivIcon(html=(
-                '<div style="font-size:18px;line-height:1;margin-top:-9px;margin-left:-9px">'
-                '▲</div>'
-            ), icon_size=(18, 18), icon_anchor=(9, 9)),
-            tooltip=f"{ICONS['지명']} {p['place_name']}",
-        ).add_to(m)
         if has_collect:
-            folium.PolyLine(
-                locations=[[item['lat'], item['lng']], [p['lat'], p['lng']]],
-                color="#8B1A1A", weight=1.5, dash_array="6 4", opacity=0.5,
+            folium.CircleMarker(
+                location=[item['lat'], item['lng']],
+                radius=8, color="#1D4ED8", fill=True, fill_color="#3B82F6", fill_opacity=0.85,
+                tooltip=f"채록지: {item.get('location') or item.get('district') or ''}",
+            ).add_to(m)
+
+        for p in geo_places:
+            folium.Marker(
+                location=[p['lat'], p['lng']],
+                icon=folium.DivIcon(html=(
+                    '<div style="font-size:18px;line-height:1;margin-top:-9px;margin-left:-9px">'
+                    '▲</div>'
+                ), icon_size=(18, 18), icon_anchor=(9, 9)),
+                tooltip=f"{ICONS['지명']} {p['place_name']}",
             ).add_to(m)
+            if has_collect:
+                folium.PolyLine(
+                    locations=[[item['lat'], item['lng']], [p['lat'], p['lng']]],
+                    color="#8B1A1A", weight=1.5, dash_array="6 4", opacity=0.5,
+                ).add_to(m)
 
     legend_html = (
         '<div style="font-size:0.8rem;color:#4A2010;margin-top:0.3rem;">'
@@ -163,7 +236,8 @@ if has_collect or geo_places:
         '</div>'
     )
     st.markdown(legend_html, unsafe_allow_html=True)
-    st_folium(m, width="100%", height=320, returned_objects=[])
+    with section("st_folium 렌더링"):
+        st_folium(m, width="100%", height=320, returned_objects=[])
 
     if geo_places:
         with st.expander(f"서사 지명 목록 ({len(geo_places)}건 좌표 확인)"):
@@ -222,7 +296,7 @@ if len(compare_ids) == 2:
             for i, u in enumerate(nu1, 1):
                 st.info(f"**{i}.** {u}")
         else:
-            st.write(item1.get('content', '본문 없음')[:500])
+            st.write(get_item_text(conn, c1, max_chars=500)['content'] or '본문 없음')
     with rcol:
         st.markdown(f"**{item2.get('title',c2)}**")
         st.caption(f"{item2.get('region','')} {item2.get('district','')}")
@@ -230,7 +304,7 @@ if len(compare_ids) == 2:
             for i, u in enumerate(nu2, 1):
                 st.info(f"**{i}.** {u}")
         else:
-            st.write(item2.get('content', '본문 없음')[:500])
+            st.write(get_item_text(conn, c2, max_chars=500)['content'] or '본문 없음')
 
 # ── LLM Q&A ──────────────────────────────────────────────────────────────────
 st.divider()
@@ -238,7 +312,7 @@ st.markdown(f"""<div style="display:flex;align-items:center;gap:0.5rem;margin:1r
   {ICONS['AI']}<span style="font-size:1.1rem;font-weight:700;color:#4A2010;">AI 질의응답</span>
 </div>""", unsafe_allow_html=True)
 
-if not content:
+if not item['content_len']:
     st.warning("본문 전사가 없는 자료입니다. Q&A 기능을 사용할 수 없습니다.")
 else:
     if 'qa_history' not in st.session_state:
@@ -252,37 +326,41 @@ else:
 
     question = st.chat_input("이 설화에 대해 질문하세요")
     if question:
-        api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+        api_key = get_api_key()
         if not api_key:
             st.error(".env 파일에 ANTHROPIC_API_KEY를 설정하세요.")
         else:
             nu_text = "\n".join(f"{i+1}. {u}" for i, u in enumerate(narrative_units))
+            llm_text = get_item_llm_text(conn, focus_id, max_tokens=TRANSCRIPT_TOKEN_BUDGET)
+            transcript = llm_text['text']
             system_prompt = f"""당신은 한국 구비문학 전문 연구 보조 AI입니다.
 아래 설화 전사본을 바탕으로 사용자의 질문에 답하세요.
 추측이나 외부 지식보다 본문 근거를 우선하세요.
 
 [설화 제목]: {item['title']}
-[전사본]: {content}
+[전사본]: {transcript}
 [서사 단락]: {nu_text}"""
 
             with st.chat_message("user"):
                 st.write(question)
 
             with st.chat_message("assistant"):
-                client = anthropic.Anthropic(api_key=api_key)
+                client = get_client(api_key)
 
                 def stream_response():
                     with client.messages.stream(
-                        model="claude-sonnet-4-6",
-                        max_tokens=1024,
+                        model=MODEL,
+                        max_tokens=output_budget(llm_text['tokens'], ANSWER_OUTPUT_RATIO),
                         system=system_prompt,
                         messages=[{"role": "user", "content": question}]
                     ) as stream:
                         for text in stream.text_stream:
                             yield text
 
-                response = st.write_stream(stream_response())
+                with section("LLM 스트리밍"):
+                    response = st.write_stream(stream_response())
                 st.markdown('<p class="ai-note">AI 생성 응답으로 원본 전사본과 다를 수 있습니다</p>', unsafe_allow_html=True)
                 st.session_state['qa_history'].append({'q': question, 'a': response})
 
+render_debug_panel()
 conn.close()
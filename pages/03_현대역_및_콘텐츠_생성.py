@@ -1,35 +1,63 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import io
+import zipfile
+
 import streamlit as st
-import random
-from dotenv import load_dotenv
-import anthropic
 
-from utils.db import get_conn, search_items_by_title, get_item_by_id
+from utils.llm import (
+    MODEL, TRANSCRIPT_TOKEN_BUDGET, get_api_key, get_client, output_budget, stream_concurrently,
+)
+from utils.db import (
+    get_conn, search_items_by_title, get_item_by_id, get_item_text, get_item_llm_text,
+    get_sample_pools, sample_items, get_discover_feed,
+)
 
-load_dotenv()
 st.set_page_config(page_title="현대역 및 콘텐츠 생성", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
 from utils.style import inject_css, page_title
 inject_css()
 page_title("활용", "현대역 및 콘텐츠 생성")
+require_db()
+start_page(__file__)
 
 conn = get_conn()
 
 # ── 설화 선택 ─────────────────────────────────────────────────────────────────
 st.subheader("설화 선택")
 
+SAMPLE_KINDS = {'all': "전체", 'category': "분류", 'region': "지역", 'motif': "모티프"}
+
 col_search, col_random = st.columns([4, 1])
 with col_search:
     keyword = st.text_input("제목 검색", placeholder="제목 키워드 입력")
+with st.expander("무작위 추천 조건 · 지역별 발견", expanded=False):
+    kind_col, value_col = st.columns([1, 3])
+    with kind_col:
+        sample_kind = st.radio("추천 범위", list(SAMPLE_KINDS), format_func=SAMPLE_KINDS.get)
+    with value_col:
+        sample_value = ''
+        if sample_kind != 'all':
+            pools = {p['value']: (p['label'], p['size']) for p in get_sample_pools(conn, sample_kind)}
+            sample_value = st.selectbox(
+                SAMPLE_KINDS[sample_kind], list(pools), format_func=lambda v: f"{pools[v][0]} ({pools[v][1]}편)"
+            ) or ''
+
+    # 지역마다 한 편씩 — 누를 때마다 새로 뽑는다
+    if st.button("지역별로 한 편씩 뽑기"):
+        st.session_state['discover_feed'] = [dict(r) for r in get_discover_feed(conn, 'region')]
+    for r in st.session_state.get('discover_feed', []):
+        if st.button(f"{r['stratum']} · {r['title']} ({r['district'] or ''})", key=f"discover_{r['id']}"):
+            st.session_state['use_id'] = r['id']
 with col_random:
     st.markdown("<br/>", unsafe_allow_html=True)
     if st.button("무작위 추천"):
-        rows = conn.execute(
-            "SELECT id FROM items WHERE content IS NOT NULL AND content != '' ORDER BY RANDOM() LIMIT 1"
-        ).fetchone()
-        if rows:
-            st.session_state['use_id'] = rows['id']
+        # 빌드 때 만든 표본 풀에서 기본키 조회 한 번 (utils/sampler)
+        picked = sample_items(conn, sample_kind, sample_value)
+        if picked:
+            st.session_state['use_id'] = picked[0]['id']
 
 if keyword:
     results = search_items_by_title(conn, keyword)
@@ -51,7 +79,7 @@ if not item:
     st.stop()
 
 item = dict(item)
-content = item.get('content', '') or ''
+content = get_item_text(conn, use_id)['content'] if item['content_len'] else ''
 
 # 원문 미리보기
 with st.expander(f"원문 미리보기 — {item['title']}", expanded=True):
@@ -64,6 +92,12 @@ if not content:
     st.warning("본문 전사가 없는 자료입니다. 재가공 기능을 사용할 수 없습니다.")
     st.stop()
 
+# LLM 에는 빌드 때 만든 정규화 본문을 보낸다 — 토큰 추정치도 빌드 때 계산돼 있다 (utils/texts)
+llm_text = get_item_llm_text(conn, use_id, max_tokens=TRANSCRIPT_TOKEN_BUDGET)
+st.caption(f"LLM 입력 약 {llm_text['tokens']:,} 토큰 (주석·군말을 걷어 낸 정규화 본문)")
+if llm_text['truncated']:
+    st.warning(f"본문이 길어 앞부분 약 {TRANSCRIPT_TOKEN_BUDGET:,} 토큰만 변환합니다.")
+
 # ── 변환 형식 선택 ────────────────────────────────────────────────────────────
 st.divider()
 st.subheader("변환 형식 선택")
@@ -74,67 +108,109 @@ FORMAT_OPTIONS = {
     "영어 번역본": "Translate this Korean folk tale into natural English, preserving its narrative structure.",
     "웹툰/영상 대본 형식": "이 설화를 웹툰 또는 영상 콘텐츠용 대본 형식(씬 번호, 지문, 대사)으로 변환하세요.",
 }
+# 결과 분량 / 원문 분량 (토큰) — max_tokens 를 원문 길이에 맞춰 정한다
+FORMAT_OUTPUT_RATIO = {
+    "현대어 윤문본": 1.2,
+    "아동용 재서술본": 1.0,
+    "영어 번역본": 0.8,
+    "웹툰/영상 대본 형식": 1.6,
+}
+
+generate_mode = st.radio("생성 방식", ["한 형식씩", "여러 형식 동시 생성"], horizontal=True)
+if generate_mode == "한 형식씩":
+    selected_formats = [st.radio("형식", list(FORMAT_OPTIONS.keys()), horizontal=True)]
+else:
+    selected_formats = st.multiselect("형식", list(FORMAT_OPTIONS.keys()), default=list(FORMAT_OPTIONS.keys()))
+
+
+def format_request(fmt):
+    return dict(
+        model=MODEL,
+        max_tokens=output_budget(llm_text['tokens'], FORMAT_OUTPUT_RATIO[fmt]),
+        system=FORMAT_OPTIONS[fmt],
+        messages=[{"role": "user", "content":
+                   f"다음 한국 설화를 지시에 따라 변환해주세요.\n\n[제목]: {item['title']}\n[원문]: {llm_text['text']}"}],
+    )
+
+
+# 생성 결과는 형식별로 모아 둔다 — 다른 형식을 생성해도 앞의 결과가 남고, 설화를 바꾸면 비운다
+generated = st.session_state.get('generated')
+if not generated or generated['id'] != use_id:
+    generated = st.session_state['generated'] = {'id': use_id, 'title': item['title'], 'outputs': {}}
 
-selected_format = st.radio("형식", list(FORMAT_OPTIONS.keys()), horizontal=True)
 
 # ── 생성 ─────────────────────────────────────────────────────────────────────
 st.divider()
 
-if st.button("생성하기", type="primary"):
-    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+if st.button("생성하기", type="primary", disabled=not selected_formats):
+    api_key = get_api_key()
     if not api_key:
         st.error(".env 파일에 ANTHROPIC_API_KEY를 설정하세요.")
     else:
-        system_prompt = FORMAT_OPTIONS[selected_format]
-        user_message = f"다음 한국 설화를 지시에 따라 변환해주세요.\n\n[제목]: {item['title']}\n[원문]: {content}"
-
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_client(api_key)
 
-        result_placeholder = st.empty()
-        result_container = st.container()
-
-        with result_container:
-            st.markdown(
-                "<div style='background:#FFF7ED;border:1px solid #FED7AA;"
-                "border-radius:8px;padding:16px;margin-top:8px'>",
-                unsafe_allow_html=True
-            )
+        if len(selected_formats) == 1:
+            fmt = selected_formats[0]
 
             def stream_response():
-                with client.messages.stream(
-                    model="claude-sonnet-4-6",
-                    max_tokens=2048,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_message}]
-                ) as stream:
+                with client.messages.stream(**format_request(fmt)) as stream:
                     for text in stream.text_stream:
                         yield text
 
-            generated_text = st.write_stream(stream_response())
-            st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown('<p class="ai-note">AI가 생성한 파생 텍스트로, 원본 전사본과 다를 수 있습니다</p>', unsafe_allow_html=True)
-
-        st.session_state['generated_text'] = generated_text
-        st.session_state['generated_format'] = selected_format
-        st.session_state['generated_title'] = item['title']
+            with st.container(border=True):
+                with section("LLM 스트리밍"):
+                    generated['outputs'][fmt] = st.write_stream(stream_response())
+        else:
+            # 형식마다 패널 하나 — 스트림은 워커 스레드에서 받고 화면은 이 스레드에서 그린다 (utils/llm)
+            panels, texts = {}, {fmt: '' for fmt in selected_formats}
+            cols = st.columns(2)
+            for i, fmt in enumerate(selected_formats):
+                with cols[i % 2]:
+                    st.markdown(f"**{fmt}**")
+                    panels[fmt] = st.container(border=True).empty()
+            requests = {fmt: format_request(fmt) for fmt in selected_formats}
+            with section("LLM 동시 스트리밍"):
+                for fmt, kind, value in stream_concurrently(client, requests):
+                    if kind == 'text':
+                        texts[fmt] += value
+                        panels[fmt].markdown(texts[fmt] + " ▌")
+                    elif kind == 'error':
+                        texts[fmt] = ''    # 중간에 끊긴 결과는 남기지 않는다
+                        panels[fmt].error(f"생성 실패: {value}")
+                    elif texts[fmt]:
+                        panels[fmt].markdown(texts[fmt])
+                        generated['outputs'][fmt] = texts[fmt]
+        st.markdown('<p class="ai-note">AI가 생성한 파생 텍스트로, 원본 전사본과 다를 수 있습니다</p>', unsafe_allow_html=True)
 
 # ── 출력 ─────────────────────────────────────────────────────────────────────
-if 'generated_text' in st.session_state and st.session_state['generated_text']:
+outputs = {fmt: text for fmt, text in generated['outputs'].items() if text}
+if outputs:
     st.divider()
     st.subheader("출력")
 
-    gen_text = st.session_state['generated_text']
-    gen_format = st.session_state.get('generated_format', '')
-    gen_title = st.session_state.get('generated_title', '')
-
-    st.code(gen_text, language=None)
-
-    fname = f"{gen_title}_{gen_format}.txt"
-    st.download_button(
-        label="텍스트 파일 내려받기",
-        data=gen_text.encode('utf-8'),
-        file_name=fname,
-        mime="text/plain",
-    )
+    gen_title = generated['title']
+    for tab, (fmt, text) in zip(st.tabs(list(outputs)), outputs.items()):
+        with tab:
+            st.code(text, language=None)
+            st.download_button(
+                label="텍스트 파일 내려받기",
+                data=text.encode('utf-8'),
+                file_name=f"{gen_title}_{fmt}.txt",
+                mime="text/plain",
+                key=f"download_{fmt}",
+            )
 
+    if len(outputs) > 1:
+        bundle = io.BytesIO()
+        with zipfile.ZipFile(bundle, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for fmt, text in outputs.items():
+                zf.writestr(f"{gen_title}_{fmt.replace('/', '_')}.txt", text)
+        st.download_button(
+            label=f"모든 형식 묶어 내려받기 ({len(outputs)}개, zip)",
+            data=bundle.getvalue(),
+            file_name=f"{gen_title}_재가공.zip",
+            mime="application/zip",
+        )
+
+render_debug_panel()
 conn.close()
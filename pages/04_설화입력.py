@@ -3,24 +3,31 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import streamlit as st
 from datetime import datetime
-from dotenv import load_dotenv
-import anthropic
 import json
 
-from utils.db import get_conn, insert_contribution, get_contributions
+from utils.llm import get_api_key, get_client
+from utils.db import (
+    get_contrib_conn, insert_contribution,
+    get_contributions_page, get_contribution_by_id, get_contribution_regions,
+)
+from utils.motif_tagging import MODEL, build_prompt, extract_json, tagging_budget
 
-load_dotenv()
 st.set_page_config(page_title="설화입력", layout="wide")
+from utils.bootstrap import ensure_db
+from utils.profiling import render_debug_panel, section, start_page
 from utils.style import inject_css, page_title, ICONS
 inject_css()
 page_title("기여", "설화입력")
+# 기여는 contributions.db 에만 쓰고 읽으므로 카탈로그(folklore.db) 구축을 기다리지 않는다 — 구축은 뒤에서 시작만 해 둔다
+ensure_db()
+start_page(__file__)
 
 st.info(
     "내가 알고 있는 설화를 직접 기록해 플랫폼에 기여할 수 있습니다.\n"
     "기여 데이터는 원본 데이터와 구분되어 표시됩니다."
 )
 
-conn = get_conn()
+conn = get_contrib_conn()
 
 tab_input, tab_list = st.tabs(["설화 입력", "기여 목록"])
 
@@ -61,39 +68,18 @@ with tab_input:
         if not content or len(content) < 10:
             st.warning("본문을 먼저 입력하세요.")
         else:
-            api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+            api_key = get_api_key()
             if not api_key:
                 st.error(".env 파일에 ANTHROPIC_API_KEY를 설정하세요.")
             else:
-                client = anthropic.Anthropic(api_key=api_key)
-                prompt = f"""다음 설화 본문을 읽고 아래 JSON 형식으로 분석 결과를 반환하세요.
-
-{{
-  "motifs": ["모티프코드-설명", ...],
-  "atu_types": ["ATU XXX", ...],
-  "narrative_units": ["서사단락1", "서사단락2", ...],
-  "structure": "서사구조 요약",
-  "era": "시대"
-}}
-
-[설화 본문]:
-{content}
-
-JSON만 출력하고 다른 설명은 하지 마세요."""
-
-                with st.spinner("AI가 분석 중입니다..."):
+                client = get_client(api_key)
+                with st.spinner("AI가 분석 중입니다..."), section("LLM 호출"):
                     resp = client.messages.create(
-                        model="claude-sonnet-4-6",
-                        max_tokens=1024,
-                        messages=[{"role": "user", "content": prompt}]
+                        model=MODEL,
+                        max_tokens=tagging_budget(content),
+                        messages=[{"role": "user", "content": build_prompt(content)}]
                     )
-                    raw = resp.content[0].text.strip()
-                    # JSON 추출 (```json ... ``` 형식 처리)
-                    if raw.startswith("```"):
-                        raw = raw.split("```")[1]
-                        if raw.startswith("json"):
-                            raw = raw[4:]
-                    st.session_state['motif_draft'] = raw.strip()
+                    st.session_state['motif_draft'] = extract_json(resp.content[0].text)
                     st.session_state['_draft_content'] = content
 
     if st.session_state['motif_draft']:
@@ -126,47 +112,93 @@ JSON만 출력하고 다른 설명은 하지 마세요."""
                 'submitted_at': datetime.now().isoformat(),
                 'motif_draft': st.session_state.get('motif_draft', ''),
             }
-            insert_contribution(conn, data)
+            insert_contribution(data)
             st.success(f"설화 「{title}」이(가) 성공적으로 제출되었습니다.")
             st.session_state['motif_draft'] = ''
             st.session_state.pop('_draft_content', None)
 
 # ── 기여 목록 탭 ──────────────────────────────────────────────────────────────
+STATUS_LABELS = {"": "전체", "pending": "검토 대기", "promoted": "승격됨"}
+PAGE_SIZE = 20
+
+
+def render_draft(motif_draft):
+    st.markdown("**AI 모티프 초안**")
+    try:
+        draft = json.loads(motif_draft)
+        if draft.get('motifs'):
+            st.write("모티프:", ", ".join(draft['motifs']))
+        if draft.get('subjects'):
+            st.write("주제어:", ", ".join(draft['subjects']))
+        if draft.get('places'):
+            st.write("지명:", ", ".join(draft['places']))
+        if draft.get('era'):
+            st.write("시대:", draft['era'])
+        if draft.get('structure'):
+            st.write("구조:", draft['structure'])
+    except Exception:
+        st.code(motif_draft)
+
+
 with tab_list:
     st.subheader("기여된 설화 목록")
-    contribs = get_contributions(conn)
+    f_col1, f_col2 = st.columns(2)
+    with f_col1:
+        status_filter = st.selectbox("상태", list(STATUS_LABELS.keys()), format_func=STATUS_LABELS.get)
+    with f_col2:
+        # 표기가 달라도('경남' · '경상남도') 같은 시도 코드로 묶어 거른다
+        contrib_regions = dict(get_contribution_regions(conn))
+        region_filter = st.selectbox("지역", [""] + list(contrib_regions),
+                                     format_func=lambda c: contrib_regions.get(c, "전체"))
+
+    # 필터가 바뀌면 첫 페이지로 — 커서 스택으로 이전 페이지 이동 지원
+    filter_key = (status_filter, region_filter)
+    if st.session_state.get('contrib_filter') != filter_key:
+        st.session_state['contrib_filter'] = filter_key
+        st.session_state['contrib_cursors'] = [None]
+    cursors = st.session_state['contrib_cursors']
+
+    contribs, next_cursor = get_contributions_page(
+        conn, status=status_filter or None, region_code=region_filter or None,
+        cursor=cursors[-1], limit=PAGE_SIZE,
+    )
     if not contribs:
         st.info("아직 기여된 설화가 없습니다.")
     else:
         for c in contribs:
-            c = dict(c)
             with st.expander(
-                f"[기여] {c['title']} — {c['region']} {c.get('district','')} ({c['submitted_at'][:10]})"
+                f"[기여] {c['title']} — {c['region']} {c['district'] or ''} ({(c['submitted_at'] or '')[:10]})"
             ):
-                col_a, col_b = st.columns([3, 2])
-                with col_a:
-                    st.markdown(f"**제보자** {c.get('narrator','-')}")
-                    st.markdown(f"**채록일** {c.get('collected_date','-')}")
-                    st.markdown(f"**장소** {c.get('location','-')}")
-                    content_preview = c.get('content', '')[:300]
-                    st.write(content_preview + ("..." if len(c.get('content','')) > 300 else ""))
-                with col_b:
-                    if c.get('motif_draft'):
-                        st.markdown("**AI 모티프 초안**")
-                        try:
-                            draft = json.loads(c['motif_draft'])
-                            if draft.get('motifs'):
-                                st.write("모티프:", ", ".join(draft['motifs']))
-                            if draft.get('era'):
-                                st.write("시대:", draft['era'])
-                            if draft.get('structure'):
-                                st.write("구조:", draft['structure'])
-                        except Exception:
-                            st.code(c['motif_draft'])
-                    st.caption(
-                        f"<span style='background:#EAB308;color:white;padding:2px 6px;"
-                        f"border-radius:3px;font-size:0.8em'>기여 자료</span>",
-                        unsafe_allow_html=True
-                    )
-
+                st.write(c['preview'] or '')
+                st.caption(
+                    f"<span style='background:#EAB308;color:white;padding:2px 6px;"
+                    f"border-radius:3px;font-size:0.8em'>기여 자료</span>",
+                    unsafe_allow_html=True
+                )
+                # 전체 본문·초안은 펼쳐 볼 때만 조회
+                if st.toggle("전체 보기", key=f"contrib_full_{c['id']}"):
+                    full = dict(get_contribution_by_id(conn, c['id']) or {})
+                    col_a, col_b = st.columns([3, 2])
+                    with col_a:
+                        st.markdown(f"**제보자** {full.get('narrator') or '-'}")
+                        st.markdown(f"**채록일** {full.get('collected_date') or '-'}")
+                        st.markdown(f"**장소** {full.get('location') or '-'}")
+                        st.write(full.get('content', ''))
+                    with col_b:
+                        if full.get('motif_draft'):
+                            render_draft(full['motif_draft'])
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if len(cursors) > 1 and st.button("← 이전", key="contrib_prev"):
+            cursors.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"{len(cursors)} 페이지")
+    with next_col:
+        if next_cursor and st.button("다음 →", key="contrib_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+render_debug_panel()
 conn.close()
@@ -1,36 +1,30 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-import math
 import streamlit as st
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import st_folium
 
 from utils.db import (
     get_conn,
-    search_places_by_name, get_items_by_place_name,
-    get_narrative_geo_pairs,
+    search_places_by_name, get_items_by_place, get_place_aliases,
+    get_narrative_geo_pairs, get_region_tree,
+    get_items_near, get_items_set_near, get_places_near,
 )
+from utils.geocode import resolve_location
+from utils.spatial import bounding_box, haversine_km
 
 st.set_page_config(page_title="서사 지리 분석", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
 from utils.style import inject_css, page_title, ICONS
 inject_css()
 page_title("서사지리", "서사 지리 분석")
+require_db()
+start_page(__file__)
 
 conn = get_conn()
 
 # ── 유틸 ─────────────────────────────────────────────────────────────────────
 
-def haversine_km(lat1, lng1, lat2, lng2):
-    R = 6371.0
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lng2 - lng1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def dist_color(km):
     if km < 50:
         return "#16A34A"   # 녹색
@@ -41,7 +35,9 @@ def dist_color(km):
 
 # ── 탭 ───────────────────────────────────────────────────────────────────────
 
-tab_a, tab_b = st.tabs(["지명 역추적", "채록지–서사지 괴리"])
+tab_a, tab_b, tab_c = st.tabs(["지명 역추적", "채록지–서사지 괴리", "주변 이야기"])
+
+NEAR_LIMIT = 100   # 반경 검색 목록마다 가까운 순으로 보일 수
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Tab A : 지명 역추적
@@ -62,52 +58,66 @@ with tab_a:
         if not place_rows:
             st.info("해당 키워드로 지오코딩된 지명이 없습니다.")
         else:
-            place_options = {r['place_name']: r for r in place_rows}
-            selected_place = st.selectbox(
+            place_options = {r['id']: r for r in place_rows}
+            selected_place_id = st.selectbox(
                 "지명 선택",
                 list(place_options.keys()),
-                format_func=lambda n: f"{n}  ({place_options[n]['lat']:.3f}, {place_options[n]['lng']:.3f})",
+                format_func=lambda pid: (
+                    f"{place_options[pid]['place_name']}  "
+                    f"({place_options[pid]['lat']:.3f}, {place_options[pid]['lng']:.3f}) · "
+                    f"{place_options[pid]['item_count']}건"
+                ),
             )
 
-            if selected_place:
-                pr = place_options[selected_place]
-                items = get_items_by_place_name(conn, selected_place)
+            if selected_place_id:
+                pr = place_options[selected_place_id]
+                selected_place = pr['place_name']
+                with section("조회"):
+                    items = get_items_by_place(conn, selected_place_id)
 
                 st.caption(f"**{selected_place}** 을(를) 서사 지명으로 포함하는 설화 {len(items)}건")
-
-                m = folium.Map(
-                    location=[pr['lat'], pr['lng']],
-                    zoom_start=7,
-                    tiles="CartoDB positron",
-                )
-
-                # 지명 마커 (적색 별)
-                folium.Marker(
-                    location=[pr['lat'], pr['lng']],
-                    icon=folium.Icon(color="red", icon="star", prefix="fa"),
-                    tooltip=f"⭐ {selected_place}",
-                    popup=selected_place,
-                ).add_to(m)
-
-                # 채록지 마커 클러스터
-                cluster = MarkerCluster(name="채록지").add_to(m)
-                for it in items:
-                    if it['lat'] is None or it['lng'] is None:
-                        continue
-                    folium.CircleMarker(
-                        location=[it['lat'], it['lng']],
-                        radius=7,
-                        color="#1D4ED8",
-                        fill=True,
-                        fill_color="#3B82F6",
-                        fill_opacity=0.8,
-                        tooltip=f"{it['title']} ({it['region']} {it['district']})",
-                        popup=folium.Popup(
-                            f"<b>{it['title']}</b><br>{it['region']} {it['district']}<br>"
-                            f"<small>{it['category']}</small>",
-                            max_width=220,
-                        ),
-                    ).add_to(cluster)
+                aliases = [a for a in get_place_aliases(conn, selected_place_id) if a != selected_place]
+                if aliases:
+                    st.caption("다른 표기: " + ", ".join(aliases))
+
+                import folium
+                from folium.plugins import MarkerCluster
+                from streamlit_folium import st_folium
+
+                with section("지도 생성"):
+                    m = folium.Map(
+                        location=[pr['lat'], pr['lng']],
+                        zoom_start=7,
+                        tiles="CartoDB positron",
+                    )
+
+                    # 지명 마커 (적색 별)
+                    folium.Marker(
+                        location=[pr['lat'], pr['lng']],
+                        icon=folium.Icon(color="red", icon="star", prefix="fa"),
+                        tooltip=f"⭐ {selected_place}",
+                        popup=selected_place,
+                    ).add_to(m)
+
+                    # 채록지 마커 클러스터
+                    cluster = MarkerCluster(name="채록지").add_to(m)
+                    for it in items:
+                        if it['lat'] is None or it['lng'] is None:
+                            continue
+                        folium.CircleMarker(
+                            location=[it['lat'], it['lng']],
+                            radius=7,
+                            color="#1D4ED8",
+                            fill=True,
+                            fill_color="#3B82F6",
+                            fill_opacity=0.8,
+                            tooltip=f"{it['title']} ({it['region']} {it['district']})",
+                            popup=folium.Popup(
+                                f"<b>{it['title']}</b><br>{it['region']} {it['district']}<br>"
+                                f"<small>{it['category']}</small>",
+                                max_width=220,
+                            ),
+                        ).add_to(cluster)
 
                 legend = (
                     '<div style="font-size:0.8rem;color:#4A2010;margin:0.3rem 0;">'
@@ -116,7 +126,8 @@ with tab_a:
                     '</div>'
                 )
                 st.markdown(legend, unsafe_allow_html=True)
-                st_folium(m, width="100%", height=480, returned_objects=[])
+                with section("st_folium 렌더링"):
+                    st_folium(m, width="100%", height=480, returned_objects=[])
 
                 with st.expander("설화 목록"):
                     for it in items:
@@ -141,17 +152,17 @@ with tab_b:
         unsafe_allow_html=True,
     )
 
-    regions = ["전체", "경기", "강원", "충청", "전라", "경상", "제주"]
-    region_filter = st.selectbox("지역 필터", regions)
-
-    region_arg = None if region_filter == "전체" else region_filter
+    # 권역·시도 코드 범위로 거른다 — '경남' · '경상남도' 표기 차이는 빌드 때 코드로 맞춰져 있다
+    regions = {code: f"{'└ ' if level else ''}{name}" for code, name, level in get_region_tree(conn)}
+    region_filter = st.selectbox("지역 필터", [""] + list(regions), format_func=lambda c: regions.get(c, "전체"))
 
     @st.cache_data(ttl=600)
-    def load_pairs(region):
-        rows = get_narrative_geo_pairs(conn, region=region, limit=500)
+    def load_pairs(region_code):
+        rows = get_narrative_geo_pairs(conn, region_code=region_code, limit=500)
         return [dict(r) for r in rows]
 
-    pairs = load_pairs(region_arg)
+    with section("조회"):
+        pairs = load_pairs(region_filter or None)
 
     if not pairs:
         st.info("해당 조건에 맞는 데이터가 없습니다.")
@@ -174,40 +185,45 @@ with tab_b:
         col3.metric("최대 거리", f"{max_km:.1f} km")
         col4.metric("50km 미만 비율", f"{near/n*100:.0f}%")
 
-        # 지도
-        m2 = folium.Map(location=[36.5, 127.8], zoom_start=7, tiles="CartoDB positron")
-
-        for row, km in zip(pairs, dists):
-            color = dist_color(km)
-            # 채록지
-            folium.CircleMarker(
-                location=[row['c_lat'], row['c_lng']],
-                radius=4,
-                color="#1D4ED8",
-                fill=True,
-                fill_color="#93C5FD",
-                fill_opacity=0.6,
-                tooltip=f"채록: {row['title']} ({row['region']})",
-            ).add_to(m2)
-            # 서사 지명
-            folium.CircleMarker(
-                location=[row['p_lat'], row['p_lng']],
-                radius=4,
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.7,
-                tooltip=f"지명: {row['place_name']} ({km:.1f} km)",
-            ).add_to(m2)
-            # 연결선
-            folium.PolyLine(
-                locations=[[row['c_lat'], row['c_lng']], [row['p_lat'], row['p_lng']]],
-                color=color,
-                weight=1,
-                opacity=0.45,
-            ).add_to(m2)
-
-        st_folium(m2, width="100%", height=520, returned_objects=[])
+        # 지도 — folium 은 지도를 그리는 시점에 불러온다
+        import folium
+        from streamlit_folium import st_folium
+
+        with section("지도 생성"):
+            m2 = folium.Map(location=[36.5, 127.8], zoom_start=7, tiles="CartoDB positron")
+
+            for row, km in zip(pairs, dists):
+                color = dist_color(km)
+                # 채록지
+                folium.CircleMarker(
+                    location=[row['c_lat'], row['c_lng']],
+                    radius=4,
+                    color="#1D4ED8",
+                    fill=True,
+                    fill_color="#93C5FD",
+                    fill_opacity=0.6,
+                    tooltip=f"채록: {row['title']} ({row['region']})",
+                ).add_to(m2)
+                # 서사 지명
+                folium.CircleMarker(
+                    location=[row['p_lat'], row['p_lng']],
+                    radius=4,
+                    color=color,
+                    fill=True,
+                    fill_color=color,
+                    fill_opacity=0.7,
+                    tooltip=f"지명: {row['place_name']} ({km:.1f} km)",
+                ).add_to(m2)
+                # 연결선
+                folium.PolyLine(
+                    locations=[[row['c_lat'], row['c_lng']], [row['p_lat'], row['p_lng']]],
+                    color=color,
+                    weight=1,
+                    opacity=0.45,
+                ).add_to(m2)
+
+        with section("st_folium 렌더링"):
+            st_folium(m2, width="100%", height=520, returned_objects=[])
 
         st.markdown("---")
         st.markdown("**거리 분포**")
@@ -216,4 +232,119 @@ with tab_b:
         bar_col2.metric("50–150km (근거리 괴리)", f"{mid}건 ({mid/n*100:.0f}%)")
         bar_col3.metric("150km 이상 (원거리 괴리)", f"{far}건 ({far/n*100:.0f}%)")
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Tab C : 주변 이야기 — 한 지점 반경 안의 채록지 · 서사 지명 (R*Tree 반경 검색)
+# ═══════════════════════════════════════════════════════════════════════════════
+with tab_c:
+    st.markdown(
+        """<div style="color:#4A2010;font-size:0.95rem;margin:0.5rem 0 1rem">
+마을 · 절 · 산 같은 한 지점에서 반경 안에 채록된 이야기와, 그 근처를 배경으로 한 이야기를 가까운 순으로 찾습니다.
+</div>""",
+        unsafe_allow_html=True,
+    )
+
+    mode_col, radius_col = st.columns([3, 1])
+    with mode_col:
+        mode = st.radio("기준점", ["지명으로 찾기", "지도에서 클릭"], horizontal=True)
+    with radius_col:
+        radius_km = st.slider("반경 (km)", min_value=1, max_value=100, value=10)
+
+    # 기준점은 (lat, lng, 이름) — 지도 클릭은 다시 그릴 때도 남도록 세션에 둔다
+    point = None
+    if mode == "지명으로 찾기":
+        near_kw = st.text_input("기준 지명", placeholder="예: 해인사, 창녕, 한라산")
+        if near_kw:
+            candidates = {
+                f"{r['place_name']} (서사 지명 · {r['item_count']}건)": (r['lat'], r['lng'], r['place_name'])
+                for r in search_places_by_name(conn, near_kw, limit=10)
+            }
+            hit = resolve_location(near_kw)
+            if hit:
+                candidates.setdefault(f"{hit['matched']} (지명집)", (hit['lat'], hit['lng'], hit['matched']))
+            if candidates:
+                point = candidates[st.selectbox("지명 선택", list(candidates))]
+            else:
+                st.info("좌표를 찾을 수 없는 지명입니다.")
+    else:
+        # 지도 — folium 은 지도를 그리는 시점에 불러온다
+        import folium
+        from streamlit_folium import st_folium
+
+        point = st.session_state.get('near_point')
+        st.caption("지도에서 기준점을 클릭하세요.")
+        pick_map = folium.Map(location=point[:2] if point else [36.5, 127.8],
+                              zoom_start=10 if point else 7, tiles="CartoDB positron")
+        if point:
+            folium.Marker(location=point[:2], icon=folium.Icon(color="red", icon="star", prefix="fa")).add_to(pick_map)
+        picked = st_folium(pick_map, width="100%", height=360, returned_objects=["last_clicked"], key="near_pick")
+        clicked = (picked or {}).get("last_clicked")
+        if clicked and (not point or (clicked["lat"], clicked["lng"]) != point[:2]):
+            st.session_state['near_point'] = (clicked["lat"], clicked["lng"], "클릭한 지점")
+            st.rerun()
+
+    if point:
+        lat, lng, label = point
+        with section("반경 조회"):
+            collected = get_items_near(conn, lat, lng, radius_km, limit=NEAR_LIMIT)
+            set_near = get_items_set_near(conn, lat, lng, radius_km, limit=NEAR_LIMIT)
+            places_near = get_places_near(conn, lat, lng, radius_km, limit=NEAR_LIMIT)
+
+        st.caption(f"**{label}** ({lat:.4f}, {lng:.4f}) 반경 {radius_km} km · 목록마다 가까운 순 최대 {NEAR_LIMIT}건")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("이 근처에서 채록된 자료", f"{len(collected):,}건")
+        col2.metric("이 근처가 배경인 자료", f"{len(set_near):,}건")
+        col3.metric("근처 서사 지명", f"{len(places_near):,}곳")
+
+        import folium
+        from streamlit_folium import st_folium
+
+        with section("지도 생성"):
+            m3 = folium.Map(location=[lat, lng], tiles="CartoDB positron")
+            min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+            m3.fit_bounds([[min_lat, min_lng], [max_lat, max_lng]])
+            folium.Circle(location=[lat, lng], radius=radius_km * 1000, color="#4A2010",
+                          weight=1, fill=True, fill_opacity=0.04).add_to(m3)
+            folium.Marker(location=[lat, lng], tooltip=label,
+                          icon=folium.Icon(color="red", icon="star", prefix="fa")).add_to(m3)
+            for it in collected:
+                folium.CircleMarker(
+                    location=[it['lat'], it['lng']], radius=5, color="#1D4ED8",
+                    fill=True, fill_color="#3B82F6", fill_opacity=0.8,
+                    tooltip=f"채록: {it['title']} ({it['km']:.1f} km)",
+                ).add_to(m3)
+            for pl in places_near:
+                folium.CircleMarker(
+                    location=[pl['lat'], pl['lng']], radius=6, color="#DC2626",
+                    fill=True, fill_color="#DC2626", fill_opacity=0.7,
+                    tooltip=f"지명: {pl['place_name']} · {pl['item_count']}건 ({pl['km']:.1f} km)",
+                ).add_to(m3)
+        st.markdown(
+            '<div style="font-size:0.8rem;color:#4A2010;margin:0.3rem 0;">'
+            '<span style="color:#DC2626">★</span> 기준점 &nbsp;'
+            '<span style="color:#3B82F6">●</span> 채록지 &nbsp;'
+            '<span style="color:#DC2626">●</span> 서사 지명'
+            '</div>',
+            unsafe_allow_html=True,
+        )
+        with section("st_folium 렌더링"):
+            st_folium(m3, width="100%", height=480, returned_objects=[], key="near_result")
+
+        km_column = st.column_config.NumberColumn("거리 (km)", format="%.1f")
+        list_a, list_b = st.columns(2)
+        with list_a:
+            st.markdown("**이 근처에서 채록된 자료**")
+            st.dataframe(
+                [{'거리': it['km'], 'ID': it['id'], '제목': it['title'], '채록지': it['location'] or it['district'],
+                  '분류': it['category']} for it in collected],
+                use_container_width=True, hide_index=True, column_config={'거리': km_column},
+            )
+        with list_b:
+            st.markdown("**이 근처가 배경인 자료**")
+            st.dataframe(
+                [{'거리': it['km'], 'ID': it['id'], '제목': it['title'], '서사 지명': it['place_name'],
+                  '분류': it['category']} for it in set_near],
+                use_container_width=True, hide_index=True, column_config={'거리': km_column},
+            )
+
+render_debug_panel()
 conn.close()
@@ -0,0 +1,95 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit as st
+
+from utils.llm import ANSWER_OUTPUT_RATIO, MODEL, get_api_key, get_client, output_budget
+from utils.texts import estimate_tokens
+from utils.db import get_conn
+from utils.retrieval import search_passages, format_passages
+
+st.set_page_config(page_title="코퍼스 질의응답", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
+from utils.style import inject_css, page_title, ICONS
+inject_css()
+page_title("이해", "코퍼스 질의응답")
+require_db()
+start_page(__file__)
+
+conn = get_conn()
+
+st.markdown(f"""<div style="display:flex;align-items:center;gap:0.5rem;margin:0.5rem 0 1rem">
+  {ICONS['분석']}<span style="font-weight:700;color:#4A2010;font-size:1rem;">
+  전체 설화의 서사 단락·제목·모티프에서 근거 구절을 찾아 답합니다.</span>
+</div>""", unsafe_allow_html=True)
+
+top_k = st.sidebar.slider("근거 구절 수", min_value=3, max_value=20, value=8)
+
+if 'corpus_qa_history' not in st.session_state:
+    st.session_state['corpus_qa_history'] = []
+
+
+def render_sources(rows):
+    with st.expander(f"근거 구절 {len(rows)}건"):
+        for n, r in enumerate(rows, 1):
+            st.markdown(
+                f"**[{n}] {r['title']}** "
+                f"<span style='color:#9A7A6A;font-size:0.8rem'>{r['item_id']} · {r['region'] or ''} {r['district'] or ''}</span>",
+                unsafe_allow_html=True,
+            )
+            st.caption(r['text'])
+
+
+for qa in st.session_state['corpus_qa_history']:
+    with st.chat_message("user"):
+        st.write(qa['q'])
+    with st.chat_message("assistant"):
+        st.write(qa['a'])
+        render_sources(qa['sources'])
+
+question = st.chat_input("예: 금강산을 배경으로 승려가 변신하는 설화는?")
+if question:
+    api_key = get_api_key()
+    if not api_key:
+        st.error(".env 파일에 ANTHROPIC_API_KEY를 설정하세요.")
+    else:
+        with section("구절 검색"):
+            rows = [dict(r) for r in search_passages(conn, question, limit=top_k)]
+
+        with st.chat_message("user"):
+            st.write(question)
+
+        with st.chat_message("assistant"):
+            if not rows:
+                response = "질문과 관련된 구절을 코퍼스에서 찾지 못했습니다."
+                st.write(response)
+            else:
+                system_prompt = f"""당신은 한국 구비문학 전문 연구 보조 AI입니다.
+아래는 질문과 관련해 코퍼스 전체에서 검색한 설화 구절입니다.
+구절에 근거해 답하고, 인용한 설화는 [번호]와 제목으로 밝히세요.
+구절만으로 답할 수 없으면 그렇다고 말하세요.
+
+{format_passages(rows)}"""
+
+                client = get_client(api_key)
+
+                def stream_response():
+                    with client.messages.stream(
+                        model=MODEL,
+                        # 근거 구절 분량에 맞춘 답변 길이
+                        max_tokens=output_budget(estimate_tokens(system_prompt), ANSWER_OUTPUT_RATIO),
+                        system=system_prompt,
+                        messages=[{"role": "user", "content": question}]
+                    ) as stream:
+                        for text in stream.text_stream:
+                            yield text
+
+                with section("LLM 스트리밍"):
+                    response = st.write_stream(stream_response())
+                st.markdown('<p class="ai-note">AI 생성 응답으로 원본 전사본과 다를 수 있습니다</p>', unsafe_allow_html=True)
+            render_sources(rows)
+            st.session_state['corpus_qa_history'].append({'q': question, 'a': response, 'sources': rows})
+
+render_debug_panel()
+conn.close()
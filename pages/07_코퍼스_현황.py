@@ -0,0 +1,108 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit as st
+
+from utils.db import (
+    get_conn, get_corpus_totals, get_category_stats, get_region_stats,
+    get_district_stats, get_top_motif_stats, get_atu_stats, get_era_stats,
+    get_geocode_stats, get_enrichment_stats,
+)
+
+st.set_page_config(page_title="코퍼스 현황", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, start_page
+from utils.style import inject_css, page_title
+inject_css()
+page_title("탐색", "코퍼스 현황")
+require_db()
+start_page(__file__)
+
+# 모든 수치는 빌드 때 계산된 stats_* 테이블에서만 읽는다 (코퍼스 크기와 무관)
+conn = get_conn()
+
+
+def pct(part, whole):
+    return f"{part / whole * 100:.0f}%" if whole else "-"
+
+
+totals = get_corpus_totals(conn)
+n_items = totals.get('items', 0)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("전체 자료", f"{n_items:,}건")
+col2.metric("좌표 보유", f"{totals.get('items_with_coords', 0):,}건",
+            pct(totals.get('items_with_coords', 0), n_items), delta_color="off")
+col3.metric("본문 전사", f"{totals.get('items_with_content', 0):,}건",
+            pct(totals.get('items_with_content', 0), n_items), delta_color="off")
+col4.metric("모티프 태깅", f"{totals.get('items_enriched', 0):,}건",
+            pct(totals.get('items_enriched', 0), n_items), delta_color="off")
+
+col5, col6, col7, col8 = st.columns(4)
+col5.metric("모티프 종류", f"{totals.get('motifs', 0):,}")
+col6.metric("ATU 유형", f"{totals.get('atu_types', 0):,}")
+col7.metric("서사 지명", f"{totals.get('places', 0):,}")
+col8.metric("지명 좌표 확인", f"{totals.get('places_with_coords', 0):,}",
+            pct(totals.get('places_with_coords', 0), totals.get('places', 0)), delta_color="off")
+
+st.divider()
+
+tab_region, tab_motif, tab_quality = st.tabs(["지역 · 갈래", "모티프 · 유형 · 시대", "좌표 · 보강 현황"])
+
+with tab_region:
+    cat_rows = [dict(r) for r in get_category_stats(conn)]
+    st.markdown("**갈래별 자료 수**")
+    st.bar_chart(cat_rows, x="category", y="n_items")
+
+    categories = st.multiselect("갈래 필터", [r['category'] for r in cat_rows])
+    region_rows = [dict(r) for r in get_region_stats(conn, categories or None)]
+    st.markdown("**광역 지역별 자료 수**")
+    st.bar_chart(region_rows, x="region", y=["n_with_coords", "n_items"], stack=False)
+
+    region = st.selectbox("기초 지역 보기", [""] + [r['region'] for r in region_rows],
+                          format_func=lambda r: r or "광역 지역 선택")
+    if region:
+        st.dataframe(
+            [dict(r) for r in get_district_stats(conn, region)],
+            use_container_width=True, hide_index=True,
+            column_config={"district": "기초 지역", "n_items": "자료 수", "n_with_coords": "좌표 보유"},
+        )
+
+with tab_motif:
+    m_col, a_col = st.columns(2)
+    with m_col:
+        st.markdown("**많이 쓰인 모티프**")
+        st.dataframe(
+            [dict(r) for r in get_top_motif_stats(conn, limit=50)],
+            use_container_width=True, hide_index=True,
+            column_config={"motif_code": "코드", "motif_name": "모티프", "n_items": "자료 수"},
+        )
+    with a_col:
+        st.markdown("**ATU 유형**")
+        st.dataframe(
+            [dict(r) for r in get_atu_stats(conn, limit=50)],
+            use_container_width=True, hide_index=True,
+            column_config={"atu_type": "유형", "n_items": "자료 수"},
+        )
+    st.markdown("**시대 배경**")
+    st.bar_chart([dict(r) for r in get_era_stats(conn)], x="era", y="n_items")
+
+with tab_quality:
+    g_col, e_col = st.columns(2)
+    with g_col:
+        st.markdown("**서사 지명 지오코딩 상태**")
+        st.dataframe(
+            [dict(r) for r in get_geocode_stats(conn)],
+            use_container_width=True, hide_index=True,
+            column_config={"geocode_status": "상태", "n_places": "지명 수"},
+        )
+    with e_col:
+        st.markdown("**모티프 보강 출처**")
+        st.dataframe(
+            [dict(r) for r in get_enrichment_stats(conn)],
+            use_container_width=True, hide_index=True,
+            column_config={"provenance": "출처", "status": "상태", "n_items": "자료 수"},
+        )
+
+render_debug_panel()
+conn.close()
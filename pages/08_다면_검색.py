@@ -0,0 +1,79 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit as st
+
+from utils.db import get_conn, get_db_version
+from utils.facets import FACETS, get_items_by_nos, item_nos, load_facet_index
+
+st.set_page_config(page_title="다면 검색", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, section, start_page
+from utils.style import inject_css, page_title
+inject_css()
+page_title("탐색", "다면 검색")
+require_db()
+start_page(__file__)
+
+conn = get_conn()
+db_version = get_db_version(conn)
+
+OPTION_LIMIT = 200     # facet 마다 선택 상자에 보일 값 수 (개수 많은 순)
+RESULT_LIMIT = 100
+
+
+# 비트맵은 큰 정수라 복사·직렬화 없이 프로세스에서 한 벌만 두고 db_version 이 바뀌면 다시 읽는다
+@st.cache_resource
+def facet_index(db_version):
+    return load_facet_index(conn)
+
+
+def clear_filters():
+    # 위젯 값은 위젯을 그리기 전(콜백)에만 바꿀 수 있다
+    for facet in FACETS:
+        st.session_state[f"facet_{facet}"] = []
+
+
+index = facet_index(db_version)
+selected = {facet: st.session_state.get(f"facet_{facet}", []) for facet in FACETS}
+with section("facet 집계"):
+    n_matched, matched_bits, facet_counts = index.search(selected, limit=OPTION_LIMIT)
+
+filter_col, result_col = st.columns([1, 2])
+
+# ── 필터: 같은 facet 안에서는 OR, facet 끼리는 AND ─────────────────────────────
+with filter_col:
+    st.subheader("필터")
+    for facet, (label, _) in FACETS.items():
+        counts = {value: (name, n) for value, name, n in facet_counts[facet]}
+        st.multiselect(
+            f"{label} ({len(counts)})", list(counts),
+            key=f"facet_{facet}",
+            format_func=lambda v, counts=counts: f"{counts[v][0]} ({counts[v][1]:,})",
+        )
+    if any(selected.values()):
+        st.button("필터 초기화", on_click=clear_filters)
+
+# ── 결과 ──────────────────────────────────────────────────────────────────────
+with result_col:
+    st.subheader(f"검색 결과 {n_matched:,}건")
+    with section("결과 목록"):
+        rows = get_items_by_nos(conn, item_nos(matched_bits, RESULT_LIMIT))
+    if rows:
+        st.dataframe(
+            [{'ID': r['id'], '제목': r['title'], '지역': r['region'], '시군': r['district'], '분류': r['category']}
+             for r in rows],
+            use_container_width=True, hide_index=True,
+        )
+        if n_matched > RESULT_LIMIT:
+            st.caption(f"앞의 {RESULT_LIMIT}건만 표시합니다. 필터를 더 좁혀 보세요.")
+        options = {f"[{r['id']}] {r['title']} ({r['region']} {r['district']})": r['id'] for r in rows}
+        picked = st.selectbox("모티프탐색 & 이본 대조에서 열기", [""] + list(options))
+        if picked:
+            st.session_state['focus_id'] = options[picked]
+            st.switch_page("pages/02_모티프탐색_&_이본_대조.py")
+    else:
+        st.info("조건에 맞는 자료가 없습니다.")
+
+render_debug_panel()
+conn.close()
@@ -0,0 +1,83 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit as st
+
+from utils.db import (
+    get_conn, search_motifs, get_motif_neighbours, get_motif_regions, get_motif_atu_types,
+    get_network_regions, get_region_motifs,
+)
+
+st.set_page_config(page_title="모티프 연결망", layout="wide")
+from utils.bootstrap import require_db
+from utils.profiling import render_debug_panel, start_page
+from utils.style import inject_css, page_title
+inject_css()
+page_title("이해", "모티프 연결망")
+require_db()
+start_page(__file__)
+
+# 모든 수치는 빌드 때 계산된 stats_motif_* 테이블에서 읽는다 (utils/motif_network)
+conn = get_conn()
+
+st.caption("lift 는 우연히 함께 나올 때보다 몇 배 자주 나오는지(1 보다 크면 연관), "
+           "지역 lift 는 그 지역에서 전체 평균보다 몇 배 자주 나오는지를 뜻합니다.")
+tab_motif, tab_region = st.tabs(["모티프 중심", "지역 중심"])
+
+with tab_motif:
+    motif_query = st.text_input("모티프 찾기", placeholder="코드 앞부분 또는 이름 (예: D17, 도술)").strip()
+    motifs, _ = search_motifs(conn, motif_query, limit=30)
+    motif_options = {f"{m['motif_code']} {m['motif_name']} ({m['n_items']}편)": m['motif_code'] for m in motifs}
+    selected = st.selectbox("모티프 선택", [""] + list(motif_options))
+    if selected:
+        code = motif_options[selected]
+        n_col, r_col = st.columns([3, 2])
+        with n_col:
+            order = st.radio("정렬", ["lift", "n_both"], horizontal=True,
+                             format_func={'lift': "연관 강도 (lift)", 'n_both': "함께 나온 자료 수"}.get)
+            st.markdown("**함께 나오는 모티프**")
+            st.dataframe(
+                [dict(r) for r in get_motif_neighbours(conn, code, order=order, limit=30)],
+                use_container_width=True, hide_index=True,
+                column_config={
+                    "motif_code": "코드", "motif_name": "모티프", "n_both": "함께 나온 자료",
+                    "lift": st.column_config.NumberColumn("lift", format="%.2f"),
+                    "pmi": st.column_config.NumberColumn("PMI", format="%.2f"),
+                },
+            )
+            st.markdown("**ATU 유형**")
+            st.dataframe(
+                [dict(r) for r in get_motif_atu_types(conn, code)],
+                use_container_width=True, hide_index=True,
+                column_config={"atu_type": "유형", "n_items": "자료 수"},
+            )
+        with r_col:
+            region_rows = [dict(r) for r in get_motif_regions(conn, code)]
+            st.markdown("**지역별 편중도**")
+            st.bar_chart(region_rows, x="region", y="lift")
+            st.dataframe(
+                region_rows, use_container_width=True, hide_index=True,
+                column_order=["region", "n_items", "lift"],
+                column_config={"region": "지역", "n_items": "자료 수",
+                               "lift": st.column_config.NumberColumn("lift", format="%.2f")},
+            )
+
+with tab_region:
+    r_col, m_col = st.columns([1, 3])
+    with r_col:
+        region_names = dict(get_network_regions(conn))
+        region = st.selectbox("지역", [""] + list(region_names),
+                              format_func=lambda code: region_names.get(code, "지역 선택"))
+        min_items = st.number_input("최소 자료 수", min_value=1, value=3, step=1)
+    with m_col:
+        if region:
+            st.markdown(f"**{region_names[region]}에 편중된 모티프**")
+            st.dataframe(
+                [dict(r) for r in get_region_motifs(conn, region, min_items=int(min_items), limit=50)],
+                use_container_width=True, hide_index=True,
+                column_config={"motif_code": "코드", "motif_name": "모티프", "n_items": "자료 수",
+                               "lift": st.column_config.NumberColumn("lift", format="%.2f")},
+            )
+
+render_debug_panel()
+conn.close()
@@ -0,0 +1,171 @@
+"""
+JSONL 보강이 없는 items 에 AI 모티프 태깅을 일괄 적용하는 배치 작업
+실행: python scripts/backfill_motifs.py --backend stub --limit 100
+
+- item_motifs 행이 없고 본문이 있는 자료만 대상으로 한다.
+- item_enrichment 에 ok/empty 로 기록된 자료는 건너뛰므로 중단 후 다시 실행하면 이어서 처리한다.
+- 결과는 batch 단위로 한 번에 커밋하며, 출처는 백엔드 이름으로 남긴다.
+- 같은 배치 안에서 해당 자료의 파생 구조(검색 인덱스 등)도 증분 갱신하고,
+  통계 · 모티프 연결망 · 다면 검색 같은 코퍼스 집계는 모든 배치가 끝난 뒤 한 번 다시 만든다.
+- 결과는 커밋 전에 motifs_backfill.jsonl 에도 덧붙여, folklore.db 를 다시 빌드해도 build_db 가 다시 반영한다.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from build_db import (
+    BACKFILL_PATH, DB_PATH, aggregates_stale, insert_enrichment, mark_enriched, refresh_aggregates,
+    refresh_derived,
+)
+from utils.motif_tagging import get_backend, normalize_draft
+from utils.texts import decompress_text, load_zdicts
+
+
+class RateLimiter:
+    """분당 요청 수 제한 — 여러 스레드가 공유하며 요청 간 최소 간격을 보장"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+def find_pending_items(conn, limit=None, retry_failed=True):
+    """모티프가 없고 아직 처리되지 않은 자료 id 목록 — 본문은 배치마다 load_texts 로 읽는다"""
+    done_status = ('ok', 'empty') if retry_failed else ('ok', 'empty', 'error')
+    sql = f"""
+        SELECT i.id FROM items i
+        WHERE i.content_len > 0
+          AND NOT EXISTS (SELECT 1 FROM item_motifs im WHERE im.item_no = i.item_no)
+          AND NOT EXISTS (
+              SELECT 1 FROM item_enrichment e
+              WHERE e.item_no = i.item_no AND e.status IN ({','.join('?' * len(done_status))})
+          )
+        ORDER BY i.id
+    """
+    params = list(done_status)
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [r[0] for r in conn.execute(sql, params)]
+
+
+def load_texts(conn, item_ids, zdicts):
+    """배치 자료의 [(item_id, 본문)] — 태깅 직전에 그 배치만 압축을 푼다"""
+    rows = conn.execute(f"""
+        SELECT i.id, t.dict_id, t.content FROM items i
+        JOIN item_texts t ON t.item_no = i.item_no
+        WHERE i.id IN ({','.join('?' * len(item_ids))})
+        ORDER BY i.id
+    """, list(item_ids)).fetchall()
+    return [(item_id, decompress_text(blob, zdicts.get(dict_id, b''))) for item_id, dict_id, blob in rows]
+
+
+def tag_one(backend, limiter, item_id, content):
+    """(item_id, 정규화 레코드 또는 None, 오류 메시지) 반환 — 워커 스레드에서 실행"""
+    limiter.wait()
+    try:
+        return item_id, normalize_draft(backend.tag(content)), None
+    except Exception as e:
+        return item_id, None, f"{type(e).__name__}: {e}"
+
+
+def append_results(path, results, provenance):
+    """배치 결과를 JSONL 에 덧붙인다 (build_db.load_backfill 이 읽는 형식) — DB 커밋 전에 디스크까지 쓴다"""
+    with open(path, 'a', encoding='utf-8') as f:
+        for item_id, rec, error in results:
+            line = dict(rec or {}, id=item_id, provenance=provenance, error=error,
+                        status='error' if rec is None else ('ok' if rec['motifs'] else 'empty'))
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_batch(conn, results, provenance, out_path=BACKFILL_PATH):
+    append_results(out_path, results, provenance)
+    cur = conn.cursor()
+    stats = {'ok': 0, 'empty': 0, 'error': 0}
+    for item_id, rec, error in results:
+        if rec is None:
+            mark_enriched(cur, item_id, provenance, 'error', error)
+            stats['error'] += 1
+            continue
+        insert_enrichment(cur, item_id, rec)
+        status = 'ok' if rec['motifs'] else 'empty'
+        mark_enriched(cur, item_id, provenance, status)
+        stats[status] += 1
+    refresh_derived(conn, [r[0] for r in results if r[1] is not None])
+    conn.commit()
+    return stats
+
+
+def finish(conn):
+    """배치가 남긴(또는 중단된 이전 실행이 남긴) 낡은 집계를 한 번 다시 만든다"""
+    if aggregates_stale(conn):
+        print("Refreshing corpus aggregates ...")
+        refresh_aggregates(conn)
+        conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--out', default=BACKFILL_PATH, help="재빌드 때 다시 반영할 태깅 결과 JSONL")
+    parser.add_argument('--backend', default='anthropic',
+                        help="anthropic | stub | package.module:ClassName")
+    parser.add_argument('--workers', type=int, default=4, help="동시 요청 수")
+    parser.add_argument('--rpm', type=float, default=40, help="분당 최대 요청 수 (0 = 제한 없음)")
+    parser.add_argument('--batch-size', type=int, default=50, help="커밋 단위")
+    parser.add_argument('--limit', type=int, default=None, help="처리할 최대 자료 수")
+    parser.add_argument('--skip-failed', action='store_true', help="이전에 error 로 끝난 자료는 재시도하지 않음")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+    pending = find_pending_items(conn, args.limit, retry_failed=not args.skip_failed)
+    print(f"Pending items: {len(pending)}")
+    if not pending:
+        finish(conn)
+        return
+
+    backend = get_backend(args.backend)
+    zdicts = load_zdicts(conn)
+    limiter = RateLimiter(args.rpm)
+    totals = {'ok': 0, 'empty': 0, 'error': 0}
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for start in range(0, len(pending), args.batch_size):
+            batch = load_texts(conn, pending[start:start + args.batch_size], zdicts)
+            results = list(pool.map(lambda r: tag_one(backend, limiter, r[0], r[1]), batch))
+            stats = write_batch(conn, results, backend.name, args.out)
+            for k, v in stats.items():
+                totals[k] += v
+            print(f"  {start + len(batch)}/{len(pending)} processed "
+                  f"(ok {totals['ok']}, empty {totals['empty']}, error {totals['error']})")
+
+    finish(conn)
+    print(f"\nBackfill done via {backend.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+빌드 · 조회 벤치마크 — 합성 코퍼스로 규모별 빌드 단계 시간과 utils/db 조회 함수 시간을 잰다
+실행: python scripts/bench.py --items 10000 100000 [--repeat 20] [--out result.json]
+      python scripts/bench.py --items 10000 --save-baseline benchmarks/baseline.json
+      python scripts/bench.py --items 10000 --baseline benchmarks/baseline.json   (회귀 시 종료 코드 1)
+
+- 규모마다 scripts/gen_synthetic.py 로 코퍼스를 만들고(같은 seed 면 같은 데이터)
+  임시 디렉터리에 build_db.build() 로 빌드한다. 앱의 DB·기여 저장소·지오코딩 캐시는 건드리지 않는다.
+- 조회는 QUERY_CASES 에 등록된 함수마다 한 번 예열 후 --repeat 번 실행해 중앙값·p95 를 기록한다.
+  utils/db 에 conn 을 받는 공개 함수가 새로 생겼는데 등록되지 않았으면 경고를 출력한다.
+"""
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import utils.db as db
+from build_db import build
+from gen_synthetic import generate
+from utils.facets import get_items_by_nos, item_nos, load_facet_index
+from utils.motif_codes import motif_sort_key
+from utils.retrieval import search_passages
+
+# 회귀 판정: 기준보다 TOLERANCE 배 이상 느리고 절대 차이도 최소 폭 이상일 때
+TOLERANCE = 0.25
+MIN_DELTA_MS = {'build': 200.0, 'query': 1.0}
+
+# 조회 함수 → 호출 (ctx 는 샘플 id·키워드)
+QUERY_CASES = {
+    'get_db_version': lambda conn, ctx: db.get_db_version(conn),
+    'get_all_items': lambda conn, ctx: db.get_all_items(conn, ['설화']),
+    'get_item_by_id': lambda conn, ctx: db.get_item_by_id(conn, ctx['item_id']),
+    'get_item_text': lambda conn, ctx: db.get_item_text(conn, ctx['item_id']),
+    'get_item_llm_text': lambda conn, ctx: db.get_item_llm_text(conn, ctx['item_id'], max_tokens=2000),
+    'search_items_by_title': lambda conn, ctx: db.search_items_by_title(conn, ctx['title_kw']),
+    'search_items_by_motif': lambda conn, ctx: db.search_items_by_motif(conn, ctx['motif_code']),
+    'get_motifs_in_range': lambda conn, ctx: db.get_motifs_in_range(conn, ctx['motif_block']),
+    'count_motif_range': lambda conn, ctx: db.count_motif_range(conn, ctx['motif_chapter']),
+    'search_items_by_motif_range': lambda conn, ctx: db.search_items_by_motif_range(conn, ctx['motif_block']),
+    'get_motif_blocks': lambda conn, ctx: db.get_motif_blocks(conn, ctx['motif_chapter']),
+    'get_items_with_lat_lng': lambda conn, ctx: db.get_items_with_lat_lng(conn, ['설화', '민요']),
+    'get_items_with_lat_lng_in_region': lambda conn, ctx: db.get_items_with_lat_lng(
+        conn, ['설화', '민요'], ctx['region_code']),
+    'count_items_without_coords': lambda conn, ctx: db.count_items_without_coords(conn, ['설화']),
+    'count_items_without_coords_in_region': lambda conn, ctx: db.count_items_without_coords(
+        conn, None, ctx['region_code']),
+    'get_items_in_box': lambda conn, ctx: db.get_items_in_box(conn, 35.0, 127.5, 36.0, 129.0, ['설화', '민요']),
+    'get_density_grid': lambda conn, ctx: db.get_density_grid(conn, 'site', 20, ['설화', '민요', '무가']),
+    'get_density_grid_places': lambda conn, ctx: db.get_density_grid(conn, 'place', 40),
+    'get_regions': lambda conn, ctx: db.get_regions(conn, ctx['region_code']),
+    'get_region_tree': lambda conn, ctx: db.get_region_tree(conn),
+    'get_motifs_for_item': lambda conn, ctx: db.get_motifs_for_item(conn, ctx['item_id']),
+    'get_all_motifs': lambda conn, ctx: db.get_all_motifs(conn),
+    'search_motifs': lambda conn, ctx: db.search_motifs(conn, ctx['motif_q']),
+    'search_motifs_next': lambda conn, ctx: db.search_motifs(conn, '', cursor=ctx['motif_cursor']),
+    'count_motifs': lambda conn, ctx: db.count_motifs(conn, ctx['motif_q']),
+    'get_atu_types_for_item': lambda conn, ctx: db.get_atu_types_for_item(conn, ctx['item_id']),
+    'get_subjects_for_item': lambda conn, ctx: db.get_subjects_for_item(conn, ctx['item_id']),
+    'get_narrative_units': lambda conn, ctx: db.get_narrative_units(conn, ctx['item_id']),
+    'get_item_meta': lambda conn, ctx: db.get_item_meta(conn, ctx['item_id']),
+    'get_places_for_item': lambda conn, ctx: db.get_places_for_item(conn, ctx['item_id']),
+    'search_places_by_name': lambda conn, ctx: db.search_places_by_name(conn, ctx['place_kw']),
+    'resolve_place': lambda conn, ctx: db.resolve_place(conn, ctx['place_name']),
+    'get_place_aliases': lambda conn, ctx: db.get_place_aliases(conn, ctx['place_id']),
+    'get_items_by_place': lambda conn, ctx: db.get_items_by_place(conn, ctx['place_id']),
+    'get_items_by_place_name': lambda conn, ctx: db.get_items_by_place_name(conn, ctx['place_name']),
+    'get_narrative_geo_pairs': lambda conn, ctx: db.get_narrative_geo_pairs(conn, ctx['region_code'][0]),
+    'get_items_near': lambda conn, ctx: db.get_items_near(conn, *ctx['point'], radius_km=20),
+    'get_places_near': lambda conn, ctx: db.get_places_near(conn, *ctx['point'], radius_km=20),
+    'get_items_set_near': lambda conn, ctx: db.get_items_set_near(conn, *ctx['point'], radius_km=20),
+    'get_sample_pools': lambda conn, ctx: db.get_sample_pools(conn, 'motif'),
+    'sample_items': lambda conn, ctx: db.sample_items(conn),
+    'sample_items_by_motif': lambda conn, ctx: db.sample_items(conn, 'motif', ctx['motif_code'], k=5),
+    'get_discover_feed': lambda conn, ctx: db.get_discover_feed(conn),
+    'get_similar_items_by_motif': lambda conn, ctx: db.get_similar_items_by_motif(conn, ctx['item_id']),
+    'get_motif_neighbours': lambda conn, ctx: db.get_motif_neighbours(conn, ctx['motif_code']),
+    'get_motif_neighbours_by_count': lambda conn, ctx: db.get_motif_neighbours(conn, ctx['motif_code'], 'n_both'),
+    'get_motif_regions': lambda conn, ctx: db.get_motif_regions(conn, ctx['motif_code']),
+    'get_region_motifs': lambda conn, ctx: db.get_region_motifs(conn, ctx['region_code']),
+    'get_motif_atu_types': lambda conn, ctx: db.get_motif_atu_types(conn, ctx['motif_code']),
+    'get_network_regions': lambda conn, ctx: db.get_network_regions(conn),
+    'get_corpus_totals': lambda conn, ctx: db.get_corpus_totals(conn),
+    'get_category_stats': lambda conn, ctx: db.get_category_stats(conn),
+    'get_region_stats': lambda conn, ctx: db.get_region_stats(conn),
+    'get_district_stats': lambda conn, ctx: db.get_district_stats(conn, ctx['region']),
+    'get_top_motif_stats': lambda conn, ctx: db.get_top_motif_stats(conn),
+    'get_atu_stats': lambda conn, ctx: db.get_atu_stats(conn),
+    'get_era_stats': lambda conn, ctx: db.get_era_stats(conn),
+    'get_geocode_stats': lambda conn, ctx: db.get_geocode_stats(conn),
+    'get_enrichment_stats': lambda conn, ctx: db.get_enrichment_stats(conn),
+    'get_contributions_page': lambda conn, ctx: db.get_contributions_page(conn, status='pending'),
+    'get_contributions_page_by_region': lambda conn, ctx: db.get_contributions_page(conn, region_code='548'),
+    'get_contribution_by_id': lambda conn, ctx: db.get_contribution_by_id(conn, 1),
+    'get_contribution_regions': lambda conn, ctx: db.get_contribution_regions(conn),
+    'get_contribution_map_items': lambda conn, ctx: db.get_contribution_map_items(conn),
+    'search_passages': lambda conn, ctx: search_passages(conn, ctx['passage_q']),
+    'load_facet_index': lambda conn, ctx: load_facet_index(conn).bitmaps,
+    'facet_search': lambda conn, ctx: ctx['facet_index'].search(ctx['facet_selection'])[2],
+    'get_items_by_nos': lambda conn, ctx: get_items_by_nos(
+        conn, item_nos(ctx['facet_index'].match(ctx['facet_selection']), 50)),
+}
+
+# conn 을 받지만 조회가 아닌 함수
+NOT_QUERIES = {'execute_ddl'}
+
+
+def unregistered_queries():
+    """utils/db 의 conn 을 받는 공개 함수 중 QUERY_CASES 에 없는 것"""
+    missing = []
+    for name, fn in inspect.getmembers(db, inspect.isfunction):
+        if name.startswith('_') or fn.__module__ != db.__name__ or name in NOT_QUERIES:
+            continue
+        params = list(inspect.signature(fn).parameters)
+        if params[:1] == ['conn'] and name not in QUERY_CASES:
+            missing.append(name)
+    return missing
+
+
+def make_contributions(path, n):
+    """조회 벤치마크용 기여 저장소 (합성 기여 n 건)"""
+    conn = sqlite3.connect(path)
+    conn.executescript(db.CONTRIB_DDL)
+    rows = []
+    for i in range(n):
+        content = f"합성 기여 {i} " + "옛날에 스님이 살았는데 " * 40
+        rows.append((f"기여 설화 {i}", ['경남', '전남', '강원'][i % 3], '어느 군', '마을', '제보자', '2024',
+                     content, f"2024-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+                     ['pending', 'approved', 'promoted'][i % 3], db.make_preview(content)))
+    conn.executemany("""
+        INSERT INTO user_contributions
+            (title, region, district, location, narrator, collected_date, content, submitted_at, status, preview)
+        VALUES (?,?,?,?,?,?,?,?,?,?)
+    """, rows)
+    db._code_contribution_regions(conn)
+    conn.commit()
+    conn.close()
+
+
+def open_bench_conn(db_path, contrib_path):
+    """get_conn() 과 같은 구성이되 벤치마크용 파일을 가리키는 읽기 연결"""
+    conn = sqlite3.connect(db._sqlite_uri(db_path, 'rw'), uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute("ATTACH DATABASE ? AS contrib", (db._sqlite_uri(contrib_path, 'ro'),))
+    return conn
+
+
+def sample_context(conn):
+    """조회 인자로 쓸 대표 값 — 모티프·지명이 붙은 가장 흔한 경우를 고른다"""
+    item_id = conn.execute("""
+        SELECT i.id FROM item_motifs im JOIN item_places ip ON ip.item_no = im.item_no
+        JOIN items i ON i.item_no = im.item_no
+        GROUP BY im.item_no ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()[0]
+    top_motif = conn.execute(
+        "SELECT motif_code, motif_name, n_items FROM stats_motif ORDER BY n_items DESC, motif_code LIMIT 1"
+    ).fetchone()
+    place = conn.execute("""
+        SELECT id, place_name, lat, lng FROM canonical_places WHERE lat IS NOT NULL ORDER BY item_count DESC LIMIT 1
+    """).fetchone()
+    region = conn.execute("SELECT region FROM stats_region ORDER BY n_items DESC LIMIT 1").fetchone()
+    province = conn.execute(
+        "SELECT code FROM regions WHERE level = 1 ORDER BY n_items DESC LIMIT 1"
+    ).fetchone()
+    top_key = motif_sort_key(top_motif[0])[0] if top_motif else 'D1711'
+    return {
+        'item_id': item_id,
+        'title_kw': '호랑이',
+        'motif_code': top_motif[0] if top_motif else '',
+        'motif_block': top_key[:3] + 'xx',     # 가장 흔한 모티프가 든 백 단위 구간 (D17xx)
+        'motif_chapter': top_key[0],
+        # 코드 앞부분과 이름 한 글자 — 두 어절 교집합 (D1 술)
+        'motif_q': f"{top_motif[0][:2]} {(top_motif[1] or '')[-1:]}" if top_motif else 'D1 술',
+        'motif_cursor': (top_motif[2], top_motif[0]) if top_motif else None,
+        'place_id': place[0] if place else 0,
+        'place_name': place[1] if place else '',
+        'place_kw': (place[1] if place else '금강산')[:2],
+        'point': (place[2], place[3]) if place else (35.46, 128.21),
+        'region': region[0] if region else '',
+        'region_code': province[0] if province else '548',   # 가장 큰 시도
+        'passage_q': '스님이 도술을 부려 호랑이로 변신한 이야기',
+        'facet_index': load_facet_index(conn),
+        'facet_selection': {'region': [province[0]] if province else [],
+                            'motif': [top_motif[0]] if top_motif else []},
+    }
+
+
+def time_queries(conn, ctx, repeat):
+    results = {}
+    for name, call in QUERY_CASES.items():
+        rows = call(conn, ctx)  # 예열 (페이지 캐시·문장 캐시)
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            call(conn, ctx)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        if isinstance(rows, tuple):  # (rows, next_cursor) 형태의 페이지 조회
+            rows = rows[0]
+        results[name] = {
+            'median_ms': round(statistics.median(samples), 3),
+            'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            'rows': len(rows) if isinstance(rows, (list, dict)) else int(rows is not None),
+        }
+    return results
+
+
+def bench_scale(n_items, repeat, workdir, seed):
+    out = os.path.join(workdir, f"n{n_items}")
+    t0 = time.perf_counter()
+    csv_path, jsonl_path = generate(out, n_items, seed=seed)
+    gen_s = time.perf_counter() - t0
+
+    db_path = os.path.join(out, 'folklore.db')
+    contrib_path = os.path.join(out, 'contributions.db')
+    make_contributions(contrib_path, max(100, n_items // 50))
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        stages = build(db_path, progress=False, csv_path=csv_path, jsonl_path=jsonl_path,
+                       contrib_path=contrib_path, geocode_cache_path=os.path.join(out, 'geocode_cache.db'),
+                       backfill_path=os.path.join(out, 'motifs_backfill.jsonl'))
+        build_s = time.perf_counter() - t0
+
+    conn = open_bench_conn(db_path, contrib_path)
+    queries = time_queries(conn, sample_context(conn), repeat)
+    conn.close()
+    return {
+        'items': n_items,
+        'source_mb': round((os.path.getsize(csv_path) + os.path.getsize(jsonl_path)) / 1e6, 1),
+        'db_mb': round(os.path.getsize(db_path) / 1e6, 1),
+        'generate_ms': round(gen_s * 1000, 1),
+        'build_ms': round(build_s * 1000, 1),
+        'build_stages_ms': {label: round(sec * 1000, 1) for label, sec in stages},
+        'queries': queries,
+    }
+
+
+def compare(results, baseline):
+    """기준 대비 회귀 목록 [(규모, 항목, 기준 ms, 현재 ms)]"""
+    regressions = []
+
+    def check(scale, label, kind, b, c):
+        if b is not None and c is not None and c > b * (1 + TOLERANCE) and c - b >= MIN_DELTA_MS[kind]:
+            regressions.append((scale, label, b, c))
+
+    for scale, cur in results['scales'].items():
+        base = baseline.get('scales', {}).get(scale)
+        if not base:
+            continue
+        check(scale, 'build', 'build', base.get('build_ms'), cur['build_ms'])
+        for label, ms in cur['build_stages_ms'].items():
+            check(scale, f"build:{label}", 'build', base.get('build_stages_ms', {}).get(label), ms)
+        for name, q in cur['queries'].items():
+            check(scale, name, 'query', base.get('queries', {}).get(name, {}).get('median_ms'), q['median_ms'])
+    return regressions
+
+
+def print_scale(r):
+    print(f"\n== {r['items']:,} items  (source {r['source_mb']} MB → db {r['db_mb']} MB)")
+    print(f"build {r['build_ms']:>10.1f} ms")
+    for label, ms in r['build_stages_ms'].items():
+        print(f"  {label:<20} {ms:>10.1f} ms")
+    for name, q in sorted(r['queries'].items(), key=lambda kv: -kv[1]['median_ms']):
+        print(f"  {name:<30} {q['median_ms']:>9.3f} ms  p95 {q['p95_ms']:>9.3f}  rows {q['rows']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[10000], help="측정할 코퍼스 규모들")
+    parser.add_argument('--repeat', type=int, default=20, help="조회 함수당 반복 횟수")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--workdir', help="합성 코퍼스·DB 를 남길 디렉터리 (기본: 임시 디렉터리, 끝나면 삭제)")
+    parser.add_argument('--out', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--save-baseline', help="이번 결과를 기준으로 저장")
+    args = parser.parse_args()
+
+    for name in unregistered_queries():
+        print(f"WARNING: utils.db.{name} 가 QUERY_CASES 에 없습니다 — 벤치마크에 추가하세요")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='folklore-bench-')
+    results = {'python': sys.version.split()[0], 'sqlite': sqlite3.sqlite_version,
+               'seed': args.seed, 'repeat': args.repeat, 'created_at': time.time(), 'scales': {}}
+    try:
+        for n in args.items:
+            r = bench_scale(n, args.repeat, workdir, args.seed)
+            results['scales'][str(n)] = r
+            print_scale(r)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for path in filter(None, [args.out, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"saved: {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for scale, label, b, c in regressions:
+            print(f"REGRESSION [{scale}] {label}: {b} → {c} ms")
+        if regressions:
+            sys.exit(1)
+        print("기준 대비 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+페이지 기동 시간 벤치마크 — 모듈 import 시간과 첫 렌더링 시간
+실행: python scripts/bench_startup.py [--repeat 5] [--out result.json]
+      python scripts/bench_startup.py --save-baseline benchmarks/startup_baseline.json
+      python scripts/bench_startup.py --baseline benchmarks/startup_baseline.json   (회귀 시 종료 코드 1)
+
+- import: 페이지 최상위 import 문만 새 파이썬 프로세스에서 실행한 시간.
+  이때 anthropic · folium 같은 무거운 모듈이 올라오면 'heavy' 에 기록한다 (지연 import 약속 위반).
+- render: streamlit.testing.v1.AppTest 로 페이지를 한 번 실행한 시간 (새 프로세스, streamlit import 제외).
+매 측정을 새 프로세스에서 하므로 콜드 스타트 기준이고, 반복 측정의 중앙값을 쓴다.
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PAGES = [os.path.join(ROOT_DIR, 'app.py')] + sorted(glob.glob(os.path.join(ROOT_DIR, 'pages', '*.py')))
+
+# 페이지 최상위에서 import 되면 안 되는 모듈 (기능을 쓸 때 불러온다)
+HEAVY_MODULES = ('anthropic', 'folium', 'streamlit_folium', 'pandas', 'dotenv')
+
+# 회귀 판정: 기준보다 TOLERANCE 배 이상 느리고 절대 차이도 MIN_DELTA_MS 이상일 때
+TOLERANCE = 0.25
+MIN_DELTA_MS = 30.0
+
+IMPORT_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+{imports}
+ms = (time.perf_counter() - t0) * 1000
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{'ms': ms, 'heavy': heavy}}))
+"""
+
+RENDER_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout={timeout})
+at.run()
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({{'ms': ms, 'exceptions': [e.message for e in at.exception]}}))
+"""
+
+
+def top_level_imports(path):
+    """페이지 모듈 최상위의 import 문 (함수·블록 안의 지연 import 는 제외)"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def run_snippet(code):
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT_DIR)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(snippet, repeat):
+    runs = [run_snippet(snippet) for _ in range(repeat)]
+    errors = [r['error'] for r in runs if 'error' in r]
+    if errors:
+        return {'error': errors[0]}
+    result = {'ms': round(statistics.median(r['ms'] for r in runs), 1)}
+    for key in ('heavy', 'exceptions'):
+        if key in runs[0]:
+            result[key] = runs[0][key]
+    return result
+
+
+def bench_page(path, repeat, timeout, render=True):
+    imports = top_level_imports(path)
+    result = {
+        'imports': imports,
+        'import': measure(IMPORT_SNIPPET.format(
+            root=ROOT_DIR, imports='\n'.join(imports), heavy=HEAVY_MODULES), repeat),
+    }
+    if render:
+        result['render'] = measure(RENDER_SNIPPET.format(root=ROOT_DIR, path=path, timeout=timeout), repeat)
+    return result
+
+
+def compare(results, baseline):
+    """기준 대비 회귀 목록 [(페이지, 항목, 기준 ms, 현재 ms)]"""
+    regressions = []
+    for page, cur in results['pages'].items():
+        base = baseline.get('pages', {}).get(page)
+        if not base:
+            continue
+        for kind in ('import', 'render'):
+            b, c = base.get(kind, {}).get('ms'), cur.get(kind, {}).get('ms')
+            if b is None or c is None:
+                continue
+            if c > b * (1 + TOLERANCE) and c - b >= MIN_DELTA_MS:
+                regressions.append((page, kind, b, c))
+        if cur.get('import', {}).get('heavy'):
+            regressions.append((page, 'heavy', base.get('import', {}).get('heavy'), cur['import']['heavy']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--timeout', type=float, default=60, help="페이지 1회 실행 제한 시간(초)")
+    parser.add_argument('--no-render', action='store_true', help="import 시간만 측정")
+    parser.add_argument('--pages', nargs='*', help="측정할 페이지 파일 (기본: 전체)")
+    parser.add_argument('--out', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--save-baseline', help="이번 결과를 기준으로 저장")
+    args = parser.parse_args()
+
+    pages = [os.path.abspath(p) for p in args.pages] if args.pages else PAGES
+    results = {'python': sys.version.split()[0], 'repeat': args.repeat, 'created_at': time.time(), 'pages': {}}
+    for path in pages:
+        name = os.path.relpath(path, ROOT_DIR)
+        r = bench_page(path, args.repeat, args.timeout, render=not args.no_render)
+        results['pages'][name] = r
+        imp, ren = r['import'], r.get('render', {})
+        line = f"{name:<40} import {imp.get('ms', '-'):>8} ms"
+        if not args.no_render:
+            line += f"   render {ren.get('ms', '-'):>8} ms"
+        if imp.get('heavy'):
+            line += f"   heavy: {', '.join(imp['heavy'])}"
+        for err in filter(None, [imp.get('error'), ren.get('error')] + (ren.get('exceptions') or [])):
+            line += f"\n    ! {err}"
+        print(line)
+
+    for path in filter(None, [args.out, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"saved: {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for page, kind, b, c in regressions:
+            print(f"REGRESSION {page} {kind}: {b} → {c}")
+        if regressions:
+            sys.exit(1)
+        print("기준 대비 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
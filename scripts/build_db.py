@@ -1,87 +1,169 @@
 """
 CSV + JSONL → SQLite (data/folklore.db) 빌드 스크립트
 실행: python scripts/build_db.py
+
+      python scripts/build_db.py --snapshot   (배포용 압축 스냅샷 포함)
+      python scripts/build_db.py --csv 합성.csv --jsonl 합성.jsonl --db /tmp/synth.db   (다른 원천·경로로 빌드)
+
+사용자 기여(contributions.db)는 별도 파일이라 재빌드해도 지워지지 않는다.
+임시 파일에 빌드한 뒤 교체하므로 빌드 중에도 기존 DB로 계속 서비스된다.
 """
+import argparse
 import sqlite3
 import csv
 import json
 import os
+import sys
+import time
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.bootstrap import SNAPSHOT_PATH, install_db, release_build_lock, write_progress, write_snapshot
+from utils.db import CONTRIB_DB_PATH, SCHEMA_VERSION
+from utils.density import build_density
+from utils.facets import build_facets
+from utils.geocode import GEOCODE_CACHE_PATH, geocode_names, resolve_location
+from utils.motif_codes import build_motif_terms, motif_sort_key
+from utils.motif_network import build_motif_network
+from utils.motif_tagging import normalize_draft
+from utils.places import build_canonical_places, geocode_item_places, item_canonical_ids
+from utils.regions import build_region_codes
+from utils.retrieval import build_passage_index
+from utils.sampler import build_sample_pools
+from utils.spatial import build_spatial_index
+from utils.stats import build_stats
+from utils.texts import (
+    TEXT_DDL, build_normalized_texts, compress_text, current_zdict, store_zdict, train_zdict,
+)
+
 CSV_PATH = os.path.join(ROOT_DIR, 'items_설화.csv')
 JSONL_PATH = os.path.join(ROOT_DIR, 'motifs_merged.jsonl')
 DB_PATH = os.path.join(ROOT_DIR, 'folklore.db')
+# AI 태깅 결과(scripts/backfill_motifs.py) — folklore.db 는 재빌드마다 지워지므로 밖에 쌓아 두고 빌드 때 다시 반영
+BACKFILL_PATH = os.path.join(ROOT_DIR, 'motifs_backfill.jsonl')
 
+# items.id 는 원자료의 문자열 id(화면·API 에서 쓰는 값), item_no 는 내부 조인용 정수 키.
+# 링크 테이블은 (item_no, ...) 복합 기본키의 WITHOUT ROWID 테이블이라 자료별 조회가 기본키 범위 읽기 한 번이다.
+# 전사본(context · content)은 utils/texts 의 item_texts 에 압축해 두고 items 에는 본문 길이만 남긴다.
 DDL = """
 CREATE TABLE IF NOT EXISTS items (
-    id TEXT PRIMARY KEY,
+    item_no INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
     source TEXT, code TEXT, region TEXT, district TEXT,
     category TEXT, title TEXT, collectors TEXT, date TEXT,
-    location TEXT, narrator TEXT, context TEXT, content TEXT,
-    audio_file TEXT, lat REAL, lng REAL
+    location TEXT, narrator TEXT, content_len INTEGER NOT NULL DEFAULT 0,
+    audio_file TEXT, lat REAL, lng REAL,
+    region_code TEXT
 );
 
 CREATE TABLE IF NOT EXISTS motifs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     motif_code TEXT UNIQUE,
-    motif_name TEXT
+    motif_name TEXT,
+    sort_key TEXT,
+    depth INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS item_motifs (
-    item_id TEXT REFERENCES items(id),
-    motif_id INTEGER REFERENCES motifs(id)
-);
+    item_no INTEGER NOT NULL REFERENCES items(item_no),
+    motif_id INTEGER NOT NULL REFERENCES motifs(id),
+    PRIMARY KEY (item_no, motif_id)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS atu_types (
-    item_id TEXT REFERENCES items(id),
-    atu_type TEXT
-);
+    item_no INTEGER NOT NULL REFERENCES items(item_no),
+    atu_type TEXT NOT NULL,
+    PRIMARY KEY (item_no, atu_type)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS subjects (
-    item_id TEXT REFERENCES items(id),
-    subject TEXT
-);
+    item_no INTEGER NOT NULL REFERENCES items(item_no),
+    subject TEXT NOT NULL,
+    PRIMARY KEY (item_no, subject)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS places (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     place_name TEXT UNIQUE,
     lat REAL,
     lng REAL,
-    geocode_status TEXT
+    geocode_status TEXT,
+    geocode_confidence REAL,
+    canonical_id INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS item_places (
-    item_id TEXT REFERENCES items(id),
-    place_id INTEGER REFERENCES places(id)
-);
+    item_no INTEGER NOT NULL REFERENCES items(item_no),
+    place_id INTEGER NOT NULL REFERENCES places(id),
+    PRIMARY KEY (item_no, place_id)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS narrative_units (
-    item_id TEXT REFERENCES items(id),
-    unit_order INTEGER,
-    unit_text TEXT
-);
+    item_no INTEGER NOT NULL REFERENCES items(item_no),
+    unit_order INTEGER NOT NULL,
+    unit_text TEXT,
+    PRIMARY KEY (item_no, unit_order)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS item_meta (
-    item_id TEXT PRIMARY KEY REFERENCES items(id),
+    item_no INTEGER PRIMARY KEY REFERENCES items(item_no),
     structure TEXT,
     era TEXT
 );
 
-CREATE TABLE IF NOT EXISTS user_contributions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT,
-    region TEXT,
-    district TEXT,
-    location TEXT,
-    narrator TEXT,
-    collected_date TEXT,
-    content TEXT,
-    submitted_at TEXT,
-    motif_draft TEXT,
-    status TEXT DEFAULT 'pending'
+CREATE TABLE IF NOT EXISTS item_enrichment (
+    item_no INTEGER PRIMARY KEY REFERENCES items(item_no),
+    provenance TEXT,
+    status TEXT,
+    error TEXT,
+    enriched_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS build_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
 );
 """
 
+CONTRIB_ITEM_PREFIX = 'contrib-'
+
+ITEM_COLUMNS = (
+    'id', 'source', 'code', 'region', 'district', 'category', 'title', 'collectors', 'date',
+    'location', 'narrator', 'content_len', 'audio_file', 'lat', 'lng',
+)
+# 같은 id 를 다시 넣어도 item_no 가 바뀌지 않도록 REPLACE 대신 UPSERT
+UPSERT_ITEM_SQL = (
+    f"INSERT INTO items ({', '.join(ITEM_COLUMNS)}) VALUES ({','.join('?' * len(ITEM_COLUMNS))}) "
+    f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in ITEM_COLUMNS[1:])}"
+)
+
+ITEM_TEXT_SQL = (
+    "INSERT OR REPLACE INTO item_texts (item_no, dict_id, context, content) "
+    "SELECT item_no, ?, ?, ? FROM items WHERE id = ?"
+)
+
+# 승격·보강처럼 일부 자료만 바뀔 때 다시 돌리는 파생 구조 단계 — 모두 (conn, item_ids) 시그니처
+INCREMENTAL_STAGES = [
+    build_region_codes,
+    build_normalized_texts,
+    build_passage_index,
+    geocode_item_places,
+    build_canonical_places,
+    build_spatial_index,
+    build_motif_terms,
+]
+
+# 코퍼스 전체 집계 — lift · 밀도 칸 · 비트맵 · 빽빽한 풀 칸 번호는 자료 몇 편만으로 고칠 수 없어 통째로 다시 만든다.
+# 배치마다 돌리지 않고 승격·보강 작업이 끝난 뒤 한 번 돌린다 (refresh_aggregates)
+AGGREGATE_STAGES = [
+    build_stats,
+    build_density,
+    build_motif_network,
+    build_facets,
+    build_sample_pools,
+]
+
 
 def safe_float(val):
     try:
@@ -90,26 +172,32 @@ def safe_float(val):
         return None
 
 
-def load_csv(conn):
+def load_csv(conn, path=CSV_PATH):
     cur = conn.cursor()
-    print("Loading items_설화.csv ...")
-    with open(CSV_PATH, encoding='utf-8-sig') as f:
+    print(f"Loading {os.path.basename(path)} ...")
+    with open(path, encoding='utf-8-sig') as f:
         reader = csv.DictReader(f)
-        rows = []
+        rows, texts = [], []
         for row in reader:
+            content = row.get('content') or ''
             rows.append((
                 row.get('id'), row.get('source'), row.get('code'),
                 row.get('region'), row.get('district'), row.get('category'),
                 row.get('title'), row.get('collectors'), row.get('date'),
-                row.get('location'), row.get('narrator'), row.get('context'),
-                row.get('content'), row.get('audio_file'),
+                row.get('location'), row.get('narrator'), len(content),
+                row.get('audio_file'),
                 safe_float(row.get('lat')), safe_float(row.get('lng')),
             ))
-    cur.executemany(
-        "INSERT OR REPLACE INTO items VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-        rows
-    )
-    print(f"  → {len(rows)} items inserted")
+            texts.append((row.get('id'), row.get('context') or '', content))
+    cur.executemany(UPSERT_ITEM_SQL, rows)
+
+    zdict = train_zdict([t for _, context, content in texts for t in (content, context)])
+    dict_id = store_zdict(cur, zdict)
+    cur.executemany(ITEM_TEXT_SQL, [
+        (dict_id, compress_text(context, zdict), compress_text(content, zdict), item_id)
+        for item_id, context, content in texts
+    ])
+    print(f"  → {len(rows)} items inserted (text dictionary {len(zdict) // 1024} KB)")
     conn.commit()
 
 
@@ -126,7 +214,11 @@ def get_or_create_motif(cur, motif_str):
     row = cur.fetchone()
     if row:
         return row[0]
-    cur.execute("INSERT INTO motifs (motif_code, motif_name) VALUES (?,?)", (code, name))
+    sort_key, depth = motif_sort_key(code)
+    cur.execute(
+        "INSERT INTO motifs (motif_code, motif_name, sort_key, depth) VALUES (?,?,?,?)",
+        (code, name, sort_key, depth)
+    )
     return cur.lastrowid
 
 
@@ -147,11 +239,100 @@ def get_or_create_place(cur, place_dict):
     return cur.lastrowid
 
 
-def load_jsonl(conn):
+def item_no_for(cur, item_id):
+    """문자열 id → items.item_no (없으면 None)"""
+    row = cur.execute("SELECT item_no FROM items WHERE id = ?", (item_id,)).fetchone()
+    return row[0] if row else None
+
+
+def insert_enrichment(cur, item_id, rec):
+    """모티프·ATU·주제어·지명·서사단락·메타 레코드 하나를 정규화 테이블에 기록 (items 에 없는 id 는 건너뜀)"""
+    item_no = item_no_for(cur, item_id)
+    if item_no is None:
+        return
+    # motifs
+    for motif_str in rec.get('motifs', []):
+        if not motif_str:
+            continue
+        mid = get_or_create_motif(cur, motif_str)
+        cur.execute(
+            "INSERT OR IGNORE INTO item_motifs (item_no, motif_id) VALUES (?,?)",
+            (item_no, mid)
+        )
+
+    # atu_types
+    for atu in rec.get('atu_types', []):
+        if atu:
+            cur.execute(
+                "INSERT OR IGNORE INTO atu_types (item_no, atu_type) VALUES (?,?)",
+                (item_no, atu)
+            )
+
+    # subjects
+    for subj in rec.get('subjects', []):
+        if subj:
+            cur.execute(
+                "INSERT OR IGNORE INTO subjects (item_no, subject) VALUES (?,?)",
+                (item_no, subj)
+            )
+
+    # place_coords
+    for pc in rec.get('place_coords', []):
+        pid = get_or_create_place(cur, pc)
+        if pid:
+            cur.execute(
+                "INSERT OR IGNORE INTO item_places (item_no, place_id) VALUES (?,?)",
+                (item_no, pid)
+            )
+
+    # places — 태깅 백엔드가 낸 지명 이름 (좌표는 지오코딩 단계가 채운다)
+    for name in rec.get('places', []):
+        pid = get_or_create_place(cur, {'name': name, 'status': None})
+        if pid:
+            cur.execute(
+                "INSERT OR IGNORE INTO item_places (item_no, place_id) VALUES (?,?)",
+                (item_no, pid)
+            )
+
+    # narrative_units (list or string)
+    nu = rec.get('narrative_units', '')
+    if isinstance(nu, list):
+        for i, unit in enumerate(nu):
+            if unit:
+                cur.execute(
+                    "INSERT OR REPLACE INTO narrative_units (item_no, unit_order, unit_text) VALUES (?,?,?)",
+                    (item_no, i, unit)
+                )
+    elif isinstance(nu, str) and nu.strip():
+        cur.execute(
+            "INSERT OR REPLACE INTO narrative_units (item_no, unit_order, unit_text) VALUES (?,?,?)",
+            (item_no, 0, nu.strip())
+        )
+
+    # item_meta (structure, era)
+    structure = rec.get('structure', '')
+    era = rec.get('era', '')
+    if structure or era:
+        cur.execute(
+            "INSERT OR REPLACE INTO item_meta (item_no, structure, era) VALUES (?,?,?)",
+            (item_no, structure, era)
+        )
+
+
+def mark_enriched(cur, item_id, provenance, status='ok', error=None):
+    """item_enrichment 에 출처(jsonl / 백엔드 이름)와 처리 상태를 남긴다"""
+    cur.execute(
+        "INSERT OR REPLACE INTO item_enrichment (item_no, provenance, status, error, enriched_at) "
+        "SELECT item_no, ?, ?, ?, datetime('now') FROM items WHERE id = ?",
+        (provenance, status, error, item_id)
+    )
+
+
+def load_jsonl(conn, path=JSONL_PATH):
     cur = conn.cursor()
-    print("Loading motifs_merged.jsonl ...")
+    print(f"Loading {os.path.basename(path)} ...")
     count = 0
-    with open(JSONL_PATH, encoding='utf-8') as f:
+    with open(path, encoding='utf-8') as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -165,64 +346,8 @@ def load_jsonl(conn):
             if not item_id:
                 continue
 
-            # motifs
-            for motif_str in rec.get('motifs', []):
-                if not motif_str:
-                    continue
-                mid = get_or_create_motif(cur, motif_str)
-                cur.execute(
-                    "INSERT OR IGNORE INTO item_motifs (item_id, motif_id) VALUES (?,?)",
-                    (item_id, mid)
-                )
-
-            # atu_types
-            for atu in rec.get('atu_types', []):
-                if atu:
-                    cur.execute(
-                        "INSERT INTO atu_types (item_id, atu_type) VALUES (?,?)",
-                        (item_id, atu)
-                    )
-
-            # subjects
-            for subj in rec.get('subjects', []):
-                if subj:
-                    cur.execute(
-                        "INSERT INTO subjects (item_id, subject) VALUES (?,?)",
-                        (item_id, subj)
-                    )
-
-            # place_coords
-            for pc in rec.get('place_coords', []):
-                pid = get_or_create_place(cur, pc)
-                if pid:
-                    cur.execute(
-                        "INSERT OR IGNORE INTO item_places (item_id, place_id) VALUES (?,?)",
-                        (item_id, pid)
-                    )
-
-            # narrative_units (list or string)
-            nu = rec.get('narrative_units', '')
-            if isinstance(nu, list):
-                for i, unit in enumerate(nu):
-                    if unit:
-                        cur.execute(
-                            "INSERT INTO narrative_units (item_id, unit_order, unit_text) VALUES (?,?,?)",
-                            (item_id, i, unit)
-                        )
-            elif isinstance(nu, str) and nu.strip():
-                cur.execute(
-                    "INSERT INTO narrative_units (item_id, unit_order, unit_text) VALUES (?,?,?)",
-                    (item_id, 0, nu.strip())
-                )
-
-            # item_meta (structure, era)
-            structure = rec.get('structure', '')
-            era = rec.get('era', '')
-            if structure or era:
-                cur.execute(
-                    "INSERT OR REPLACE INTO item_meta (item_id, structure, era) VALUES (?,?,?)",
-                    (item_id, structure, era)
-                )
+            insert_enrichment(cur, item_id, rec)
+            mark_enriched(cur, item_id, 'jsonl')
 
             count += 1
             if count % 5000 == 0:
@@ -233,38 +358,365 @@ def load_jsonl(conn):
     print(f"  → {count} JSONL records processed")
 
 
+def geocode_places(conn, redo=False, cache_path=GEOCODE_CACHE_PATH):
+    """좌표 없는 places 를 지명집으로 지오코딩. redo=True 면 지명집으로 찾았던 것도 다시 계산."""
+    print("Geocoding places against gazetteer ...")
+    sql = "SELECT id, place_name FROM places WHERE lat IS NULL OR lng IS NULL"
+    if redo:
+        sql += " OR geocode_status IN ('exact', 'normalized', 'fuzzy')"
+    rows = conn.execute(sql).fetchall()
+    results = geocode_names([r[1] for r in rows], cache_path=cache_path)
+    conn.executemany(
+        "UPDATE places SET lat = ?, lng = ?, geocode_status = ?, geocode_confidence = ? WHERE id = ?",
+        [(results[name]['lat'], results[name]['lng'], results[name]['status'],
+          results[name]['confidence'], pid) for pid, name in rows]
+    )
+    conn.commit()
+    resolved = sum(1 for _, name in rows if results[name]['status'] != 'failed')
+    print(f"  → {resolved}/{len(rows)} places resolved")
+    return resolved
+
+
+def build_stats_tables(conn):
+    print("Computing aggregate stats ...")
+    build_stats(conn)
+    conn.commit()
+    print("  → Done")
+
+
+def build_density_grids(conn):
+    print("Computing map density grids ...")
+    n = build_density(conn)
+    conn.commit()
+    print(f"  → {n} grid cells")
+
+
+def build_motif_cooccurrence(conn):
+    print("Computing motif co-occurrence ...")
+    n = build_motif_network(conn)
+    conn.commit()
+    print(f"  → {n} motifs linked")
+
+
+def build_facet_bitmaps(conn):
+    print("Building facet bitmaps ...")
+    n = build_facets(conn)
+    conn.commit()
+    print(f"  → {n} facet values")
+
+
+def build_random_pools(conn):
+    print("Building random sampling pools ...")
+    n = build_sample_pools(conn)
+    conn.commit()
+    print(f"  → {n} pools")
+
+
+def build_place_aliases(conn):
+    print("Normalizing place names ...")
+    n = build_canonical_places(conn)
+    conn.commit()
+    print(f"  → {n} canonical places")
+
+
+def build_radius_index(conn):
+    print("Building spatial index ...")
+    n = build_spatial_index(conn)
+    conn.commit()
+    print(f"  → {n} collection sites indexed")
+
+
+def build_motif_lookup(conn):
+    print("Indexing motif codes and names ...")
+    n = build_motif_terms(conn)
+    conn.commit()
+    print(f"  → {n} motifs indexed")
+
+
+def bump_db_version(conn):
+    """페이지 캐시 키로 쓰는 db_version 갱신 — 재빌드·승격마다 새 값"""
+    conn.execute(
+        "INSERT OR REPLACE INTO build_meta (key, value) VALUES ('db_version', ?)",
+        (str(time.time_ns()),)
+    )
+
+
+def refresh_derived(conn, item_ids, dropped_place_ids=()):
+    """item_ids 에 대해서만 파생 구조를 갱신 (전체 재빌드 없이). 커밋은 호출자가 한다.
+
+    dropped_place_ids 는 갱신 전 그 자료들이 가리키던 대표 지명 — 끊긴 쪽의 설화 수도 다시 센다.
+    코퍼스 집계는 낡았다고 표시만 해 두고, 작업 끝에 refresh_aggregates 가 한 번 다시 만든다.
+    """
+    stage_args = {build_canonical_places: {'dropped_ids': dropped_place_ids}}
+    for stage in INCREMENTAL_STAGES:
+        stage(conn, item_ids, **stage_args.get(stage, {}))
+    conn.execute("INSERT OR REPLACE INTO build_meta (key, value) VALUES ('aggregates_stale', '1')")
+    bump_db_version(conn)
+
+
+def aggregates_stale(conn):
+    """refresh_derived 뒤 아직 집계를 다시 만들지 않았는지 (중단된 작업 포함)"""
+    return conn.execute("SELECT 1 FROM build_meta WHERE key = 'aggregates_stale'").fetchone() is not None
+
+
+def refresh_aggregates(conn):
+    """AGGREGATE_STAGES 를 한 번 다시 만든다. 커밋은 호출자가 한다."""
+    for stage in AGGREGATE_STAGES:
+        stage(conn)
+    conn.execute("DELETE FROM build_meta WHERE key = 'aggregates_stale'")
+    bump_db_version(conn)
+
+
+# ─── 기여 승격 ────────────────────────────────────────────────────────────────
+
+def contribution_item_id(contribution_id):
+    return f"{CONTRIB_ITEM_PREFIX}{contribution_id}"
+
+
+def clear_enrichment(cur, item_id):
+    item_no = item_no_for(cur, item_id)
+    for table in ('item_motifs', 'atu_types', 'subjects', 'item_places',
+                  'narrative_units', 'item_meta', 'item_enrichment'):
+        cur.execute(f"DELETE FROM {table} WHERE item_no = ?", (item_no,))
+
+
+def upsert_contribution_item(cur, c, dropped_place_ids=None):
+    """기여 한 건을 items 와 정규화 테이블에 반영 (재승격해도 같은 결과). item_id 반환
+
+    dropped_place_ids (집합)를 주면 지우기 전 이 자료가 가리키던 대표 지명 id 를 모은다.
+    """
+    item_id = contribution_item_id(c['id'])
+    if dropped_place_ids is not None:
+        dropped_place_ids |= item_canonical_ids(cur, [item_id])
+    # 기여에는 좌표가 없으므로 지명집에서 기초 → 광역 순으로 채록지 좌표를 찾는다
+    hit = resolve_location(c.get('district'), c.get('region')) or {}
+    content = c.get('content') or ''
+    cur.execute(
+        UPSERT_ITEM_SQL,
+        (item_id, '기여', None, c.get('region'), c.get('district'), '설화',
+         c.get('title'), None, c.get('collected_date'), c.get('location'),
+         c.get('narrator'), len(content), None, hit.get('lat'), hit.get('lng'))
+    )
+    dict_id, zdict = current_zdict(cur)
+    cur.execute(ITEM_TEXT_SQL, (dict_id, None, compress_text(content, zdict), item_id))
+    clear_enrichment(cur, item_id)
+    try:
+        rec = normalize_draft(c.get('motif_draft') or '')
+    except ValueError:
+        rec = {}
+    insert_enrichment(cur, item_id, rec)
+    # 채록 장소 · 시군도 지명으로 남긴다 — 좌표와 대표 지명은 증분 지오코딩 · 지명 정규화 단계가 채운다
+    item_no = item_no_for(cur, item_id)
+    for name in (c.get('location'), c.get('district')):
+        pid = get_or_create_place(cur, {'name': name or '', 'status': None})
+        if pid:
+            cur.execute("INSERT OR IGNORE INTO item_places (item_no, place_id) VALUES (?,?)", (item_no, pid))
+    mark_enriched(cur, item_id, 'contribution', 'ok' if rec.get('motifs') else 'empty')
+    return item_id
+
+
+def promote_contributions(conn, contributions):
+    """기여 묶음을 승격하고 파생 구조를 증분 갱신. 한 트랜잭션으로 커밋."""
+    cur = conn.cursor()
+    dropped = set()
+    item_ids = [upsert_contribution_item(cur, dict(c), dropped) for c in contributions]
+    refresh_derived(conn, item_ids, dropped)
+    conn.commit()
+    return item_ids
+
+
+def load_backfill(conn, path=BACKFILL_PATH):
+    """재빌드 시 backfill_motifs 의 태깅 결과를 다시 반영 (같은 id 는 마지막 줄이 유효).
+
+    원천 JSONL 에서 이미 모티프를 받은 자료는 백필 대상이 아니었으므로 건너뛴다.
+    """
+    if not os.path.exists(path):
+        return
+    print(f"Loading {os.path.basename(path)} ...")
+    latest = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue    # 중단으로 잘린 마지막 줄
+            if isinstance(rec, dict) and rec.get('id'):
+                latest[rec['id']] = rec
+    cur = conn.cursor()
+    count = 0
+    for item_id, rec in latest.items():
+        item_no = item_no_for(cur, item_id)
+        if item_no is None or cur.execute(
+            "SELECT 1 FROM item_motifs WHERE item_no = ? LIMIT 1", (item_no,)
+        ).fetchone():
+            continue
+        if rec.get('status') != 'error':
+            insert_enrichment(cur, item_id, rec)
+        mark_enriched(cur, item_id, rec.get('provenance') or 'backfill', rec.get('status') or 'ok', rec.get('error'))
+        count += 1
+    conn.commit()
+    print(f"  → {count} tagged items re-applied")
+
+
+def load_promoted_contributions(conn, path=CONTRIB_DB_PATH):
+    """재빌드 시 이미 승격된 기여를 다시 items 에 반영"""
+    if not os.path.exists(path):
+        return
+    src = sqlite3.connect(path)
+    src.row_factory = sqlite3.Row
+    try:
+        rows = src.execute("SELECT * FROM user_contributions WHERE status = 'promoted'").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        src.close()
+    print("Loading promoted contributions ...")
+    cur = conn.cursor()
+    for r in rows:
+        upsert_contribution_item(cur, dict(r))
+    conn.commit()
+    print(f"  → {len(rows)} contributions re-applied")
+
+
+INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_items_region ON items(region)",
+    # 권역 · 시도 · 시군 필터 (utils/regions) — 코드 범위 + 좌표 순 커버링 인덱스
+    "CREATE INDEX IF NOT EXISTS idx_items_region_code ON items(region_code, lat, lng, id, title, region, district, category, location)",
+    "CREATE INDEX IF NOT EXISTS idx_items_title ON items(title, id, region, district, category)",
+    # 지도 목록 · 좌표 누락 집계 — 카테고리 + 좌표 순 커버링 인덱스
+    "CREATE INDEX IF NOT EXISTS idx_items_category ON items(category, lat, lng, id, title, region, district, location)",
+    "CREATE INDEX IF NOT EXISTS idx_item_motifs_motif ON item_motifs(motif_id, item_no)",
+    "CREATE INDEX IF NOT EXISTS idx_item_places_place ON item_places(place_id, item_no)",
+    "CREATE INDEX IF NOT EXISTS idx_motifs_code ON motifs(motif_code, motif_name)",
+    # 모티프 장 · 번호 구간 · 하위 코드 질의 (utils/motif_codes) — 정렬 키 범위 읽기
+    "CREATE INDEX IF NOT EXISTS idx_motifs_sort ON motifs(sort_key, id)",
+    "CREATE INDEX IF NOT EXISTS idx_places_geo ON places(lat, lng, place_name)",
+]
+
+
 def build_indexes(conn):
     cur = conn.cursor()
     print("Building indexes ...")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_region ON items(region)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_category ON items(category)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_item_motifs_item ON item_motifs(item_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_item_motifs_motif ON item_motifs(motif_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_atu_item ON atu_types(item_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_subjects_item ON subjects(item_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_places_name ON places(place_name)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_item_places_item ON item_places(item_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_nu_item ON narrative_units(item_id)")
+    # 링크 테이블의 (item_no, ...) 방향은 기본키가 맡고, 여기서는 역방향·정렬·커버링 인덱스를 만든다.
+    # 전사본이 든 items 행은 크므로 목록 조회는 필요한 컬럼만 담은 커버링 인덱스로 읽는다.
+    for ddl in INDEX_DDL:
+        cur.execute(ddl)
     conn.commit()
     print("  → Done")
 
 
-def main():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-        print(f"Removed existing {DB_PATH}")
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    conn.executescript(DDL)
+def normalize_regions(conn):
+    print("Normalizing regions to hierarchy codes ...")
+    n = build_region_codes(conn)
+    conn.commit()
+    print(f"  → {n} items coded")
+
+
+def normalize_texts(conn):
+    print("Normalizing transcripts ...")
+    n = build_normalized_texts(conn)
     conn.commit()
+    print(f"  → {n} transcripts normalized")
 
-    load_csv(conn)
-    load_jsonl(conn)
-    build_indexes(conn)
-    conn.close()
-    print(f"\nDB built: {DB_PATH}")
+
+def build_search_index(conn):
+    print("Building passage search index ...")
+    n = build_passage_index(conn)
+    conn.commit()
+    print(f"  → {n} items indexed")
+
+
+# 빌드 단계 — (진행 상황 표시 이름, 함수)
+BUILD_STAGES = [
+    ("원천 자료 적재", load_csv),
+    ("모티프·지명 적재", load_jsonl),
+    ("기여 자료 반영", load_promoted_contributions),
+    ("AI 태깅 결과 반영", load_backfill),
+    ("지역 코드 정규화", normalize_regions),
+    ("본문 정규화", normalize_texts),
+    ("지명 지오코딩", geocode_places),
+    ("지명 정규화", build_place_aliases),
+    ("인덱스 생성", build_indexes),
+    ("검색 색인", build_search_index),
+    ("공간 색인", build_radius_index),
+    ("모티프 찾기 색인", build_motif_lookup),
+    ("집계 통계", build_stats_tables),
+    ("지도 밀도 격자", build_density_grids),
+    ("모티프 연결망", build_motif_cooccurrence),
+    ("다면 검색 비트맵", build_facet_bitmaps),
+    ("무작위 추천 풀", build_random_pools),
+]
+
+
+def build(db_path, progress=True, csv_path=CSV_PATH, jsonl_path=JSONL_PATH,
+          contrib_path=CONTRIB_DB_PATH, geocode_cache_path=GEOCODE_CACHE_PATH, backfill_path=BACKFILL_PATH):
+    """db_path 에 새 DB를 만든다. 임시 파일에 빌드한 뒤 이름을 바꾸므로 중간 상태는 보이지 않는다.
+
+    반환값은 단계별 소요 시간 [(단계 이름, 초)] (벤치마크용).
+    """
+    stage_args = {
+        load_csv: {'path': csv_path},
+        load_jsonl: {'path': jsonl_path},
+        load_promoted_contributions: {'path': contrib_path},
+        load_backfill: {'path': backfill_path},
+        geocode_places: {'cache_path': geocode_cache_path},
+    }
+    timings = []
+    tmp_path = f"{db_path}.building"
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+
+    report = write_progress if progress else (lambda **kw: None)
+    report(state='running', pid=os.getpid(), stage='스키마 생성', step=0,
+           total=len(BUILD_STAGES), started_at=time.time(), error=None)
+    if progress:
+        release_build_lock()    # 앱이 띄운 빌드라면 이제 진행 상황으로 알아볼 수 있다
+    try:
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(DDL + TEXT_DDL)
+        conn.commit()
+
+        for step, (label, stage) in enumerate(BUILD_STAGES, 1):
+            report(stage=label, step=step - 1)
+            t0 = time.perf_counter()
+            stage(conn, **stage_args.get(stage, {}))
+            timings.append((label, time.perf_counter() - t0))
+        bump_db_version(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO build_meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+        conn.execute("ANALYZE")  # 플래너 통계 (sqlite_stat1) — 인덱스 선택이 코퍼스 분포를 따르도록
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        install_db(tmp_path, db_path)
+    except Exception as e:
+        report(state='failed', error=f"{type(e).__name__}: {e}")
+        raise
+    report(state='done', stage='완료', step=len(BUILD_STAGES))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV + JSONL → SQLite 빌드")
+    parser.add_argument('--csv', default=CSV_PATH, help="원천 items CSV")
+    parser.add_argument('--jsonl', default=JSONL_PATH, help="모티프 보강 JSONL")
+    parser.add_argument('--db', default=DB_PATH, help="만들 DB 경로")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="빌드 후 배포용 압축 스냅샷(folklore_snapshot.db.gz)도 만든다")
+    args = parser.parse_args()
+
+    # 기본 DB 가 아닌 곳에 빌드할 때는(벤치마크 등) 앱이 보는 진행 상황 파일을 건드리지 않는다
+    build(args.db, progress=args.db == DB_PATH, csv_path=args.csv, jsonl_path=args.jsonl)
+    print(f"\nDB built: {args.db}")
+    if args.snapshot:
+        write_snapshot(args.db)
+        print(f"Snapshot written: {SNAPSHOT_PATH}")
 
 
 if __name__ == '__main__':
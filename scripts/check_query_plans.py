@@ -0,0 +1,136 @@
+"""
+utils/db 조회 함수의 실행 계획 점검 — 모든 조회가 인덱스를 타고 테이블 전체 스캔으로 떨어지지 않는지 확인
+실행: python scripts/check_query_plans.py              (합성 코퍼스로 임시 DB 를 만들어 점검)
+      python scripts/check_query_plans.py --db folklore.db   (기존 DB 점검)
+      python scripts/check_query_plans.py -v          (함수별 실행 계획 출력)
+
+scripts/bench.py 의 QUERY_CASES 를 그대로 호출하면서 실제로 실행된 SQL 과 인자를 모아
+EXPLAIN QUERY PLAN 을 확인한다. 위반이 있으면 종료 코드 1.
+- 'SCAN 테이블' (전체 스캔) 과 'SCAN 테이블 USING [COVERING] INDEX' (인덱스 전체 순회) 는 위반.
+  전체 목록을 돌려주는 것이 목적인 함수만 ALLOWED_SCANS 에 이유와 함께 등록해 허용한다
+- FTS 가상 테이블, CTE 결과, 빌드 때 미리 집계한 작은 stats_* 테이블 스캔은 허용
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import utils.db as db
+from bench import QUERY_CASES, make_contributions, sample_context, unregistered_queries
+from build_db import build
+from gen_synthetic import generate
+from utils.profiling import Profiler, TracedConnection, explain
+
+# 전체 순회를 허용하는 함수와 이유
+ALLOWED_SCANS = {
+    'get_all_items': "카테고리 필터가 없으면 전체 목록 — 목록 컬럼 커버링 인덱스만 읽는다",
+    'search_items_by_title': "부분 문자열 LIKE — 제목 커버링 인덱스만 읽는다",
+    'get_all_motifs': "모티프 전체 목록 (코드 순 커버링 인덱스)",
+    'get_contribution_map_items': "기여 전체 목록 — 기여 수만큼 작다",
+    'load_facet_index': "facet 비트맵 전체를 메모리에 올린다 (db_version 별 한 번)",
+}
+
+SCAN_RE = re.compile(r'^\s*SCAN (\S+)(?: (VIRTUAL TABLE|USING .*))?$')
+
+
+def check_plan(name, plan_lines, cte_names):
+    """실행 계획에서 위반 줄 목록"""
+    violations = []
+    for line in plan_lines:
+        m = SCAN_RE.match(line)
+        if not m:
+            continue
+        table, how = m.group(1), m.group(2) or ''
+        bare = table.split('.')[-1]
+        if how == 'VIRTUAL TABLE' or bare in cte_names or bare.startswith('stats_'):
+            continue
+        if name in ALLOWED_SCANS:
+            continue
+        violations.append(line.strip())
+    return violations
+
+
+def cte_names(sql):
+    """WITH 절 이름과 그 별칭 (계획에는 별칭으로 나온다)"""
+    names = set(re.findall(r'(?:\bWITH|,)\s*(\w+)\s*(?:\([\w\s,]*\))?\s+AS\s*\(', sql, flags=re.I))
+    for cte in list(names):
+        names.update(re.findall(rf'\b(?:FROM|JOIN)\s+{cte}\s+(?:AS\s+)?(\w+)', sql, flags=re.I))
+    return names
+
+
+def open_traced(db_path, contrib_path):
+    conn = sqlite3.connect(db._sqlite_uri(db_path, 'ro'), uri=True, factory=TracedConnection)
+    conn.row_factory = sqlite3.Row
+    conn.execute("ATTACH DATABASE ? AS contrib", (db._sqlite_uri(contrib_path, 'ro'),))
+    return conn
+
+
+def run_checks(conn, verbose=False):
+    ctx = sample_context(conn)
+    failures = {}
+    for name, call in QUERY_CASES.items():
+        profiler = Profiler(name)
+        conn.profiler = profiler
+        call(conn, ctx)
+        conn.profiler = None
+        for stmt in profiler.statements:
+            plan = explain(conn, stmt['sql'], stmt['params'] or ()) or []
+            bad = check_plan(name, plan, cte_names(stmt['sql']))
+            if verbose:
+                print(f"## {name}{'  ✗' if bad else ''}\n" + '\n'.join(f"   {line}" for line in plan))
+            if bad:
+                failures.setdefault(name, []).extend(bad)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="점검할 DB (기본: 합성 코퍼스로 임시 빌드)")
+    parser.add_argument('--contrib-db', default=db.CONTRIB_DB_PATH, help="--db 와 함께 쓸 기여 저장소")
+    parser.add_argument('--items', type=int, default=3000, help="임시 빌드 코퍼스 규모")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    missing = unregistered_queries()
+    for name in missing:
+        print(f"FAIL {name}: QUERY_CASES 에 등록되지 않아 실행 계획을 점검할 수 없습니다")
+
+    workdir = None
+    try:
+        if args.db:
+            db_path, contrib_path = args.db, args.contrib_db
+        else:
+            workdir = tempfile.mkdtemp(prefix='folklore-plans-')
+            csv_path, jsonl_path = generate(workdir, args.items)
+            db_path = os.path.join(workdir, 'folklore.db')
+            contrib_path = os.path.join(workdir, 'contributions.db')
+            make_contributions(contrib_path, 200)
+            with contextlib.redirect_stdout(io.StringIO()):
+                build(db_path, progress=False, csv_path=csv_path, jsonl_path=jsonl_path,
+                      contrib_path=contrib_path, geocode_cache_path=os.path.join(workdir, 'geocode_cache.db'),
+                      backfill_path=os.path.join(workdir, 'motifs_backfill.jsonl'))
+        conn = open_traced(db_path, contrib_path)
+        failures = run_checks(conn, args.verbose)
+        conn.close()
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for name, lines in failures.items():
+        for line in lines:
+            print(f"FAIL {name}: {line}")
+    if failures or missing:
+        sys.exit(1)
+    print(f"OK — {len(QUERY_CASES)}개 조회 함수 모두 인덱스 사용")
+
+
+if __name__ == '__main__':
+    main()
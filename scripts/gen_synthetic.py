@@ -0,0 +1,228 @@
+"""
+합성 코퍼스 생성기 — 규모별 성능 측정용 items_설화.csv / motifs_merged.jsonl
+실행: python scripts/gen_synthetic.py --out /tmp/synth --items 100000 [--seed 7]
+      python scripts/build_db.py --csv /tmp/synth/items_설화.csv --jsonl /tmp/synth/motifs_merged.jsonl --db /tmp/synth/folklore.db
+
+실제 코퍼스의 분포를 흉내 낸다.
+- 모티프 · ATU 유형 · 서사 지명 · 채록지는 Zipf 분포 (소수가 아주 많이 쓰이고 긴 꼬리가 있다)
+- 서사 지명은 지명집 지명(좌표 있음)과 지명집에 없는 마을·골짜기 이름, 띄어쓰기 이형 표기가 섞인다
+- 지역명은 '경상남도' / '경남' / 공백 붙은 값처럼 표기가 흔들린다
+- 전사본은 구술 말투의 긴 본문 (수백~수만 자, 일부는 비어 있음)
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.geocode import GAZETTEER_PATH
+
+CSV_NAME = 'items_설화.csv'
+JSONL_NAME = 'motifs_merged.jsonl'
+CSV_COLUMNS = [
+    'id', 'source', 'code', 'region', 'district', 'category', 'title', 'collectors', 'date',
+    'location', 'narrator', 'context', 'content', 'audio_file', 'lat', 'lng',
+]
+
+# (광역 표기들, 기초 지역, 위도, 경도)
+DISTRICTS = [
+    (('경상남도', '경남'), '창녕군', 35.54, 128.49), (('경상남도', '경남'), '밀양시', 35.50, 128.75),
+    (('경상남도', '경남'), '거창군', 35.69, 127.91), (('경상남도', '경남'), '진주시', 35.18, 128.11),
+    (('경상북도', '경북'), '안동시', 36.57, 128.73), (('경상북도', '경북'), '경주시', 35.86, 129.22),
+    (('경상북도', '경북'), '영덕군', 36.42, 129.37), (('전라남도', '전남'), '해남군', 34.57, 126.60),
+    (('전라남도', '전남'), '보성군', 34.77, 127.08), (('전라남도', '전남'), '신안군', 34.83, 126.35),
+    (('전라북도', '전북'), '정읍시', 35.57, 126.86), (('전라북도', '전북'), '남원시', 35.42, 127.39),
+    (('충청남도', '충남'), '부여군', 36.28, 126.91), (('충청남도', '충남'), '공주시', 36.45, 127.12),
+    (('충청북도', '충북'), '괴산군', 36.81, 127.79), (('충청북도', '충북'), '단양군', 36.98, 128.37),
+    (('강원도', '강원'), '양구군', 38.10, 127.99), (('강원도', '강원'), '강릉시', 37.75, 128.88),
+    (('강원도', '강원'), '정선군', 37.38, 128.66), (('경기도', '경기'), '수원시', 37.26, 127.03),
+    (('경기도', '경기'), '양평군', 37.49, 127.49), (('경기도', '경기'), '강화군', 37.75, 126.49),
+    (('제주도', '제주'), '서귀포시', 33.25, 126.56), (('제주도', '제주'), '제주시', 33.50, 126.53),
+]
+CATEGORIES = ['설화'] * 6 + ['민요'] * 2 + ['무가', '현대 구전설화']
+ERAS = ['조선', '고려', '삼국', '근대', '미상', '']
+
+# 모티프 이름 · 제목 · 본문 재료
+CHARACTERS = ['스님', '호랑이', '도깨비', '여우', '장수', '효자', '며느리', '나무꾼', '선비', '용',
+              '구렁이', '신선', '과부', '머슴', '원님', '장자', '거지', '아기장수', '까치', '두꺼비']
+EVENTS = ['변신', '보은', '복수', '홍수', '탐색', '시험', '혼인', '출생', '죽음', '재생',
+          '금기', '속임수', '도술', '승천', '징벌', '내기', '발복', '명당', '지혜', '우애']
+TITLE_PATTERNS = [
+    '{c_ga} {e}한 이야기', '{p} {c} 전설', '{c_wa} {c2}', '{e_eul} 당한 {c}', '{p}의 유래',
+    '{c} 이야기', '{c}의 {e}', '{p}에 얽힌 {e} 이야기',
+]
+SENTENCES = [
+    '옛날에 {p} 밑에 {c_ga} 하나 살았는데', '그래가지고 {c_ga} {e_eul} 하게 됐어요',
+    '인자 그 {c2_ga} 가만히 보니까', '그런께 {p}에 가서 사흘 밤을 지냈다 그래',
+    '그 {c_ga} 말이지 {e_eul} 했다 그래요', '그래서 동네 사람들이 {p_eul} 찾아갔는데',
+    '아 그런데 {c2_ga} 나타나서 하는 말이', '그 뒤로 {p_eul} {e} 자리라고 부른다 카대',
+    '옛날 어른들한테 들은 얘긴데', '그러니까 그게 다 {e} 때문이라 이거지',
+]
+FILLERS = ['', '', ' 음', ' 그래', ' 인자', ' 뭐']
+PLACE_SUFFIXES = ['마을', '골', '재', '고개', '바위', '못', '산', '봉', '내', '섬', '사']
+SYLLABLES = '가나다라마바사아자차카타파하고노도로모보소오조초구누두루무부수우주추금은옥용학봉연송매죽'
+
+MOTIF_LETTERS = 'ABCDEFGHJKLMNQRSTVWZ'
+
+
+def josa(word, with_final, without_final):
+    """받침 유무에 맞는 조사를 붙인다 (호랑이가 / 나무꾼이)"""
+    last = word[-1] if word else ''
+    has_final = '가' <= last <= '힣' and (ord(last) - 0xAC00) % 28 != 0
+    return word + (with_final if has_final else without_final)
+
+
+class ZipfSampler:
+    """rank k 의 가중치가 1/k^s 인 이산 분포 (누적 가중치 + 이분 탐색)"""
+
+    def __init__(self, values, s, rng):
+        self.values = values
+        self.rng = rng
+        self.cum = list(itertools.accumulate(1.0 / (k ** s) for k in range(1, len(values) + 1)))
+
+    def sample(self, k=1):
+        return self.rng.choices(self.values, cum_weights=self.cum, k=k)
+
+    def sample_distinct(self, k):
+        picked = []
+        for _ in range(k * 4):
+            v = self.sample()[0]
+            if v not in picked:
+                picked.append(v)
+                if len(picked) == k:
+                    break
+        return picked
+
+
+def load_gazetteer_places():
+    places = []
+    with open(GAZETTEER_PATH, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['kind'] in ('mountain', 'temple', 'island', 'historic', 'city', 'district'):
+                places.append((row['name'], float(row['lat']), float(row['lng'])))
+    return places
+
+
+def make_motifs(n, rng):
+    """'D1711.2-도술 스님' 형태 모티프 문자열 n 개 (상위 코드와 하위 코드가 섞인다)"""
+    motifs, seen = [], set()
+    while len(motifs) < n:
+        code = f"{rng.choice(MOTIF_LETTERS)}{rng.randint(0, 2999)}"
+        if rng.random() < 0.4:
+            code += f".{rng.randint(1, 9)}"
+        if code in seen:
+            continue
+        seen.add(code)
+        name = f"{rng.choice(EVENTS)}하는 {rng.choice(CHARACTERS)}" if rng.random() < 0.5 else \
+            f"{rng.choice(CHARACTERS)}의 {rng.choice(EVENTS)}"
+        motifs.append(f"{code}-{name}")
+    return motifs
+
+
+def make_places(n, gazetteer, rng):
+    """서사 지명 레코드 n 개 — 지명집 지명(좌표 있음) 뒤에 지명집에 없는 지명, 일부는 이형 표기"""
+    places = [{'name': name, 'lat': lat, 'lng': lng, 'status': 'ok'} for name, lat, lng in gazetteer]
+    rng.shuffle(places)
+    while len(places) < n:
+        base = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) + rng.choice(PLACE_SUFFIXES)
+        places.append({'name': base, 'lat': None, 'lng': None, 'status': 'failed'})
+    places = places[:n]
+    # 띄어쓰기 이형 (금강 산) — 같은 장소의 다른 표기로 정규화 단계를 거치게 한다
+    for p in rng.sample(places, k=len(places) // 10):
+        if len(p['name']) > 2:
+            places.append({'name': f"{p['name'][:-1]} {p['name'][-1]}", 'lat': None, 'lng': None, 'status': 'failed'})
+    return places
+
+
+def make_transcript(rng, fill):
+    """구술 말투 전사본 — 길이는 로그정규 분포(중앙값 약 2천 자), 15% 는 비어 있다"""
+    if rng.random() < 0.15:
+        return ''
+    target = min(int(rng.lognormvariate(math.log(2000), 0.9)), 60000)
+    parts, size = [], 0
+    while size < target:
+        s = rng.choice(SENTENCES).format(**fill()) + rng.choice(FILLERS) + '. '
+        parts.append(s)
+        size += len(s)
+    return ''.join(parts)
+
+
+def generate(out_dir, n_items, seed=7, enriched_ratio=0.7, n_motifs=None, n_places=None, zipf_s=1.1):
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    n_motifs = n_motifs or max(200, n_items // 8)
+    n_places = n_places or max(150, n_items // 20)
+
+    motif_sampler = ZipfSampler(make_motifs(n_motifs, rng), zipf_s, rng)
+    place_records = make_places(n_places, load_gazetteer_places(), rng)
+    place_sampler = ZipfSampler(place_records, zipf_s, rng)
+    district_sampler = ZipfSampler(DISTRICTS, 0.8, rng)
+    atu_sampler = ZipfSampler([f"ATU {n}" for n in rng.sample(range(1, 2400), 300)], zipf_s, rng)
+
+    def fill():
+        c, c2, e = rng.choice(CHARACTERS), rng.choice(CHARACTERS), rng.choice(EVENTS)
+        p = place_sampler.sample()[0]['name']
+        return {'c': c, 'c2': c2, 'e': e, 'p': p,
+                'c_ga': josa(c, '이', '가'), 'c2_ga': josa(c2, '이', '가'), 'c_wa': josa(c, '과', '와'),
+                'e_eul': josa(e, '을', '를'), 'p_eul': josa(p, '을', '를')}
+
+    csv_path = os.path.join(out_dir, CSV_NAME)
+    jsonl_path = os.path.join(out_dir, JSONL_NAME)
+    with open(csv_path, 'w', encoding='utf-8-sig', newline='') as fc, \
+            open(jsonl_path, 'w', encoding='utf-8') as fj:
+        writer = csv.writer(fc)
+        writer.writerow(CSV_COLUMNS)
+        for i in range(n_items):
+            item_id = f"syn{i:07d}"
+            names, district, lat, lng = district_sampler.sample()[0]
+            region = rng.choice(names) + (' ' if rng.random() < 0.05 else '')
+            has_coords = rng.random() < 0.85
+            writer.writerow([
+                item_id, '대계', f"S{i}", region, district, rng.choice(CATEGORIES),
+                rng.choice(TITLE_PATTERNS).format(**fill()),
+                '채록자', str(rng.randint(1979, 2019)), f"{district} {rng.choice(SYLLABLES)}{rng.choice(SYLLABLES)}리",
+                f"{rng.choice('김이박최정강조윤장임')}씨", '마을회관에서', make_transcript(rng, fill), '',
+                f"{lat + rng.uniform(-0.15, 0.15):.6f}" if has_coords else '',
+                f"{lng + rng.uniform(-0.15, 0.15):.6f}" if has_coords else '',
+            ])
+            if rng.random() >= enriched_ratio:
+                continue
+            rec = {
+                'id': item_id,
+                'motifs': motif_sampler.sample_distinct(rng.randint(1, 6)),
+                'atu_types': atu_sampler.sample_distinct(rng.randint(0, 2)),
+                'subjects': rng.sample(CHARACTERS + EVENTS, k=rng.randint(1, 4)),
+                'place_coords': place_sampler.sample_distinct(rng.randint(0, 3)),
+                'narrative_units': [rng.choice(SENTENCES).format(**fill()) for _ in range(rng.randint(2, 8))],
+                'structure': '-'.join(rng.sample(EVENTS, k=2)),
+                'era': rng.choice(ERAS),
+            }
+            fj.write(json.dumps(rec, ensure_ascii=False) + '\n')
+    return csv_path, jsonl_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help="출력 디렉터리")
+    parser.add_argument('--items', type=int, default=10000, help="자료 수")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--enriched-ratio', type=float, default=0.7, help="모티프 보강 레코드가 있는 자료 비율")
+    parser.add_argument('--motifs', type=int, help="모티프 어휘 크기 (기본: 자료 수/8)")
+    parser.add_argument('--places', type=int, help="서사 지명 수 (기본: 자료 수/20)")
+    parser.add_argument('--zipf', type=float, default=1.1, help="Zipf 지수 s")
+    args = parser.parse_args()
+
+    csv_path, jsonl_path = generate(args.out, args.items, args.seed, args.enriched_ratio,
+                                    args.motifs, args.places, args.zipf)
+    for path in (csv_path, jsonl_path):
+        print(f"{path}  ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+기존 DB의 places 를 지명집(data/gazetteer.csv)으로 다시 지오코딩
+실행: python scripts/geocode_places.py [--redo]
+
+지명집을 고친 뒤 전체 재빌드 없이 좌표를 갱신할 때 쓴다. 이름별 결과는 geocode_cache.db 에 남는다.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from build_db import DB_PATH, bump_db_version, geocode_places
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--redo', action='store_true', help="지명집으로 찾았던 지명도 다시 계산")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA busy_timeout=5000")
+    start = time.perf_counter()
+    geocode_places(conn, redo=args.redo)
+    bump_db_version(conn)
+    conn.commit()
+    conn.close()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
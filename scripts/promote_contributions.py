@@ -0,0 +1,83 @@
+"""
+사용자 기여를 items 로 승격하는 배치 작업
+실행: python scripts/promote_contributions.py [--ids 3 7] [--status pending]
+
+- motif_draft 를 검증·정규화해 motifs / item_motifs / atu_types / narrative_units / item_meta 에 반영한다.
+- 채록 장소(location)와 시군(district)은 places / item_places 에 지명으로 남겨 지오코딩·지명 정규화 단계가 잇는다.
+- 배치마다 한 트랜잭션으로 items 와 파생 구조(검색 인덱스 등)를 증분 갱신하고 db_version 을 올린다.
+- 통계 · 밀도 격자 · 모티프 연결망 · 다면 검색 · 추천 풀은 모든 배치가 끝난 뒤 한 번 다시 만든다.
+- 커밋이 끝난 배치만 기여 저장소에서 status = 'promoted' 로 바뀐다.
+  중간에 멈춰도 다시 실행하면 같은 결과로 이어진다 (item id = contrib-<기여 id>).
+- folklore.db 가 아직 없거나 빌드가 도는 중이면 실행하지 않는다 (빌드가 끝나며 DB 를 바꿔 끼우면 승격이 사라진다).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from build_db import DB_PATH, aggregates_stale, promote_contributions, refresh_aggregates
+from utils.bootstrap import build_in_progress
+from utils.db import BUSY_TIMEOUT_MS, CONTRIB_DB_PATH, _sqlite_uri, contrib_transaction
+
+
+def load_candidates(status, ids=None):
+    src = sqlite3.connect(CONTRIB_DB_PATH)
+    src.row_factory = sqlite3.Row
+    sql = "SELECT * FROM user_contributions WHERE status = ?"
+    params = [status]
+    if ids:
+        sql += f" AND id IN ({','.join('?' * len(ids))})"
+        params.extend(ids)
+    rows = src.execute(sql + " ORDER BY id", params).fetchall()
+    src.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--status', default='pending', help="승격할 기여 상태")
+    parser.add_argument('--ids', type=int, nargs='*', help="특정 기여 id 만 승격")
+    parser.add_argument('--batch-size', type=int, default=100, help="트랜잭션 단위")
+    args = parser.parse_args()
+
+    if not os.path.exists(CONTRIB_DB_PATH):
+        print(f"No contributions store at {CONTRIB_DB_PATH}")
+        return
+
+    if build_in_progress():
+        sys.exit("A database build is in progress — run this again after it finishes.")
+    # mode=rw — 없는 DB 를 빈 파일로 만들지 않는다
+    try:
+        conn = sqlite3.connect(_sqlite_uri(os.path.abspath(args.db), 'rw'), uri=True)
+    except sqlite3.OperationalError:
+        sys.exit(f"No database at {args.db} — build it first (python scripts/build_db.py)")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+    rows = load_candidates(args.status, args.ids)
+    print(f"Contributions to promote: {len(rows)}")
+    done = 0
+    for start in range(0, len(rows), args.batch_size):
+        if build_in_progress():
+            conn.close()
+            sys.exit(f"A database build started — stopped after {done}/{len(rows)}; run this again after it finishes.")
+        batch = rows[start:start + args.batch_size]
+        promote_contributions(conn, batch)
+        with contrib_transaction() as wconn:
+            wconn.executemany(
+                "UPDATE user_contributions SET status = 'promoted' WHERE id = ?",
+                [(r['id'],) for r in batch]
+            )
+        done += len(batch)
+        print(f"  {done}/{len(rows)} promoted")
+    if aggregates_stale(conn):
+        print("Refreshing corpus aggregates ...")
+        refresh_aggregates(conn)
+        conn.commit()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""
+DB 준비 — 스냅샷 복원 · 백그라운드 빌드 · 빌드 진행 상황
+
+첫 실행에서 folklore.db 가 없으면
+  1) 함께 배포된 압축 스냅샷(folklore_snapshot.db.gz)이 있으면 몇 초 안에 풀어서 바로 서비스하고,
+  2) 없으면 scripts/build_db.py 를 별도 프로세스로 띄운 뒤 즉시 반환한다.
+빌드는 임시 파일에 만든 뒤 이름을 바꾸므로 folklore.db 가 보이면 항상 완성된 DB다.
+진행 상황은 build_progress.json 에 기록되고 페이지는 require_db() 로 이를 보여준다.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from utils.db import BUSY_TIMEOUT_MS, DB_PATH, SCHEMA_VERSION, _sqlite_uri
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BUILD_SCRIPT = os.path.join(ROOT_DIR, 'scripts', 'build_db.py')
+PROGRESS_PATH = os.path.join(ROOT_DIR, 'build_progress.json')
+BUILD_LOCK_PATH = f"{PROGRESS_PATH}.lock"     # 빌드 프로세스를 띄우는 동안만 있는 잠금 파일
+BUILD_LOG_PATH = os.path.join(ROOT_DIR, 'build.log')
+SNAPSHOT_PATH = os.path.join(ROOT_DIR, 'folklore_snapshot.db.gz')
+SNAPSHOT_META_PATH = os.path.join(ROOT_DIR, 'folklore_snapshot.json')
+SOURCE_PATHS = [
+    os.path.join(ROOT_DIR, 'items_설화.csv'),
+    os.path.join(ROOT_DIR, 'motifs_merged.jsonl'),
+]
+
+
+# ─── 진행 상황 ────────────────────────────────────────────────────────────────
+
+def write_progress(path=PROGRESS_PATH, **fields):
+    """진행 상황 JSON 을 원자적으로 갱신 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    state = read_build_progress(path) or {}
+    state.update(fields, updated_at=time.time())
+    tmp = f"{path}.{os.getpid()}.tmp"   # 쓰는 프로세스마다 다른 임시 파일
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_build_progress(path=PROGRESS_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def build_running():
+    progress = read_build_progress()
+    return bool(progress and progress.get('state') == 'running' and _pid_alive(progress.get('pid')))
+
+
+def build_in_progress():
+    """빌드가 돌고 있거나 막 띄워지는 중인지 — 끝나면 install_db 가 folklore.db 를 바꿔 끼운다"""
+    return build_running() or os.path.exists(BUILD_LOCK_PATH)
+
+
+# ─── 스냅샷 ──────────────────────────────────────────────────────────────────
+
+def source_fingerprint(paths=SOURCE_PATHS):
+    """원천 CSV/JSONL 내용 해시 — 스냅샷이 어떤 원천으로 만들어졌는지 비교용"""
+    h = hashlib.sha1()
+    for path in paths:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def write_snapshot(db_path=DB_PATH, snapshot_path=SNAPSHOT_PATH, meta_path=SNAPSHOT_META_PATH):
+    with open(db_path, 'rb') as src, gzip.open(snapshot_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': source_fingerprint(), 'schema_version': SCHEMA_VERSION, 'created_at': time.time(),
+                   'db_bytes': os.path.getsize(db_path),
+                   'snapshot_bytes': os.path.getsize(snapshot_path)}, f)
+
+
+# 세션은 한 프로세스의 스레드라 첫 요청이 겹치면 복원도 겹친다 — 한 번에 하나만, 먼저 끝난 복원을 재사용
+_restore_lock = threading.Lock()
+
+
+def restore_snapshot(snapshot_path=SNAPSHOT_PATH, db_path=DB_PATH):
+    """스냅샷을 임시 파일로 풀어 DB 자리에 옮긴다. 스냅샷이 없으면 False"""
+    if not os.path.exists(snapshot_path):
+        return False
+    with _restore_lock:
+        if os.path.exists(db_path) and schema_is_current(db_path):
+            return True
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(db_path), prefix=os.path.basename(db_path) + '.restoring.')
+        try:
+            with gzip.open(snapshot_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            install_db(tmp, db_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return True
+
+
+def _snapshot_meta(meta_path=SNAPSHOT_META_PATH):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def snapshot_is_current(meta_path=SNAPSHOT_META_PATH):
+    meta = _snapshot_meta(meta_path)
+    if not meta:
+        return False
+    current = source_fingerprint()
+    return current is None or meta.get('source') == current
+
+
+def snapshot_schema_matches(meta_path=SNAPSHOT_META_PATH):
+    """스냅샷이 지금 코드의 테이블 구조로 만들어졌는지 (아니면 풀어도 쓸 수 없다)"""
+    return _snapshot_meta(meta_path).get('schema_version') == SCHEMA_VERSION
+
+
+def _checkpoint(path, journal_mode=None):
+    """WAL 을 DB 파일에 모두 옮기고 비운다. 읽는 연결 때문에 끝내지 못하면 OperationalError"""
+    conn = sqlite3.connect(_sqlite_uri(path, 'rw'), uri=True, timeout=BUSY_TIMEOUT_MS / 1000)
+    try:
+        busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            raise sqlite3.OperationalError(f"WAL checkpoint busy: {path}")
+        if journal_mode:
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    finally:
+        conn.close()
+
+
+def install_db(built_path, db_path=DB_PATH):
+    """완성된 DB 파일을 원자적으로 교체.
+
+    새 DB 는 WAL 을 비우고 rollback 저널로 바꿔 파일 하나로 만든 뒤 본 파일만 옮긴다.
+    이전 DB 의 -wal · -shm 은 열린 연결들이 함께 쓰고 있으므로 지우지 않고,
+    체크포인트로 WAL 만 비워 이전 프레임이 새 DB 위에 겹쳐 읽히지 않게 한다.
+    """
+    _checkpoint(built_path, journal_mode='DELETE')
+    if os.path.exists(db_path):
+        _checkpoint(db_path)
+    os.replace(built_path, db_path)
+
+
+# ─── 백그라운드 빌드 ──────────────────────────────────────────────────────────
+
+def start_background_build():
+    """빌드 프로세스를 띄우고 바로 반환. 이미 돌고 있으면 아무것도 하지 않는다.
+
+    진행 상황은 빌드 프로세스만 쓴다. 잠금 파일은 빌드가 첫 진행 상황을 쓰고 나서 지우므로
+    그사이에 다른 세션이 빌드를 또 띄우지 않는다 (빌드가 그 전에 죽으면 60초 뒤 오래된 잠금으로 치운다).
+    """
+    if build_running():
+        return False
+    lock_path = BUILD_LOCK_PATH
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        # 다른 세션이 막 띄우는 중 — 오래된 잠금이면 치우고 다음 호출에서 다시 시도
+        if time.time() - os.path.getmtime(lock_path) > 60:
+            os.remove(lock_path)
+        return False
+    try:
+        log = open(BUILD_LOG_PATH, 'ab')
+        subprocess.Popen(
+            [sys.executable, BUILD_SCRIPT],
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True, cwd=ROOT_DIR,
+        )
+    except OSError:
+        os.remove(lock_path)
+        raise
+    finally:
+        os.close(fd)
+    return True
+
+
+def release_build_lock():
+    """빌드 프로세스가 첫 진행 상황을 쓴 뒤 호출 — 이제 build_running() 이 빌드를 알아본다"""
+    try:
+        os.remove(BUILD_LOCK_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def schema_is_current(db_path=DB_PATH):
+    """DB 가 지금 코드의 테이블 구조(SCHEMA_VERSION)로 빌드됐는지"""
+    try:
+        conn = sqlite3.connect(_sqlite_uri(db_path, 'ro'), uri=True)
+        try:
+            row = conn.execute("SELECT value FROM build_meta WHERE key = 'schema_version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return row is not None and row[0] == str(SCHEMA_VERSION)
+
+
+def ensure_db():
+    """DB가 준비됐으면 True. 없으면 스냅샷 복원(즉시 True) 또는 백그라운드 빌드 시작(False).
+
+    구조가 바뀐 코드로 갱신된 뒤의 이전 DB·스냅샷은 쓸 수 없으므로 없는 것으로 보고 다시 빌드한다.
+    """
+    if os.path.exists(DB_PATH) and schema_is_current():
+        return True
+    if snapshot_schema_matches() and restore_snapshot():
+        if not snapshot_is_current():
+            start_background_build()  # 원천이 바뀌었으면 스냅샷으로 서비스하면서 다시 빌드
+        return True
+    # 실패한 빌드는 자동으로 반복하지 않는다 — build.log 확인 후 build_db.py 를 직접 실행
+    if (read_build_progress() or {}).get('state') != 'failed':
+        start_background_build()
+    return False
+
+
+# ─── 캐시 예열 ────────────────────────────────────────────────────────────────
+# 첫 사용자가 기다리지 않도록 프로세스당 한 번, 백그라운드 스레드에서
+# 무거운 지도 모듈을 미리 import 하고 DB 파일을 OS 페이지 캐시에 올려 둔다.
+
+WARM_MODULES = ('folium', 'folium.plugins', 'streamlit_folium')
+_warm_lock = threading.Lock()
+_warm_started = False
+
+
+def _warm_up():
+    import importlib
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    try:
+        with open(DB_PATH, 'rb') as f:
+            while f.read(1 << 20):
+                pass
+    except OSError:
+        pass
+
+
+def start_warm_up():
+    """캐시 예열 스레드 시작 (이미 시작했으면 무시)"""
+    global _warm_started
+    with _warm_lock:
+        if _warm_started:
+            return False
+        _warm_started = True
+    threading.Thread(target=_warm_up, name='warm-up', daemon=True).start()
+    return True
+
+
+# ─── 페이지용 ────────────────────────────────────────────────────────────────
+
+def render_build_status():
+    """빌드 진행 상황 표시 (streamlit)"""
+    import streamlit as st
+    progress = read_build_progress() or {}
+    if progress.get('state') == 'failed':
+        st.error(f"DB 빌드 실패: {progress.get('error')}  (로그: build.log)")
+        return
+    step, total = progress.get('step') or 0, progress.get('total')
+    label = f"데이터베이스를 구축하는 중입니다 — {progress.get('stage', '준비')}"
+    if total:
+        st.progress(min(step / total, 1.0), text=f"{label} ({step}/{total})")
+    else:
+        st.info(label)
+
+
+def require_db(poll_seconds=3):
+    """DB가 준비될 때까지 진행 상황을 보여주고 페이지 실행을 멈춘다 (주기적으로 다시 확인)"""
+    if ensure_db():
+        start_warm_up()
+        return
+    import streamlit as st
+    render_build_status()
+    st.caption("구축이 끝나면 이 페이지가 자동으로 열립니다.")
+    progress = read_build_progress() or {}
+    if progress.get('state') != 'failed':
+        time.sleep(poll_seconds)
+        st.rerun()
+    st.stop()
@@ -3,27 +3,168 @@
 """
 import sqlite3
 import os
+import random
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from functools import lru_cache
+from urllib.parse import quote
+
+from utils.geocode import normalize_place_name, place_trigrams
+from utils.motif_codes import motif_code_range, motif_query_ranges
+from utils.profiling import attach, connection_factory
+from utils.regions import PROVINCES, UNKNOWN_PROVINCE, code_range, province_code, region_name
+from utils.spatial import bounding_box, within_radius
+from utils.texts import decompress_text
 
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'folklore.db'))
+# 사용자 기여는 빌드 때 지워지는 folklore.db 와 분리된 파일에 보관
+CONTRIB_DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'contributions.db'))
+
+BUSY_TIMEOUT_MS = 5000
+
+# folklore.db 구조 버전 — 테이블 구조가 바뀌면 올린다. 다른 버전의 DB·스냅샷은 다시 빌드한다 (utils/bootstrap)
+SCHEMA_VERSION = 11
+
+CONTRIB_DDL = """
+CREATE TABLE IF NOT EXISTS user_contributions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    region TEXT,
+    district TEXT,
+    location TEXT,
+    narrator TEXT,
+    collected_date TEXT,
+    content TEXT,
+    submitted_at TEXT NOT NULL DEFAULT '',   -- keyset 페이지 키라 NULL 을 두지 않는다 ('' 는 시각 미상, 가장 오래된 쪽)
+    motif_draft TEXT,
+    status TEXT DEFAULT 'pending',
+    preview TEXT,
+    region_code TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_contrib_submitted ON user_contributions(submitted_at, id);
+CREATE INDEX IF NOT EXISTS idx_contrib_status ON user_contributions(status, submitted_at, id);
+"""
 
 
-def ensure_db():
-    """DB가 없으면 build_db.py를 실행해 생성한다."""
-    if os.path.exists(DB_PATH):
-        return
-    import subprocess, sys
-    scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
-    build_script = os.path.join(scripts_dir, 'build_db.py')
-    subprocess.run([sys.executable, build_script], check=True)
+def _sqlite_uri(path, mode=None):
+    uri = f"file:{quote(path)}"
+    return f"{uri}?mode={mode}" if mode else uri
+
+
+def _open_read(database, uri=False):
+    _contrib_writer()  # 기여 저장소 파일·스키마 보장
+    conn = sqlite3.connect(database, uri=uri, check_same_thread=False, factory=connection_factory())
+    attach(conn)  # utils.profiling 이 켜져 있으면 SQL 문별 시간 기록
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("ATTACH DATABASE ? AS contrib", (_sqlite_uri(CONTRIB_DB_PATH, 'ro'),))
+    return conn
 
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    """읽기용 연결. 기여 저장소는 contrib 스키마로 읽기 전용 ATTACH 된다."""
+    # mode=rw: DB가 아직 없을 때 빈 파일을 만들어 '준비됨'으로 오인되지 않도록
+    return _open_read(_sqlite_uri(DB_PATH, 'rw'), uri=True)
+
+
+def get_contrib_conn():
+    """기여 저장소만 읽는 연결 — folklore.db 가 아직 없어도 된다 (contrib 스키마 이름은 get_conn 과 같다)"""
+    return _open_read(':memory:')
+
+
+# ─── 기여 저장소 쓰기 ─────────────────────────────────────────────────────────
+# 모든 쓰기는 프로세스당 하나뿐인 연결을 잠금으로 직렬화해 거친다 (WAL + busy_timeout).
+# 읽기 연결은 WAL 덕분에 쓰기 도중에도 막히지 않는다.
+
+_contrib_write_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _contrib_writer():
+    conn = sqlite3.connect(CONTRIB_DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(CONTRIB_DDL)
+    _migrate_legacy_contributions(conn)
+    _fill_missing_submitted_at(conn)
+    _code_contribution_regions(conn)
     return conn
 
 
+@contextmanager
+def contrib_transaction():
+    """기여 저장소 쓰기 트랜잭션 — 정상 종료 시 커밋, 예외 시 롤백"""
+    with _contrib_write_lock:
+        conn = _contrib_writer()
+        with conn:
+            yield conn
+
+
+def _migrate_legacy_contributions(conn):
+    """folklore.db 안에 있던 이전 user_contributions 를 (저장소가 비어 있을 때) 한 번 옮긴다"""
+    if not os.path.exists(DB_PATH):
+        return
+    if conn.execute("SELECT 1 FROM user_contributions LIMIT 1").fetchone():
+        return
+    legacy = sqlite3.connect(_sqlite_uri(DB_PATH, 'ro'), uri=True)
+    try:
+        rows = legacy.execute("""
+            SELECT title, region, district, location, narrator, collected_date,
+                   content, submitted_at, motif_draft, status
+            FROM user_contributions ORDER BY id
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return
+    finally:
+        legacy.close()
+    with conn:
+        conn.executemany("""
+            INSERT INTO user_contributions
+                (title, region, district, location, narrator, collected_date, content, submitted_at, motif_draft, status, preview)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?)
+        """, [tuple(r[:7]) + (r[7] or '',) + tuple(r[8:]) + (make_preview(r[6]),) for r in rows])
+
+
+def _fill_missing_submitted_at(conn):
+    """NOT NULL 이전 저장소의 빈 submitted_at 을 '' 로 — NULL 행은 keyset 비교에서 빠지고 정렬도 어긋난다"""
+    with conn:
+        conn.execute("UPDATE user_contributions SET submitted_at = '' WHERE submitted_at IS NULL")
+
+
+def _code_contribution_regions(conn):
+    """region_code 열이 없던 저장소에 열을 더하고, 비어 있는 행의 시도 코드를 채운다"""
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(user_contributions)")}
+    with conn:
+        if 'region_code' not in columns:
+            conn.execute("ALTER TABLE user_contributions ADD COLUMN region_code TEXT")
+        conn.execute("DROP INDEX IF EXISTS idx_contrib_region")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contrib_region_code ON user_contributions(region_code, submitted_at, id)"
+        )
+        rows = conn.execute("SELECT id, region FROM user_contributions WHERE region_code IS NULL").fetchall()
+        conn.executemany("UPDATE user_contributions SET region_code = ? WHERE id = ?",
+                         [(province_code(region), contribution_id) for contribution_id, region in rows])
+
+
+def execute_ddl(conn, ddl):
+    """executescript 와 달리 열린 트랜잭션을 커밋하지 않고 DDL 문을 하나씩 실행"""
+    for stmt in ddl.split(';'):
+        if stmt.strip():
+            conn.execute(stmt)
+
+
+def get_db_version(conn):
+    """빌드·승격마다 바뀌는 값 — st.cache_data 키로 사용"""
+    try:
+        row = conn.execute("SELECT value FROM build_meta WHERE key = 'db_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
 # ─── items ───────────────────────────────────────────────────────────────────
 
 def get_all_items(conn, categories=None):
@@ -38,7 +179,48 @@ def get_all_items(conn, categories=None):
 
 
 def get_item_by_id(conn, item_id):
-    return conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone()
+    """메타데이터만 (전사본은 get_item_text — 본문이 있는지는 content_len 으로 안다)"""
+    return conn.execute(
+        "SELECT id, source, code, region, district, category, title, collectors, date, "
+        "location, narrator, content_len, audio_file, lat, lng FROM items WHERE id = ?",
+        (item_id,)
+    ).fetchone()
+
+
+def get_item_text(conn, item_id, max_chars=None):
+    """전사본 {'context', 'content'} — 화면에 보이거나 LLM 에 보낼 때만 읽어 압축을 푼다 (max_chars: 앞부분만)"""
+    row = conn.execute("""
+        SELECT t.context, t.content, d.zdict
+        FROM items i
+        JOIN item_texts t ON t.item_no = i.item_no
+        LEFT JOIN text_dict d ON d.id = t.dict_id
+        WHERE i.id = ?
+    """, (item_id,)).fetchone()
+    if not row:
+        return {'context': '', 'content': ''}
+    context, content, zdict = row
+    zdict = bytes(zdict or b'')
+    return {'context': decompress_text(context, zdict, max_chars),
+            'content': decompress_text(content, zdict, max_chars)}
+
+
+def get_item_llm_text(conn, item_id, max_tokens=None):
+    """LLM 에 보낼 정규화 본문 {'text', 'tokens', 'truncated'} — max_tokens 를 넘으면 그만큼의 앞부분만 푼다"""
+    row = conn.execute("""
+        SELECT t.norm, t.norm_len, t.token_estimate, d.zdict
+        FROM items i
+        JOIN item_texts t ON t.item_no = i.item_no
+        LEFT JOIN text_dict d ON d.id = t.dict_id
+        WHERE i.id = ?
+    """, (item_id,)).fetchone()
+    if not row or not row['norm_len']:
+        return {'text': '', 'tokens': 0, 'truncated': False}
+    norm, norm_len, tokens, zdict = row
+    truncated = bool(max_tokens and tokens > max_tokens)
+    max_chars = norm_len * max_tokens // tokens if truncated else None
+    return {'text': decompress_text(norm, bytes(zdict or b''), max_chars),
+            'tokens': min(tokens, max_tokens) if truncated else tokens,
+            'truncated': truncated}
 
 
 def search_items_by_title(conn, keyword, limit=50):
@@ -52,37 +234,81 @@ def search_items_by_motif(conn, motif_code, limit=50):
     return conn.execute("""
         SELECT i.id, i.title, i.region, i.district, i.category
         FROM items i
-        JOIN item_motifs im ON i.id = im.item_id
+        JOIN item_motifs im ON i.item_no = im.item_no
         JOIN motifs m ON im.motif_id = m.id
         WHERE m.motif_code = ?
         LIMIT ?
     """, (motif_code, limit)).fetchall()
 
 
-def get_items_with_lat_lng(conn, categories=None):
-    """lat/lng 있는 items만 반환"""
+def _map_filter(categories=None, region_code=None):
+    """지도 목록 조건 — 분류 IN · 지역 코드 범위 (권역·시도·시군 어느 단위든)"""
+    where, params = [], []
     if categories:
-        placeholders = ','.join('?' * len(categories))
-        sql = f"""
-            SELECT id, title, category, region, district, location, lat, lng
-            FROM items
-            WHERE lat IS NOT NULL AND lng IS NOT NULL AND category IN ({placeholders})
-        """
-        return conn.execute(sql, categories).fetchall()
-    return conn.execute("""
+        where.append(f"category IN ({','.join('?' * len(categories))})")
+        params.extend(categories)
+    if region_code:
+        where.append("region_code >= ? AND region_code < ?")
+        params.extend(code_range(region_code))
+    return where, params
+
+
+def get_items_with_lat_lng(conn, categories=None, region_code=None):
+    """lat/lng 있는 items만 반환"""
+    where, params = _map_filter(categories, region_code)
+    where = ["lat IS NOT NULL AND lng IS NOT NULL"] + where
+    return conn.execute(f"""
         SELECT id, title, category, region, district, location, lat, lng
-        FROM items WHERE lat IS NOT NULL AND lng IS NOT NULL
-    """).fetchall()
+        FROM items WHERE {' AND '.join(where)}
+    """, params).fetchall()
+
 
+def count_items_without_coords(conn, categories=None, region_code=None):
+    where, params = _map_filter(categories, region_code)
+    where = ["(lat IS NULL OR lng IS NULL)"] + where
+    return conn.execute(f"SELECT COUNT(*) FROM items WHERE {' AND '.join(where)}", params).fetchone()[0]
 
-def count_items_without_coords(conn, categories=None):
+
+def get_items_in_box(conn, south, west, north, east, categories=None, limit=5000):
+    """지도에 보이는 범위 안의 좌표 있는 자료 (item_rtree 범위 읽기) — 확대했을 때 점 레이어용"""
+    sql = """
+        SELECT i.id, i.title, i.category, i.lat, i.lng
+        FROM item_rtree r JOIN items i ON i.item_no = r.item_no
+        WHERE r.min_lat <= ? AND r.max_lat >= ? AND r.min_lng <= ? AND r.max_lng >= ?
+    """
+    params = [north, south, east, west]
     if categories:
-        placeholders = ','.join('?' * len(categories))
-        sql = f"SELECT COUNT(*) FROM items WHERE (lat IS NULL OR lng IS NULL) AND category IN ({placeholders})"
-        return conn.execute(sql, categories).fetchone()[0]
+        sql += f" AND i.category IN ({','.join('?' * len(categories))})"
+        params.extend(categories)
+    return conn.execute(sql + " LIMIT ?", params + [limit]).fetchall()
+
+
+def get_density_grid(conn, layer, cell, values=('',)):
+    """밀도 격자 칸 [(lat, lng, n)] (utils/density) — layer 'site' 는 분류별, 'place' 는 value ''"""
+    if not values:
+        return []
+    return conn.execute(f"""
+        SELECT lat, lng, n FROM stats_density
+        WHERE layer = ? AND cell = ? AND value IN ({','.join('?' * len(values))})
+    """, [layer, cell, *values]).fetchall()
+
+
+# ─── 지역 계층 (utils/regions) ───────────────────────────────────────────────
+
+def get_regions(conn, parent=''):
+    """parent 바로 아래 단위 [(code, name, n_items)] — '' 는 권역, 권역 코드는 시도, 시도 코드는 시군"""
     return conn.execute(
-        "SELECT COUNT(*) FROM items WHERE lat IS NULL OR lng IS NULL"
-    ).fetchone()[0]
+        "SELECT code, name, n_items FROM regions WHERE parent = ? AND n_items > 0 ORDER BY code", (parent,)
+    ).fetchall()
+
+
+def get_region_tree(conn):
+    """지역 선택 상자용 [(code, name, level)] — 권역마다 그 아래 시도를 이어 붙인 순서"""
+    tree = []
+    for group in get_regions(conn):
+        tree.append((group['code'], group['name'], 0))
+        tree.extend((p['code'], p['name'], 1) for p in get_regions(conn, group['code']))
+    return tree
 
 
 # ─── motifs ──────────────────────────────────────────────────────────────────
@@ -90,9 +316,10 @@ def count_items_without_coords(conn, categories=None):
 def get_motifs_for_item(conn, item_id):
     return conn.execute("""
         SELECT m.motif_code, m.motif_name
-        FROM motifs m
-        JOIN item_motifs im ON m.id = im.motif_id
-        WHERE im.item_id = ?
+        FROM items i
+        JOIN item_motifs im ON im.item_no = i.item_no
+        JOIN motifs m ON m.id = im.motif_id
+        WHERE i.id = ?
     """, (item_id,)).fetchall()
 
 
@@ -100,15 +327,119 @@ def get_all_motifs(conn):
     return conn.execute("SELECT motif_code, motif_name FROM motifs ORDER BY motif_code").fetchall()
 
 
+# 모티프 찾기 — 코드 앞부분 · 이름 부분 일치, 자료가 붙은 모티프만 자료 수 순 (utils/motif_codes.motif_terms)
+
+def _motif_search_filter(query):
+    """찾기 질의 → (WHERE 조건, 인자). 어절마다 용어 범위를 읽어 교집합을 낸다"""
+    ranges = motif_query_ranges(query)
+    if not ranges:
+        return [], []
+    hits = " INTERSECT ".join("SELECT motif_id FROM motif_terms WHERE term >= ? AND term < ?" for _ in ranges)
+    return [f"motif_id IN ({hits})"], [v for r in ranges for v in r]
+
+
+def search_motifs(conn, query='', cursor=None, limit=20):
+    """모티프 찾기 한 페이지 — 자료 수 많은 순, 같으면 코드 순.
+
+    cursor 는 직전 페이지 마지막 행의 (n_items, motif_code). (rows, next_cursor) 반환,
+    다음 페이지가 없으면 next_cursor 는 None.
+    """
+    where, params = _motif_search_filter(query)
+    if cursor:
+        where.append("(n_items < ? OR (n_items = ? AND motif_code > ?))")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    sql = "SELECT motif_code, motif_name, n_items FROM stats_motif"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY n_items DESC, motif_code LIMIT ?"
+    rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1]['n_items'], rows[-1]['motif_code'])
+    return rows, None
+
+
+def count_motifs(conn, query=''):
+    """찾기 질의에 맞는 (자료가 붙은) 모티프 수"""
+    where, params = _motif_search_filter(query)
+    sql = "SELECT COUNT(*) FROM stats_motif"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return conn.execute(sql, params).fetchone()[0]
+
+
+# 코드 범위 질의 — query 는 장 'D' · 번호 구간 'D17xx' / 'D1700-D1799' · 하위 코드 'D1711' (utils/motif_codes)
+
+def get_motifs_in_range(conn, query, limit=200):
+    """범위 안의 모티프와 자료 수 (Thompson 코드 순)"""
+    bounds = motif_code_range(query)
+    if not bounds:
+        return []
+    return conn.execute("""
+        SELECT m.motif_code, m.motif_name, m.depth, COALESCE(s.n_items, 0) AS n_items
+        FROM motifs m LEFT JOIN stats_motif s ON s.motif_id = m.id
+        WHERE m.sort_key >= ? AND m.sort_key < ?
+        ORDER BY m.sort_key
+        LIMIT ?
+    """, (*bounds, limit)).fetchall()
+
+
+def count_motif_range(conn, query):
+    """범위 안에서 자료가 붙은 모티프 수와 (중복 없는) 자료 수"""
+    bounds = motif_code_range(query)
+    if not bounds:
+        return 0, 0
+    row = conn.execute("""
+        SELECT COUNT(DISTINCT im.motif_id), COUNT(DISTINCT im.item_no)
+        FROM motifs m JOIN item_motifs im ON im.motif_id = m.id
+        WHERE m.sort_key >= ? AND m.sort_key < ?
+    """, bounds).fetchone()
+    return row[0], row[1]
+
+
+def search_items_by_motif_range(conn, query, limit=50):
+    """범위 안 모티프를 가진 설화 — 범위 안 모티프를 많이 가진 순"""
+    bounds = motif_code_range(query)
+    if not bounds:
+        return []
+    return conn.execute("""
+        SELECT i.id, i.title, i.region, i.district, i.category, COUNT(*) AS n_matched
+        FROM motifs m
+        CROSS JOIN item_motifs im ON im.motif_id = m.id
+        JOIN items i ON i.item_no = im.item_no
+        WHERE m.sort_key >= ? AND m.sort_key < ?
+        GROUP BY im.item_no
+        ORDER BY n_matched DESC, i.id
+        LIMIT ?
+    """, (*bounds, limit)).fetchall()
+
+
+def get_motif_blocks(conn, chapter):
+    """장 안의 백 단위 번호 구간('D17xx')별 모티프 수 · 자료 수 — 범위 탐색의 다음 단계"""
+    bounds = motif_code_range(chapter)
+    if not bounds:
+        return []
+    return conn.execute("""
+        SELECT substr(m.sort_key, 1, 3) || 'xx' AS block,
+               COUNT(DISTINCT m.id) AS n_motifs, COUNT(DISTINCT im.item_no) AS n_items
+        FROM motifs m LEFT JOIN item_motifs im ON im.motif_id = m.id
+        WHERE m.sort_key >= ? AND m.sort_key < ?
+        GROUP BY 1
+        ORDER BY 1
+    """, bounds).fetchall()
+
+
 def get_atu_types_for_item(conn, item_id):
     return conn.execute(
-        "SELECT atu_type FROM atu_types WHERE item_id = ?", (item_id,)
+        "SELECT a.atu_type FROM items i JOIN atu_types a ON a.item_no = i.item_no WHERE i.id = ?",
+        (item_id,)
     ).fetchall()
 
 
 def get_subjects_for_item(conn, item_id):
     return conn.execute(
-        "SELECT subject FROM subjects WHERE item_id = ?", (item_id,)
+        "SELECT s.subject FROM items i JOIN subjects s ON s.item_no = i.item_no WHERE i.id = ?",
+        (item_id,)
     ).fetchall()
 
 
@@ -116,7 +447,8 @@ def get_subjects_for_item(conn, item_id):
 
 def get_narrative_units(conn, item_id):
     return conn.execute(
-        "SELECT unit_text FROM narrative_units WHERE item_id = ? ORDER BY unit_order",
+        "SELECT n.unit_text FROM items i JOIN narrative_units n ON n.item_no = i.item_no "
+        "WHERE i.id = ? ORDER BY n.unit_order",
         (item_id,)
     ).fetchall()
 
@@ -125,7 +457,8 @@ def get_narrative_units(conn, item_id):
 
 def get_item_meta(conn, item_id):
     return conn.execute(
-        "SELECT structure, era FROM item_meta WHERE item_id = ?", (item_id,)
+        "SELECT m.structure, m.era FROM items i JOIN item_meta m ON m.item_no = i.item_no WHERE i.id = ?",
+        (item_id,)
     ).fetchone()
 
 
@@ -134,100 +467,418 @@ def get_item_meta(conn, item_id):
 def get_places_for_item(conn, item_id):
     return conn.execute("""
         SELECT p.place_name, p.lat, p.lng, p.geocode_status
-        FROM places p
-        JOIN item_places ip ON p.id = ip.place_id
-        WHERE ip.item_id = ?
+        FROM items i
+        JOIN item_places ip ON ip.item_no = i.item_no
+        JOIN places p ON p.id = ip.place_id
+        WHERE i.id = ?
     """, (item_id,)).fetchall()
 
 
 def search_places_by_name(conn, keyword, limit=30):
-    return conn.execute(
-        "SELECT place_name, lat, lng FROM places WHERE place_name LIKE ? AND lat IS NOT NULL AND lng IS NOT NULL LIMIT ?",
-        (f'%{keyword}%', limit)
-    ).fetchall()
+    """정규화 지명 trigram 색인으로 좌표 있는 대표 지명 검색.
+
+    별칭에 키워드가 포함된 지명을 먼저, 나머지는 공유 trigram 비율(오탈자 허용) 순으로 반환.
+    """
+    norm = normalize_place_name(keyword)
+    if not norm:
+        return []
+    grams = sorted(place_trigrams(norm))
+    min_hits = max(1, (len(grams) + 1) // 2)
+    return conn.execute(f"""
+        WITH hits AS (
+            SELECT canonical_id, COUNT(*) AS n FROM place_trigrams
+            WHERE gram IN ({','.join('?' * len(grams))})
+            GROUP BY canonical_id
+        ), scored AS (
+            SELECT c.id, c.place_name, c.lat, c.lng, c.item_count, h.n,
+                   EXISTS (SELECT 1 FROM place_aliases a
+                           WHERE a.canonical_id = c.id AND instr(a.norm_alias, ?) > 0) AS contains
+            FROM hits h JOIN canonical_places c ON c.id = h.canonical_id
+            WHERE c.lat IS NOT NULL AND c.lng IS NOT NULL
+        )
+        SELECT id, place_name, lat, lng, item_count FROM scored
+        WHERE contains OR n >= ?
+        ORDER BY contains DESC, n DESC, item_count DESC
+        LIMIT ?
+    """, grams + [norm, min_hits, limit]).fetchall()
 
 
-def get_items_by_place_name(conn, place_name, limit=200):
+def resolve_place(conn, place_name):
+    """표기·별칭 → 대표 지명 행 (canonical_places)"""
     return conn.execute("""
-        SELECT i.id, i.title, i.region, i.district, i.category, i.lat, i.lng
-        FROM items i
-        JOIN item_places ip ON i.id = ip.item_id
-        JOIN places p ON ip.place_id = p.id
-        WHERE p.place_name = ?
-        LIMIT ?
-    """, (place_name, limit)).fetchall()
-
-
-def get_narrative_geo_pairs(conn, region=None, limit=400):
-    """채록지 + 서사 지명 좌표 쌍 (둘 다 있는 경우)"""
-    if region:
-        return conn.execute("""
-            SELECT i.id, i.title, i.region, i.district,
-                   i.lat AS c_lat, i.lng AS c_lng,
-                   p.place_name, p.lat AS p_lat, p.lng AS p_lng
-            FROM items i
-            JOIN item_places ip ON i.id = ip.item_id
-            JOIN places p ON ip.place_id = p.id
-            WHERE i.lat IS NOT NULL AND i.lng IS NOT NULL
-              AND p.lat IS NOT NULL AND p.lng IS NOT NULL
-              AND i.region LIKE ?
-            LIMIT ?
-        """, (f'%{region}%', limit)).fetchall()
+        SELECT c.id, c.place_name, c.lat, c.lng, c.item_count
+        FROM place_aliases a JOIN canonical_places c ON c.id = a.canonical_id
+        WHERE a.norm_alias = ?
+    """, (normalize_place_name(place_name),)).fetchone()
+
+
+def get_place_aliases(conn, canonical_id):
+    return [r[0] for r in conn.execute(
+        "SELECT alias FROM place_aliases WHERE canonical_id = ? ORDER BY alias", (canonical_id,)
+    )]
+
+
+def get_items_by_place(conn, canonical_id, limit=200):
+    """대표 지명(모든 표기 포함)을 서사 지명으로 가진 설화"""
     return conn.execute("""
+        SELECT DISTINCT i.id, i.title, i.region, i.district, i.category, i.lat, i.lng
+        FROM places p
+        JOIN item_places ip ON ip.place_id = p.id
+        JOIN items i ON i.item_no = ip.item_no
+        WHERE p.canonical_id = ?
+        LIMIT ?
+    """, (canonical_id, limit)).fetchall()
+
+
+def get_items_by_place_name(conn, place_name, limit=200):
+    place = resolve_place(conn, place_name)
+    return get_items_by_place(conn, place['id'], limit) if place else []
+
+
+def get_narrative_geo_pairs(conn, region_code=None, limit=400):
+    """채록지 + 서사 지명 좌표 쌍 (둘 다 있는 경우). region_code 는 권역·시도·시군 코드"""
+    where, params = ["i.lat IS NOT NULL AND i.lng IS NOT NULL", "p.lat IS NOT NULL AND p.lng IS NOT NULL"], []
+    if region_code:
+        where.append("i.region_code >= ? AND i.region_code < ?")
+        params.extend(code_range(region_code))
+    return conn.execute(f"""
         SELECT i.id, i.title, i.region, i.district,
                i.lat AS c_lat, i.lng AS c_lng,
                p.place_name, p.lat AS p_lat, p.lng AS p_lng
         FROM items i
-        JOIN item_places ip ON i.id = ip.item_id
+        JOIN item_places ip ON i.item_no = ip.item_no
         JOIN places p ON ip.place_id = p.id
-        WHERE i.lat IS NOT NULL AND i.lng IS NOT NULL
-          AND p.lat IS NOT NULL AND p.lng IS NOT NULL
+        WHERE {' AND '.join(where)}
         LIMIT ?
-    """, (limit,)).fetchall()
+    """, params + [limit]).fetchall()
+
+
+# ─── 반경 검색 (utils/spatial 의 R*Tree) ─────────────────────────────────────
+# 경계 상자 후보를 R*Tree 로 고르고 대권 거리로 걸러 가까운 순 [dict(..., km=거리)] 로 돌려준다
+
+BOX_SQL = "r.min_lat <= ? AND r.max_lat >= ? AND r.min_lng <= ? AND r.max_lng >= ?"
+
+
+def _box_params(lat, lng, radius_km):
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    return max_lat, min_lat, max_lng, min_lng
+
+
+def get_items_near(conn, lat, lng, radius_km=10, limit=50):
+    """채록지가 반경 안에 있는 자료 — 가까운 순.
+
+    후보가 많은 도심에서도 가볍도록 좌표만 읽어 거리를 잰 뒤 남은 limit 건의 목록 컬럼을 읽는다.
+    """
+    rows = conn.execute(f"""
+        SELECT i.item_no, i.lat, i.lng FROM item_rtree r JOIN items i ON i.item_no = r.item_no
+        WHERE {BOX_SQL}
+    """, _box_params(lat, lng, radius_km)).fetchall()
+    nearest = within_radius(rows, lat, lng, radius_km, limit)
+    if not nearest:
+        return []
+    details = {r['item_no']: r for r in conn.execute(f"""
+        SELECT item_no, id, title, region, district, category, location, lat, lng FROM items
+        WHERE item_no IN ({','.join('?' * len(nearest))})
+    """, [r['item_no'] for _, r in nearest])}
+    return [dict(details[r['item_no']], km=km) for km, r in nearest]
+
+
+def get_places_near(conn, lat, lng, radius_km=10, limit=50):
+    """반경 안의 서사 지명(대표 지명) — 가까운 순"""
+    rows = conn.execute(f"""
+        SELECT c.id, c.place_name, c.lat, c.lng, c.item_count
+        FROM place_rtree r JOIN canonical_places c ON c.id = r.canonical_id
+        WHERE {BOX_SQL}
+    """, _box_params(lat, lng, radius_km)).fetchall()
+    return [dict(r, km=km) for km, r in within_radius(rows, lat, lng, radius_km, limit)]
+
+
+def get_items_set_near(conn, lat, lng, radius_km=10, limit=50):
+    """서사 지명이 반경 안에 있는 자료 — 가장 가까운 지명 기준 가까운 순"""
+    rows = conn.execute(f"""
+        SELECT i.id, i.title, i.region, i.district, i.category, c.place_name, c.lat, c.lng
+        FROM place_rtree r
+        JOIN canonical_places c ON c.id = r.canonical_id
+        JOIN places p ON p.canonical_id = c.id
+        JOIN item_places ip ON ip.place_id = p.id
+        JOIN items i ON i.item_no = ip.item_no
+        WHERE {BOX_SQL}
+    """, _box_params(lat, lng, radius_km)).fetchall()
+    nearest = {}
+    for km, r in within_radius(rows, lat, lng, radius_km, None):
+        nearest.setdefault(r['id'], dict(r, km=km))
+    return list(nearest.values())[:limit]
+
+
+# ─── 무작위 추천 (utils/sampler 의 표본 풀) ──────────────────────────────────
+# kind 는 'all' · 'category' · 'region' · 'motif', value 는 분류 이름 · 시도 코드 · 모티프 코드 ('all' 은 '')
+# label 은 지역 풀이면 regions 의 시도 이름, 나머지는 value 그대로
+POOL_LABEL = "COALESCE(r.name, p.value)"
+POOL_REGION_JOIN = "LEFT JOIN regions r ON p.kind = 'region' AND r.code = p.value"
+
+SAMPLE_COLUMNS = "i.id, i.title, i.region, i.district, i.category"
+
+
+def get_sample_pools(conn, kind, limit=200):
+    """kind 의 풀 목록 [(value, label, size)] — 큰 순"""
+    return conn.execute(f"""
+        SELECT p.value, {POOL_LABEL} AS label, p.size
+        FROM sample_pools p {POOL_REGION_JOIN}
+        WHERE p.kind = ? ORDER BY p.size DESC, p.value LIMIT ?
+    """, (kind, limit)).fetchall()
+
+
+def sample_items(conn, kind='all', value='', k=1, rng=random):
+    """풀에서 서로 다른 자료 k 개를 무작위로 — 풀 크기 조회 + 기본키 조회 k 번"""
+    pool = conn.execute(
+        "SELECT pool_id, size FROM sample_pools WHERE kind = ? AND value = ?", (kind, value)
+    ).fetchone()
+    if not pool or not pool['size']:
+        return []
+    slots = rng.sample(range(pool['size']), min(k, pool['size']))
+    return conn.execute(f"""
+        SELECT {SAMPLE_COLUMNS}
+        FROM sample_pool s JOIN items i ON i.item_no = s.item_no
+        WHERE s.pool_id = ? AND s.slot IN ({','.join('?' * len(slots))})
+    """, (pool['pool_id'], *slots)).fetchall()
+
+
+def get_discover_feed(conn, kind='region', strata=12, rng=random):
+    """층화 추천 — 큰 풀 strata 개에서 한 편씩 (stratum 컬럼에 풀 표시 이름)"""
+    pools = conn.execute(f"""
+        SELECT p.pool_id, {POOL_LABEL} AS label, p.size
+        FROM sample_pools p {POOL_REGION_JOIN}
+        WHERE p.kind = ? ORDER BY p.size DESC, p.value LIMIT ?
+    """, (kind, strata)).fetchall()
+    picks = [(p['pool_id'], rng.randrange(p['size']), p['label']) for p in pools if p['size']]
+    if not picks:
+        return []
+    return conn.execute(f"""
+        WITH pick(pool_id, slot, stratum) AS (VALUES {','.join(['(?,?,?)'] * len(picks))})
+        SELECT pick.stratum, {SAMPLE_COLUMNS}
+        FROM pick
+        JOIN sample_pool s ON s.pool_id = pick.pool_id AND s.slot = pick.slot
+        JOIN items i ON i.item_no = s.item_no
+    """, [v for p in picks for v in p]).fetchall()
 
 
 # ─── 이본 대조 ────────────────────────────────────────────────────────────────
 
 def get_similar_items_by_motif(conn, item_id, limit=20):
     """공통 모티프 수 내림차순으로 이본 반환"""
+    # 기준 설화의 모티프에서 출발해 motif_id 인덱스로 이본을 찾는다 (CROSS JOIN 으로 조인 순서 고정 —
+    # 모티프 어휘가 작은 코퍼스에서도 item_motifs 전체 스캔으로 바뀌지 않도록)
     return conn.execute("""
         SELECT i.id, i.title, i.region, i.district, COUNT(*) AS common_motif_count
-        FROM items i
-        JOIN item_motifs im ON i.id = im.item_id
-        WHERE im.motif_id IN (
-            SELECT motif_id FROM item_motifs WHERE item_id = ?
-        )
-        AND i.id != ?
-        GROUP BY i.id
+        FROM items me
+        CROSS JOIN item_motifs mine ON mine.item_no = me.item_no
+        CROSS JOIN item_motifs im ON im.motif_id = mine.motif_id
+        JOIN items i ON i.item_no = im.item_no
+        WHERE me.id = ? AND im.item_no != me.item_no
+        GROUP BY im.item_no
         ORDER BY common_motif_count DESC
         LIMIT ?
-    """, (item_id, item_id, limit)).fetchall()
+    """, (item_id, limit)).fetchall()
 
 
-# ─── user_contributions ──────────────────────────────────────────────────────
+# ─── 모티프 연결망 (utils/motif_network 가 빌드 때 계산) ───────────────────────
 
-def insert_contribution(conn, data: dict):
-    conn.execute("""
-        INSERT INTO user_contributions
-            (title, region, district, location, narrator, collected_date, content, submitted_at, motif_draft, status)
-        VALUES (?,?,?,?,?,?,?,?,?, 'pending')
-    """, (
-        data.get('title'), data.get('region'), data.get('district'),
-        data.get('location'), data.get('narrator'), data.get('collected_date'),
-        data.get('content'), data.get('submitted_at'), data.get('motif_draft'),
-    ))
-    conn.commit()
+NEIGHBOUR_ORDERS = {'lift': "p.lift DESC, p.n_both DESC", 'n_both': "p.n_both DESC, p.lift DESC"}
+
+
+def get_motif_neighbours(conn, motif_code, order='lift', limit=20):
+    """함께 나오는 모티프 — order 는 'lift' (연관 강도) 또는 'n_both' (함께 나온 자료 수)"""
+    return conn.execute(f"""
+        SELECT o.motif_code, o.motif_name, p.n_both, p.lift, p.pmi
+        FROM motifs m
+        JOIN stats_motif_pairs p ON p.motif_id = m.id
+        JOIN motifs o ON o.id = p.other_id
+        WHERE m.motif_code = ?
+        ORDER BY {NEIGHBOUR_ORDERS[order]}
+        LIMIT ?
+    """, (motif_code, limit)).fetchall()
+
+
+def get_motif_regions(conn, motif_code):
+    """모티프의 시도별 자료 수와 편중도(lift) — 편중이 큰 순"""
+    return conn.execute("""
+        SELECT r.region_code, g.name AS region, r.n_items, r.lift
+        FROM motifs m
+        JOIN stats_motif_region r ON r.motif_id = m.id
+        JOIN regions g ON g.code = r.region_code
+        WHERE m.motif_code = ?
+        ORDER BY r.lift DESC, r.n_items DESC
+    """, (motif_code,)).fetchall()
+
+
+def get_region_motifs(conn, region_code, min_items=3, limit=30):
+    """시도에 편중된 모티프 — 그 시도 자료가 min_items 편 이상인 것만 lift 순"""
+    return conn.execute("""
+        SELECT m.motif_code, m.motif_name, r.n_items, r.lift
+        FROM stats_motif_region r JOIN motifs m ON m.id = r.motif_id
+        WHERE r.region_code = ? AND r.n_items >= ?
+        ORDER BY r.lift DESC, r.n_items DESC
+        LIMIT ?
+    """, (region_code, min_items, limit)).fetchall()
+
+
+def get_motif_atu_types(conn, motif_code, limit=10):
+    """모티프가 나오는 자료의 ATU 유형 — 자료 수 순"""
+    return conn.execute("""
+        SELECT a.atu_type, a.n_items
+        FROM motifs m JOIN stats_motif_atu a ON a.motif_id = m.id
+        WHERE m.motif_code = ?
+        ORDER BY a.n_items DESC, a.atu_type
+        LIMIT ?
+    """, (motif_code, limit)).fetchall()
+
+
+def get_network_regions(conn):
+    """연결망 지역 목록 [(시도 코드, 이름)] — 모티프 태깅 자료가 있는 시도"""
+    codes = [code for code, _, _ in PROVINCES] + [UNKNOWN_PROVINCE]
+    return conn.execute(f"""
+        SELECT g.code, g.name FROM regions g
+        WHERE g.code IN ({','.join('?' * len(codes))})
+          AND EXISTS (SELECT 1 FROM stats_motif_region r WHERE r.region_code = g.code)
+        ORDER BY g.code
+    """, codes).fetchall()
 
 
-def get_contributions(conn):
+# ─── 집계 통계 (stats_*) ──────────────────────────────────────────────────────
+
+def get_corpus_totals(conn):
+    return dict(conn.execute("SELECT key, value FROM stats_totals").fetchall())
+
+
+def get_category_stats(conn, categories=None):
+    if categories:
+        placeholders = ','.join('?' * len(categories))
+        return conn.execute(
+            f"SELECT * FROM stats_category WHERE category IN ({placeholders}) ORDER BY n_items DESC",
+            categories
+        ).fetchall()
+    return conn.execute("SELECT * FROM stats_category ORDER BY n_items DESC").fetchall()
+
+
+def get_region_stats(conn, categories=None):
+    """광역 지역별 합계 (카테고리 필터 가능)"""
+    where, params = "", []
+    if categories:
+        where = f"WHERE category IN ({','.join('?' * len(categories))})"
+        params = list(categories)
+    return conn.execute(f"""
+        SELECT region, SUM(n_items) AS n_items, SUM(n_with_coords) AS n_with_coords,
+               SUM(n_with_content) AS n_with_content, SUM(n_enriched) AS n_enriched
+        FROM stats_region {where}
+        GROUP BY region ORDER BY n_items DESC
+    """, params).fetchall()
+
+
+def get_district_stats(conn, region):
+    return conn.execute("""
+        SELECT district, SUM(n_items) AS n_items, SUM(n_with_coords) AS n_with_coords
+        FROM stats_region WHERE region = ?
+        GROUP BY district ORDER BY n_items DESC
+    """, (region,)).fetchall()
+
+
+def get_top_motif_stats(conn, limit=30):
+    return conn.execute(
+        "SELECT motif_code, motif_name, n_items FROM stats_motif ORDER BY n_items DESC LIMIT ?", (limit,)
+    ).fetchall()
+
+
+def get_atu_stats(conn, limit=30):
+    return conn.execute(
+        "SELECT atu_type, n_items FROM stats_atu ORDER BY n_items DESC LIMIT ?", (limit,)
+    ).fetchall()
+
+
+def get_era_stats(conn):
+    return conn.execute("SELECT era, n_items FROM stats_era ORDER BY n_items DESC").fetchall()
+
+
+def get_geocode_stats(conn):
+    return conn.execute("SELECT geocode_status, n_places FROM stats_geocode ORDER BY n_places DESC").fetchall()
+
+
+def get_enrichment_stats(conn):
     return conn.execute(
-        "SELECT * FROM user_contributions ORDER BY submitted_at DESC"
+        "SELECT provenance, status, n_items FROM stats_enrichment ORDER BY n_items DESC"
     ).fetchall()
 
 
+# ─── user_contributions ──────────────────────────────────────────────────────
+
+PREVIEW_CHARS = 300
+CONTRIB_LIST_COLUMNS = "id, title, region, district, submitted_at, status, preview"
+
+
+def make_preview(content, limit=PREVIEW_CHARS):
+    content = (content or '').strip()
+    return content[:limit] + ("..." if len(content) > limit else "")
+
+
+def insert_contribution(data: dict):
+    """기여 한 건 저장 — 직렬화된 쓰기 연결을 통해 커밋"""
+    with contrib_transaction() as conn:
+        conn.execute("""
+        INSERT INTO user_contributions
+            (title, region, district, location, narrator, collected_date, content, submitted_at, motif_draft, status,
+             preview, region_code)
+        VALUES (?,?,?,?,?,?,?,?,?, 'pending', ?, ?)
+        """, (
+            data.get('title'), data.get('region'), data.get('district'),
+            data.get('location'), data.get('narrator'), data.get('collected_date'),
+            data.get('content'), data.get('submitted_at') or datetime.now().isoformat(), data.get('motif_draft'),
+            make_preview(data.get('content')), province_code(data.get('region')),
+        ))
+
+
+def get_contributions_page(conn, status=None, region_code=None, cursor=None, limit=20):
+    """최신순 keyset 페이지네이션 — 목록용 컬럼과 미리보기만 반환.
+
+    cursor 는 직전 페이지 마지막 행의 (submitted_at, id). (rows, next_cursor) 반환,
+    다음 페이지가 없으면 next_cursor 는 None.
+    """
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if region_code:
+        where.append("region_code = ?")
+        params.append(region_code)
+    if cursor:
+        where.append("(submitted_at, id) < (?, ?)")
+        params.extend(cursor)
+    sql = f"SELECT {CONTRIB_LIST_COLUMNS} FROM contrib.user_contributions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY submitted_at DESC, id DESC LIMIT ?"
+    rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1]['submitted_at'], rows[-1]['id'])
+    return rows, None
+
+
+def get_contribution_by_id(conn, contribution_id):
+    """펼쳐 본 기여 한 건의 전체 본문·모티프 초안"""
+    return conn.execute(
+        "SELECT * FROM contrib.user_contributions WHERE id = ?", (contribution_id,)
+    ).fetchone()
+
+
+def get_contribution_regions(conn):
+    """기여가 있는 시도 [(code, name)] — '경남' · '경상남도' 처럼 표기가 달라도 한 항목"""
+    return [(r[0], region_name(r[0])) for r in conn.execute(
+        "SELECT DISTINCT region_code FROM contrib.user_contributions WHERE region_code IS NOT NULL ORDER BY region_code"
+    )]
+
+
 def get_contribution_map_items(conn):
     """기여 설화 중 lat/lng 있는 것 (motif_draft에서 파싱 불필요, items 레이어와 구분용)"""
     return conn.execute("""
         SELECT id, title, region, district, location, submitted_at
-        FROM user_contributions
+        FROM contrib.user_contributions
     """).fetchall()
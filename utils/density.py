@@ -0,0 +1,65 @@
+"""
+지도 밀도 격자 (stats_density) — 낮은 확대 단계에서 점 수천 개 대신 그릴 열지도용 집계.
+
+위경도를 정사각 칸(cell, 1/100 도 단위)으로 나눠 칸마다 자료 수와 무게중심을 빌드 때 계산해 둔다.
+    site  — 채록지, 분류별 (value = 분류)
+    place — 서사 지명, 그 지명이 나오는 자료 수로 가중 (value = '')
+"""
+from utils.db import execute_ddl
+
+DENSITY_DDL = """
+CREATE TABLE IF NOT EXISTS stats_density (
+    layer TEXT NOT NULL,
+    cell INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    cell_lat INTEGER NOT NULL,
+    cell_lng INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL,
+    PRIMARY KEY (layer, cell, value, cell_lat, cell_lng)
+) WITHOUT ROWID;
+"""
+
+# 칸 크기 (1/100 도) — 40 ≈ 44 km · 20 ≈ 22 km · 10 ≈ 11 km
+CELL_SIZES = (40, 20, 10)
+# 확대 단계 → 칸 크기. 여기 없는 단계(더 확대)에서는 보이는 범위의 점을 그대로 그린다
+ZOOM_CELLS = {5: 40, 6: 40, 7: 20, 8: 10}
+MIN_ZOOM = min(ZOOM_CELLS)
+
+# layer → (value, lat, lng, 가중치) 를 돌려주는 SQL
+DENSITY_SOURCES = {
+    'site': """
+        SELECT COALESCE(category, ''), lat, lng, 1 FROM items
+        WHERE lat IS NOT NULL AND lng IS NOT NULL
+    """,
+    'place': """
+        SELECT '', lat, lng, item_count FROM canonical_places
+        WHERE lat IS NOT NULL AND lng IS NOT NULL AND item_count > 0
+    """,
+}
+
+
+def cell_for_zoom(zoom):
+    """지도 확대 단계에 맞는 칸 크기 — None 이면 점을 그릴 단계"""
+    if zoom is None:
+        return ZOOM_CELLS[MIN_ZOOM]
+    return ZOOM_CELLS.get(max(int(zoom), MIN_ZOOM))
+
+
+def build_density(conn):
+    """stats_density 재계산 — 층 · 칸 크기마다 GROUP BY 한 번"""
+    execute_ddl(conn, DENSITY_DDL)
+    conn.execute("DELETE FROM stats_density")
+    for layer, source in DENSITY_SOURCES.items():
+        for cell in CELL_SIZES:
+            # 위경도에 90 · 180 을 더해 음수를 없애면 CAST 버림이 곧 내림이다
+            conn.execute(f"""
+                WITH e(value, lat, lng, w) AS ({source})
+                INSERT INTO stats_density (layer, cell, value, cell_lat, cell_lng, n, lat, lng)
+                SELECT ?, ?, value,
+                       CAST((lat + 90) * 100 / ? AS INTEGER), CAST((lng + 180) * 100 / ? AS INTEGER),
+                       SUM(w), SUM(lat * w) / SUM(w), SUM(lng * w) / SUM(w)
+                FROM e GROUP BY 3, 4, 5
+            """, (layer, cell, cell, cell))
+    return conn.execute("SELECT COUNT(*) FROM stats_density").fetchone()[0]
@@ -0,0 +1,167 @@
+"""
+다면 검색(facet) 비트맵 — 지역 · 시군 · 분류 · 모티프 · ATU · 주제어 · 시대
+
+facet 값마다 그 값을 가진 자료 집합을 비트맵(비트 n = item_no n)으로 만들어 facet_bitmaps 에 zlib 압축해 둔다.
+앱에서는 전부 파이썬 정수로 읽어 두고, 같은 facet 안에서는 OR · facet 끼리는 AND 로 필터를 조합한다.
+값별 개수는 '그 facet 을 뺀 나머지 필터' 비트맵과의 AND popcount 라서 선택을 바꿔도 다른 값이 사라지지 않는다.
+"""
+import zlib
+from functools import reduce
+from operator import or_
+
+from utils.db import execute_ddl
+from utils.regions import NO_DISTRICT, UNKNOWN_PROVINCE
+
+FACET_DDL = """
+CREATE TABLE IF NOT EXISTS facet_bitmaps (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    label TEXT,
+    n_items INTEGER NOT NULL,
+    bits BLOB NOT NULL,
+    PRIMARY KEY (facet, value)
+) WITHOUT ROWID;
+"""
+
+UNKNOWN = '미상'
+
+# facet → (표시 이름, (value, item_no) 를 돌려주는 SQL). 지역·분류·시대는 모든 자료가 한 값씩 갖는다
+# 지역 · 시군은 표기 흔들림('경남' · '경상남도')이 갈라지지 않도록 region_code 로 묶는다 (시도 3자리 · 시군 6자리)
+FACETS = {
+    'region': ("지역", f"SELECT COALESCE(SUBSTR(region_code, 1, 3), '{UNKNOWN_PROVINCE}'), item_no FROM items"),
+    'district': ("시군", f"""
+        SELECT region_code, item_no FROM items
+        WHERE LENGTH(region_code) = 6 AND SUBSTR(region_code, 4) <> '{NO_DISTRICT}'
+    """),
+    'category': ("분류", f"SELECT COALESCE(NULLIF(TRIM(category), ''), '{UNKNOWN}'), item_no FROM items"),
+    'motif': ("모티프", "SELECT m.motif_code, im.item_no FROM item_motifs im JOIN motifs m ON m.id = im.motif_id"),
+    'atu': ("ATU", "SELECT atu_type, item_no FROM atu_types"),
+    'subject': ("주제어", "SELECT subject, item_no FROM subjects"),
+    'era': ("시대", f"""
+        SELECT COALESCE(NULLIF(TRIM(m.era), ''), '{UNKNOWN}'), i.item_no
+        FROM items i LEFT JOIN item_meta m ON m.item_no = i.item_no
+    """),
+}
+
+# 값만으로 알아보기 어려운 facet 의 표시 이름 (value, label)
+FACET_LABELS = {
+    'region': "SELECT code, name FROM regions WHERE level = 1",
+    'district': """
+        SELECT d.code, p.name || ' ' || d.name
+        FROM regions d JOIN regions p ON p.code = d.parent
+        WHERE d.level = 2
+    """,
+    'motif': "SELECT motif_code, motif_code || ' ' || COALESCE(motif_name, '') FROM motifs",
+}
+
+# 모든 자료가 값 하나씩을 갖는 facet — 값 비트맵의 합집합이 전체 자료
+UNIVERSE_FACET = 'region'
+
+
+def _encode(item_nos, n_bytes):
+    buf = bytearray(n_bytes)
+    for n in item_nos:
+        buf[n >> 3] |= 1 << (n & 7)
+    return zlib.compress(bytes(buf))
+
+
+def _decode(blob):
+    return int.from_bytes(zlib.decompress(blob), 'little')
+
+
+def build_facets(conn):
+    """facet_bitmaps 재구성"""
+    execute_ddl(conn, FACET_DDL)
+    n_bytes = (conn.execute("SELECT COALESCE(MAX(item_no), 0) FROM items").fetchone()[0] >> 3) + 1
+    conn.execute("DELETE FROM facet_bitmaps")
+    n_values = 0
+    for facet, (_, sql) in FACETS.items():
+        members = {}
+        for value, item_no in conn.execute(sql):
+            if value:
+                members.setdefault(value, set()).add(item_no)
+        labels = dict(conn.execute(FACET_LABELS[facet]).fetchall()) if facet in FACET_LABELS else {}
+        conn.executemany(
+            "INSERT INTO facet_bitmaps (facet, value, label, n_items, bits) VALUES (?,?,?,?,?)",
+            [(facet, value, labels.get(value, value), len(nos), _encode(nos, n_bytes))
+             for value, nos in members.items()]
+        )
+        n_values += len(members)
+    return n_values
+
+
+def item_nos(bits, limit=None):
+    """비트맵 → 오름차순 item_no 목록 (limit 개까지)"""
+    found = []
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for i, byte in enumerate(data):
+        if not byte:
+            continue
+        for j in range(8):
+            if byte >> j & 1:
+                found.append(i * 8 + j)
+                if limit is not None and len(found) >= limit:
+                    return found
+    return found
+
+
+class FacetIndex:
+    """메모리에 올린 facet 비트맵. selected 는 {facet: [값, ...]} — 빈 목록은 필터 없음"""
+
+    def __init__(self, bitmaps, labels):
+        self.bitmaps = bitmaps          # {facet: {value: int}}
+        self.labels = labels            # {facet: {value: label}}
+        self.universe = reduce(or_, bitmaps.get(UNIVERSE_FACET, {}).values(), 0)
+
+    def match(self, selected, skip=None):
+        """필터를 모두 만족하는 자료 비트맵 (skip facet 의 필터는 빼고)"""
+        bits = self.universe
+        for facet, values in selected.items():
+            if facet == skip or not values:
+                continue
+            values_bits = self.bitmaps.get(facet, {})
+            bits &= reduce(or_, (values_bits.get(v, 0) for v in values), 0)
+        return bits
+
+    def counts(self, selected, facet, limit=None):
+        """facet 값별 [(value, label, 개수)] — 개수 많은 순, 0 인 값은 뺀다.
+
+        선택한 값은 개수가 0 이거나 limit 밖이어도 남긴다 (선택 상자에서 사라지지 않도록).
+        """
+        base = self.match(selected, skip=facet)
+        chosen = set(selected.get(facet) or ())
+        labels = self.labels.get(facet, {})
+        rows = []
+        for value, bits in self.bitmaps.get(facet, {}).items():
+            n = (bits & base).bit_count()
+            if n or value in chosen:
+                rows.append((value, labels.get(value, value), n))
+        rows.sort(key=lambda r: (-r[2], r[0]))
+        if limit and len(rows) > limit:
+            rows = rows[:limit] + [r for r in rows[limit:] if r[0] in chosen]
+        return rows
+
+    def search(self, selected, limit=None):
+        """(일치 자료 수, 일치 비트맵, {facet: 값별 개수})"""
+        bits = self.match(selected)
+        return bits.bit_count(), bits, {facet: self.counts(selected, facet, limit) for facet in FACETS}
+
+
+def load_facet_index(conn):
+    """facet_bitmaps 전체를 FacetIndex 로 읽는다 (페이지에서 db_version 별로 한 번)"""
+    bitmaps, labels = {}, {}
+    for facet, value, label, blob in conn.execute("SELECT facet, value, label, bits FROM facet_bitmaps"):
+        bitmaps.setdefault(facet, {})[value] = _decode(blob)
+        labels.setdefault(facet, {})[value] = label
+    return FacetIndex(bitmaps, labels)
+
+
+def get_items_by_nos(conn, nos):
+    """결과 목록용 자료 행 (item_no 순)"""
+    if not nos:
+        return []
+    return conn.execute(f"""
+        SELECT id, title, region, district, category FROM items
+        WHERE item_no IN ({','.join('?' * len(nos))})
+        ORDER BY item_no
+    """, list(nos)).fetchall()
@@ -0,0 +1,196 @@
+"""
+오프라인 지명 지오코더 — data/gazetteer.csv (행정구역·산·사찰 등) 기준
+
+정확 일치 → 정규화 일치 → 유사 일치(bigram 후보 + 문자열 유사도) 순으로 찾고,
+결과는 재빌드와 무관한 geocode_cache.db 에 이름별로 저장해 다음 실행에서 재사용한다.
+지명집 파일이 바뀌면 version 이 달라져 캐시 항목은 다시 계산된다.
+"""
+import csv
+import difflib
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+GAZETTEER_PATH = os.path.join(ROOT_DIR, 'data', 'gazetteer.csv')
+GEOCODE_CACHE_PATH = os.path.join(ROOT_DIR, 'geocode_cache.db')
+
+FUZZY_THRESHOLD = 0.75
+CONFIDENCE = {'exact': 1.0, 'normalized': 0.95}
+
+# 행정구역 이름은 '창녕' 처럼 접미사 없이도 쓰이므로 정규화 키를 하나 더 둔다
+ADMIN_SUFFIXES = ('특별자치시', '특별자치도', '특별시', '광역시', '시', '군', '구')
+ADMIN_KINDS = ('province', 'city', 'district')
+
+
+def normalize_place_name(name):
+    """NFKC, 괄호 설명·공백·구두점 제거, 소문자화 — '금강 산 (강원)' → '금강산'"""
+    name = unicodedata.normalize('NFKC', name or '')
+    name = re.sub(r'\(.*?\)|\[.*?\]', '', name)
+    name = re.sub(r'[\s·・.,\-_/]+', '', name)
+    return name.lower()
+
+
+def place_trigrams(norm):
+    """앞 두 칸·뒤 한 칸을 덧댄 trigram 집합 — 두 글자 지명도 색인된다"""
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _bigrams(s):
+    return {s[i:i + 2] for i in range(len(s) - 1)} or {s}
+
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        self.version = hashlib.sha1(raw).hexdigest()[:12]
+        self.entries = []
+        self.aliases = []
+        self.exact = {}
+        self.normalized = {}
+        self.by_bigram = defaultdict(set)
+
+        reader = csv.DictReader(raw.decode('utf-8-sig').splitlines())
+        for row in reader:
+            idx = len(self.entries)
+            self.entries.append((row['name'], row['kind'], float(row['lat']), float(row['lng'])))
+            names = [row['name']] + [a for a in (row.get('aliases') or '').split('|') if a]
+            self.aliases.append(names)
+            for n in names:
+                self.exact.setdefault(n.strip(), idx)
+                key = normalize_place_name(n)
+                self._add_normalized(key, idx)
+                if row['kind'] in ADMIN_KINDS:
+                    for suffix in ADMIN_SUFFIXES:
+                        if key.endswith(suffix) and len(key) - len(suffix) >= 2:
+                            self._add_normalized(key[:-len(suffix)], idx)
+                            break
+
+    def names_for(self, name):
+        """지명집 항목의 이름과 모든 별칭 (없는 이름이면 빈 목록)"""
+        idx = self.exact.get(name)
+        return list(self.aliases[idx]) if idx is not None else []
+
+    def _add_normalized(self, key, idx):
+        if not key or key in self.normalized:
+            return
+        self.normalized[key] = idx
+        for bg in _bigrams(key):
+            self.by_bigram[bg].add(key)
+
+    def _result(self, idx, status, confidence):
+        name, kind, lat, lng = self.entries[idx]
+        return {'lat': lat, 'lng': lng, 'status': status,
+                'confidence': round(confidence, 3), 'matched': name, 'kind': kind}
+
+    def lookup(self, name):
+        """dict(lat, lng, status, confidence, matched, kind) 또는 None"""
+        name = (name or '').strip()
+        if not name:
+            return None
+        if name in self.exact:
+            return self._result(self.exact[name], 'exact', CONFIDENCE['exact'])
+        key = normalize_place_name(name)
+        if key in self.normalized:
+            return self._result(self.normalized[key], 'normalized', CONFIDENCE['normalized'])
+        if len(key) < 2:
+            return None
+
+        candidates = set()
+        for bg in _bigrams(key):
+            candidates |= self.by_bigram.get(bg, set())
+        best, best_ratio = None, FUZZY_THRESHOLD
+        for cand in sorted(candidates):
+            ratio = difflib.SequenceMatcher(None, key, cand).ratio()
+            if ratio > best_ratio or (ratio == best_ratio and best is None):
+                best, best_ratio = cand, ratio
+        if best is None:
+            return None
+        return self._result(self.normalized[best], 'fuzzy', 0.9 * best_ratio)
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    return Gazetteer()
+
+
+class GeocodeCache:
+    """이름 → 좌표 영구 캐시 (실패도 저장해 같은 이름을 반복 계산하지 않음)"""
+
+    DDL = """
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        name TEXT PRIMARY KEY,
+        lat REAL, lng REAL,
+        status TEXT, confidence REAL, matched TEXT,
+        gazetteer_version TEXT,
+        updated_at TEXT
+    )
+    """
+
+    def __init__(self, path=GEOCODE_CACHE_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(self.DDL)
+
+    def get_many(self, names, version):
+        found = {}
+        names = list(names)
+        for i in range(0, len(names), 500):
+            part = names[i:i + 500]
+            for row in self.conn.execute(f"""
+                SELECT name, lat, lng, status, confidence, matched FROM geocode_cache
+                WHERE gazetteer_version = ? AND name IN ({','.join('?' * len(part))})
+            """, [version] + part):
+                found[row[0]] = {'lat': row[1], 'lng': row[2], 'status': row[3],
+                                 'confidence': row[4], 'matched': row[5]}
+        return found
+
+    def put_many(self, results, version):
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO geocode_cache
+                (name, lat, lng, status, confidence, matched, gazetteer_version, updated_at)
+            VALUES (?,?,?,?,?,?,?,datetime('now'))
+        """, [(name, r['lat'], r['lng'], r['status'], r['confidence'], r['matched'], version)
+              for name, r in results.items()])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+FAILED = {'lat': None, 'lng': None, 'status': 'failed', 'confidence': 0.0, 'matched': None}
+
+
+def geocode_names(names, gazetteer=None, cache_path=GEOCODE_CACHE_PATH):
+    """이름 목록 일괄 지오코딩 → {name: result}. 실패한 이름은 status='failed'."""
+    gazetteer = gazetteer or get_gazetteer()
+    names = list(dict.fromkeys(n for n in names if n))
+    cache = GeocodeCache(cache_path)
+    try:
+        results = cache.get_many(names, gazetteer.version)
+        fresh = {}
+        for name in names:
+            if name not in results:
+                fresh[name] = gazetteer.lookup(name) or dict(FAILED)
+        if fresh:
+            cache.put_many(fresh, gazetteer.version)
+        results.update(fresh)
+    finally:
+        cache.close()
+    return results
+
+
+def resolve_location(*names):
+    """앞에서부터 처음 찾아지는 지명의 좌표 — 예: resolve_location(district, region)"""
+    gazetteer = get_gazetteer()
+    for name in names:
+        hit = gazetteer.lookup(name)
+        if hit:
+            return hit
+    return None
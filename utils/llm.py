@@ -0,0 +1,84 @@
+"""
+LLM 클라이언트 — anthropic · dotenv 는 AI 기능을 실제로 쓸 때 처음 import 한다.
+
+페이지 상단에서 import 하면 지도만 보는 사용자도 매번 import 비용을 치르므로
+페이지는 get_api_key() / get_client() 만 호출한다.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+MODEL = "claude-sonnet-4-6"
+MAX_PARALLEL_STREAMS = 4    # 동시에 여는 스트림 수 — 요청 한도(분당 요청·토큰)를 넘지 않도록
+
+TRANSCRIPT_TOKEN_BUDGET = 12000     # 전사본 한 편에 쓸 입력 토큰 상한 (넘으면 앞부분만 보낸다)
+MIN_OUTPUT_TOKENS = 512
+MAX_OUTPUT_TOKENS = 8192
+ANSWER_OUTPUT_RATIO = 0.3           # 질의응답 답변 분량 / 근거 본문 분량 (토큰)
+
+
+@lru_cache(maxsize=1)
+def _load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return False
+    return load_dotenv()
+
+
+def get_api_key():
+    """.env 를 (한 번만) 읽고 ANTHROPIC_API_KEY 반환. 없으면 빈 문자열"""
+    _load_env()
+    return os.environ.get("ANTHROPIC_API_KEY", "")
+
+
+@lru_cache(maxsize=4)
+def get_client(api_key):
+    """anthropic 클라이언트 — 키별로 하나를 만들어 재사용 (연결 풀 공유)"""
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def stream_concurrently(client, requests, max_workers=MAX_PARALLEL_STREAMS):
+    """여러 messages.stream 요청을 동시에 흘려 받는다.
+
+    requests 는 {key: messages.stream 인자}. 워커 스레드는 조각을 큐에만 넣고,
+    호출한 스레드(Streamlit 스크립트)가 (key, 종류, 값) 을 도착 순서대로 받아 화면을 그린다.
+    종류는 'text' (조각) · 'error' (오류 메시지) · 'done' (그 요청 끝). 중간에 그만 받으면 남은 스트림도 멈춘다.
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def run(key, kwargs):
+        try:
+            with client.messages.stream(**kwargs) as stream:
+                for text in stream.text_stream:
+                    if stop.is_set():
+                        break
+                    events.put((key, 'text', text))
+        except Exception as e:
+            events.put((key, 'error', f"{type(e).__name__}: {e}"))
+        finally:
+            events.put((key, 'done', None))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-stream') as pool:
+        for key, kwargs in requests.items():
+            pool.submit(run, key, kwargs)
+        remaining = len(requests)
+        try:
+            while remaining:
+                event = events.get()
+                if event[1] == 'done':
+                    remaining -= 1
+                yield event
+        finally:
+            # 아직 시작하지 않은 요청은 취소하고, 진행 중인 스트림은 다음 조각에서 멈춘다
+            stop.set()
+            pool.shutdown(cancel_futures=True)
+
+
+def output_budget(input_tokens, ratio, margin=256):
+    """입력 분량에 비례한 max_tokens — 변환 결과가 원문 길이의 ratio 배 정도일 때 잘리지 않도록"""
+    return max(MIN_OUTPUT_TOKENS, min(MAX_OUTPUT_TOKENS, int(input_tokens * ratio) + margin))
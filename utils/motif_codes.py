@@ -0,0 +1,141 @@
+"""
+Thompson 모티프 코드 체계 — 정렬 키와 범위 질의
+
+코드는 '장(영문 한 글자) + 번호 + 점으로 이어지는 하위 번호' 구조다 (D1711.2 ⊂ D1711, D1700–D1799 ⊂ D).
+번호를 고정 폭으로 채운 정렬 키(sort_key)를 motifs 에 저장해 두면
+장 · 번호 구간 · 하위 코드 전체가 모두 sort_key 인덱스의 범위 읽기 한 번이 된다.
+
+    D1711.2 → 'D1711.002'      D17 → 'D0017'      (해석할 수 없는 코드는 '~' 뒤에 원문)
+"""
+import re
+import unicodedata
+
+# Thompson 모티프 색인의 장 (I · O · Y 는 없다)
+THOMPSON_CHAPTERS = {
+    'A': '신화', 'B': '동물', 'C': '금기', 'D': '마법', 'E': '죽음', 'F': '경이', 'G': '요괴',
+    'H': '시험', 'J': '지혜와 어리석음', 'K': '속임수', 'L': '운명의 역전', 'M': '미래의 예정',
+    'N': '우연과 운명', 'P': '사회', 'Q': '보상과 처벌', 'R': '포로와 도망', 'S': '잔혹함',
+    'T': '성', 'U': '삶의 본성', 'V': '종교', 'W': '성격', 'X': '해학', 'Z': '기타',
+}
+
+NUM_WIDTH = 4
+SUB_WIDTH = 3
+UNPARSED_PREFIX = '~'    # 영문 대문자보다 뒤에 정렬된다
+
+_CODE_RE = re.compile(r'^([A-Z])(\d{1,4})((?:\.\d{1,3})*)$')
+_WILDCARD_RE = re.compile(r'^([A-Z])(\d*)([X*?]+)$')
+_RANGE_RE = re.compile(r'^([A-Z]\d{1,4}(?:\.\d{1,3})*)\s*[-~–]\s*([A-Z]\d{1,4}(?:\.\d{1,3})*)$')
+
+
+MAX_TERM_CHARS = 12      # 이보다 긴 어절은 앞부분만 색인
+
+
+def _clean(code):
+    return re.sub(r'\s+', '', code or '').upper()
+
+
+def motif_sort_key(code):
+    """(정렬 키, 깊이) — 깊이는 번호만 있으면 1, 하위 번호 하나마다 +1. 해석 못 하면 깊이 None"""
+    cleaned = _clean(code)
+    m = _CODE_RE.match(cleaned)
+    if not m:
+        return UNPARSED_PREFIX + (code or '').strip(), None
+    letter, num, subs = m.groups()
+    parts = [int(s) for s in subs.split('.')[1:]]
+    key = f"{letter}{int(num):0{NUM_WIDTH}d}" + ''.join(f".{p:0{SUB_WIDTH}d}" for p in parts)
+    return key, 1 + len(parts)
+
+
+def _subtree_end(key):
+    # 하위 코드 키는 '키.' 로 이어지고 '.' 다음 문자가 '/' 이므로 [키, 키 + '/') 가 하위 전체
+    return key + '/'
+
+
+def motif_code_range(query):
+    """질의 → (lo, hi) 정렬 키 반열린 구간. 알아볼 수 없으면 None
+
+    'D'            장 전체
+    'D17xx' 'D1**' 번호 구간 (D1700–D1799, D1000–D1999)
+    'D1700-D1799'  양 끝 포함 구간 (끝 코드의 하위 코드 포함)
+    'D1711'        그 코드와 하위 코드 전체 (D1711, D1711.1, D1711.2.3 …)
+    """
+    q = _clean(query)
+    if re.fullmatch(r'[A-Z]', q or ''):
+        return q, chr(ord(q) + 1)
+    m = _WILDCARD_RE.match(q)
+    if m:
+        letter, digits, wild = m.groups()
+        width = len(digits) + len(wild)
+        if width > NUM_WIDTH:
+            return None
+        base = int(digits or 0) * 10 ** len(wild)
+        top = (int(digits or 0) + 1) * 10 ** len(wild)
+        lo = f"{letter}{base:0{NUM_WIDTH}d}"
+        hi = f"{letter}{top:0{NUM_WIDTH}d}" if top < 10 ** NUM_WIDTH else chr(ord(letter) + 1)
+        return lo, hi
+    m = _RANGE_RE.match(q)
+    if m:
+        lo, _ = motif_sort_key(m.group(1))
+        end, _ = motif_sort_key(m.group(2))
+        return (lo, _subtree_end(end)) if lo <= end else None
+    if _CODE_RE.match(q):
+        key, _ = motif_sort_key(q)
+        return key, _subtree_end(key)
+    return None
+
+
+# ─── 모티프 찾기(type-ahead) 용어 ─────────────────────────────────────────────
+# 코드는 앞부분 일치('D17' → D17, D1711, D1711.2), 이름은 어절 안 어디든 일치('술' → 도술 승려).
+# 어절의 모든 접미사를 용어로 저장하면 부분 일치도 용어 인덱스의 앞부분 범위 읽기가 된다.
+
+def normalize_motif_text(text):
+    return unicodedata.normalize('NFKC', text or '').upper()
+
+
+def motif_terms(code, name):
+    """모티프 하나의 색인 용어 집합"""
+    terms = {_clean(code)} if code else set()
+    for word in re.findall(r'\w+', normalize_motif_text(name)):
+        word = word[:MAX_TERM_CHARS]
+        terms.update(word[i:] for i in range(len(word)))
+    terms.discard('')
+    return terms
+
+
+def prefix_range(prefix):
+    """앞부분이 prefix 인 문자열의 [lo, hi) 범위"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def motif_query_ranges(query):
+    """찾기 질의 → 어절별 용어 범위 목록 (모든 어절이 맞아야 한다)"""
+    words = re.findall(r'[\w.]+', normalize_motif_text(query))
+    return [prefix_range(w[:MAX_TERM_CHARS]) for w in dict.fromkeys(words)]
+
+
+MOTIF_TERMS_DDL = """
+CREATE TABLE IF NOT EXISTS motif_terms (
+    term TEXT NOT NULL,
+    motif_id INTEGER NOT NULL,
+    PRIMARY KEY (term, motif_id)
+) WITHOUT ROWID
+"""
+
+
+def build_motif_terms(conn, item_ids=None):
+    """motif_terms 재구성. 증분 갱신(item_ids)에서는 새로 생긴 모티프만 추가한다."""
+    conn.execute(MOTIF_TERMS_DDL)
+    if item_ids is None:
+        conn.execute("DELETE FROM motif_terms")
+        rows = conn.execute("SELECT id, motif_code, motif_name FROM motifs").fetchall()
+    else:
+        # motifs.id 는 AUTOINCREMENT 라 새 모티프는 이미 색인된 가장 큰 id 뒤에 온다
+        rows = conn.execute("""
+            SELECT id, motif_code, motif_name FROM motifs
+            WHERE id > (SELECT COALESCE(MAX(motif_id), 0) FROM motif_terms)
+        """).fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO motif_terms (term, motif_id) VALUES (?,?)",
+        [(term, mid) for mid, code, name in rows for term in motif_terms(code, name)]
+    )
+    return len(rows)
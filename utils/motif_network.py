@@ -0,0 +1,118 @@
+"""
+모티프 연결망 — 함께 나오는 모티프(동시 출현) · 지역별 편중 · ATU 유형 대응을 빌드 때 미리 계산한다.
+
+동시 출현 점수는 모티프가 태깅된 자료 N 편 기준으로
+    lift = N · n(a∧b) / (n(a) · n(b)),   PMI = log2(lift)
+지역 편중은 시도 코드(region_code 앞 3자리)별로 lift = (그 지역에서의 비율) / (전체 비율) = N · n(m∧r) / (n(m) · n(r)).
+모티프 쌍 전체는 희소 행렬이라도 크므로 모티프마다 자료 수 순 · lift 순 상위 이웃만 남긴다.
+"""
+import math
+from collections import defaultdict
+
+from utils.db import execute_ddl
+from utils.regions import UNKNOWN_PROVINCE
+
+NETWORK_DDL = """
+CREATE TABLE IF NOT EXISTS stats_motif_pairs (
+    motif_id INTEGER NOT NULL,
+    other_id INTEGER NOT NULL,
+    n_both INTEGER NOT NULL,
+    lift REAL NOT NULL,
+    pmi REAL NOT NULL,
+    PRIMARY KEY (motif_id, other_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_motif_region (
+    motif_id INTEGER NOT NULL,
+    region_code TEXT NOT NULL,      -- 시도 코드 (utils/regions)
+    n_items INTEGER NOT NULL,
+    lift REAL NOT NULL,
+    PRIMARY KEY (motif_id, region_code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stats_motif_region_lift ON stats_motif_region(region_code, lift DESC, n_items);
+
+CREATE TABLE IF NOT EXISTS stats_motif_atu (
+    motif_id INTEGER NOT NULL,
+    atu_type TEXT NOT NULL,
+    n_items INTEGER NOT NULL,
+    PRIMARY KEY (motif_id, atu_type)
+) WITHOUT ROWID;
+"""
+
+NEIGHBOURS_PER_ORDER = 30   # 모티프마다 자료 수 순 · lift 순으로 각각 남길 이웃 수
+MIN_PAIR_ITEMS = 2          # lift 순 이웃은 적어도 이만큼 함께 나온 쌍만 (한 번 겹친 희귀 모티프 배제)
+ATU_PER_MOTIF = 20
+
+
+def _lift(n_total, n_both, n_a, n_b):
+    return n_total * n_both / (n_a * n_b)
+
+
+def _top_pairs(pairs, n_total, n_motif):
+    """모티프별 이웃 후보 [(motif_id, other_id, n_both, lift, pmi)] — 자료 수 순 ∪ lift 순 상위"""
+    by_motif = defaultdict(list)
+    for a, b, n_both in pairs:
+        lift = _lift(n_total, n_both, n_motif[a], n_motif[b])
+        by_motif[a].append((b, n_both, lift))
+        by_motif[b].append((a, n_both, lift))
+
+    rows = []
+    for motif_id, others in by_motif.items():
+        keep = {}
+        for other in sorted(others, key=lambda o: (-o[1], -o[2]))[:NEIGHBOURS_PER_ORDER]:
+            keep[other[0]] = other
+        strong = [o for o in others if o[1] >= MIN_PAIR_ITEMS]
+        for other in sorted(strong, key=lambda o: (-o[2], -o[1]))[:NEIGHBOURS_PER_ORDER]:
+            keep[other[0]] = other
+        rows.extend((motif_id, b, n_both, lift, math.log2(lift)) for b, n_both, lift in keep.values())
+    return rows
+
+
+def build_motif_network(conn):
+    """stats_motif_pairs / stats_motif_region / stats_motif_atu 재계산"""
+    execute_ddl(conn, NETWORK_DDL)
+    for table in ('stats_motif_pairs', 'stats_motif_region', 'stats_motif_atu'):
+        conn.execute(f"DELETE FROM {table}")
+
+    n_motif = dict(conn.execute("SELECT motif_id, COUNT(*) FROM item_motifs GROUP BY motif_id").fetchall())
+    n_total = conn.execute("SELECT COUNT(DISTINCT item_no) FROM item_motifs").fetchone()[0]
+    if not n_total:
+        return 0
+
+    # 같은 자료 안 모티프 쌍 — item_motifs 기본키 (item_no, motif_id) 범위 조인
+    pairs = conn.execute("""
+        SELECT a.motif_id, b.motif_id, COUNT(*)
+        FROM item_motifs a JOIN item_motifs b ON b.item_no = a.item_no AND b.motif_id > a.motif_id
+        GROUP BY a.motif_id, b.motif_id
+    """).fetchall()
+    conn.executemany(
+        "INSERT INTO stats_motif_pairs (motif_id, other_id, n_both, lift, pmi) VALUES (?,?,?,?,?)",
+        _top_pairs(pairs, n_total, n_motif)
+    )
+
+    region_expr = f"COALESCE(SUBSTR(i.region_code, 1, 3), '{UNKNOWN_PROVINCE}')"
+    n_region = dict(conn.execute(f"""
+        SELECT {region_expr}, COUNT(*) FROM items i
+        WHERE EXISTS (SELECT 1 FROM item_motifs im WHERE im.item_no = i.item_no)
+        GROUP BY 1
+    """).fetchall())
+    cells = conn.execute(f"""
+        SELECT im.motif_id, {region_expr}, COUNT(*)
+        FROM item_motifs im JOIN items i ON i.item_no = im.item_no
+        GROUP BY 1, 2
+    """).fetchall()
+    conn.executemany(
+        "INSERT INTO stats_motif_region (motif_id, region_code, n_items, lift) VALUES (?,?,?,?)",
+        [(m, r, n, _lift(n_total, n, n_motif[m], n_region[r])) for m, r, n in cells]
+    )
+
+    conn.execute("""
+        INSERT INTO stats_motif_atu (motif_id, atu_type, n_items)
+        SELECT motif_id, atu_type, n FROM (
+            SELECT im.motif_id, a.atu_type, COUNT(*) AS n,
+                   ROW_NUMBER() OVER (PARTITION BY im.motif_id ORDER BY COUNT(*) DESC, a.atu_type) AS rank
+            FROM item_motifs im JOIN atu_types a ON a.item_no = im.item_no
+            GROUP BY im.motif_id, a.atu_type
+        ) WHERE rank <= ?
+    """, (ATU_PER_MOTIF,))
+    return len(n_motif)
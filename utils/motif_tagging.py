@@ -0,0 +1,186 @@
+"""
+AI 모티프 태깅 프롬프트 · 응답 정규화 · 백엔드
+
+04_설화입력 페이지와 scripts/backfill_motifs.py 가 같은 프롬프트와 검증 로직을 쓴다.
+"""
+import json
+import re
+import importlib
+
+from utils.llm import MODEL, get_api_key, get_client, output_budget
+from utils.texts import estimate_tokens
+
+
+PROMPT_TEMPLATE = """다음 설화 본문을 읽고 아래 JSON 형식으로 분석 결과를 반환하세요.
+
+{{
+  "motifs": ["모티프코드-설명", ...],
+  "atu_types": ["ATU XXX", ...],
+  "subjects": ["주제어", ...],
+  "places": ["이야기에 나오는 지명", ...],
+  "narrative_units": ["서사단락1", "서사단락2", ...],
+  "structure": "서사구조 요약",
+  "era": "시대"
+}}
+
+[설화 본문]:
+{content}
+
+JSON만 출력하고 다른 설명은 하지 마세요."""
+
+# 태깅 응답 분량 / 본문 분량 (토큰) — 서사 단락이 본문을 요약해 따라가므로 본문 길이에 비례한다
+TAGGING_OUTPUT_RATIO = 0.5
+
+MOTIF_RE = re.compile(r'^([A-Z]\d+(?:\.\d+)*)\s*(?:-\s*(.*))?$')
+ATU_RE = re.compile(r'^(?:ATU|AT)?\s*(\d+[A-Z*]*)$', re.IGNORECASE)
+
+
+def build_prompt(content):
+    return PROMPT_TEMPLATE.format(content=content)
+
+
+def tagging_budget(content):
+    """태깅 요청의 max_tokens — 본문 토큰 추정치에 맞춘다"""
+    return output_budget(estimate_tokens(content or ''), TAGGING_OUTPUT_RATIO)
+
+
+def extract_json(raw):
+    """모델 응답에서 JSON 본문만 잘라낸다 (```json ... ``` 형식 처리)"""
+    raw = (raw or '').strip()
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+    raw = raw.strip()
+    if not raw.startswith('{'):
+        start, end = raw.find('{'), raw.rfind('}')
+        if start != -1 and end > start:
+            raw = raw[start:end + 1]
+    return raw
+
+
+def _str_list(val):
+    if isinstance(val, str):
+        val = [val]
+    if not isinstance(val, list):
+        return []
+    out = []
+    for v in val:
+        if isinstance(v, str) and v.strip() and v.strip() not in out:
+            out.append(v.strip())
+    return out
+
+
+def normalize_motif(motif_str):
+    """'D1711 - 도술 승려' → 'D1711-도술 승려'. 코드 형식이 아니면 None"""
+    m = MOTIF_RE.match(motif_str.strip())
+    if not m:
+        return None
+    code, name = m.group(1), (m.group(2) or '').strip()
+    return f"{code}-{name}" if name else code
+
+
+def normalize_atu(atu_str):
+    """'atu300' / 'AT 300' → 'ATU 300'. 번호가 없으면 None"""
+    m = ATU_RE.match(atu_str.strip())
+    if not m:
+        return None
+    return f"ATU {m.group(1).upper()}"
+
+
+def normalize_draft(raw):
+    """모델 응답(문자열 또는 dict)을 검증·정규화해 build_db 레코드 형식으로 반환.
+
+    JSON이 아니거나 객체가 아니면 ValueError.
+    """
+    if isinstance(raw, str):
+        try:
+            obj = json.loads(extract_json(raw))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 파싱 실패: {e}") from e
+    else:
+        obj = raw
+    if not isinstance(obj, dict):
+        raise ValueError("JSON 객체가 아닙니다")
+
+    motifs = [m for m in map(normalize_motif, _str_list(obj.get('motifs'))) if m]
+    atu_types = [a for a in map(normalize_atu, _str_list(obj.get('atu_types'))) if a]
+    structure = obj.get('structure') if isinstance(obj.get('structure'), str) else ''
+    era = obj.get('era') if isinstance(obj.get('era'), str) else ''
+    return {
+        'motifs': list(dict.fromkeys(motifs)),
+        'atu_types': list(dict.fromkeys(atu_types)),
+        'subjects': _str_list(obj.get('subjects')),
+        'places': _str_list(obj.get('places')),
+        'narrative_units': _str_list(obj.get('narrative_units')),
+        'structure': structure.strip(),
+        'era': era.strip(),
+    }
+
+
+# ─── 백엔드 ───────────────────────────────────────────────────────────────────
+# 백엔드는 tag(content) -> 원문 응답 문자열 을 제공하고, name 을 출처(provenance)로 남긴다.
+
+class AnthropicBackend:
+    def __init__(self, model=MODEL, max_tokens=None, api_key=None):
+        api_key = api_key or get_api_key()
+        if not api_key:
+            raise RuntimeError(".env 파일에 ANTHROPIC_API_KEY를 설정하세요.")
+        self.client = get_client(api_key)
+        self.model = model
+        self.max_tokens = max_tokens    # None 이면 본문 길이에 맞춘다 (tagging_budget)
+        self.name = f"anthropic:{model}"
+
+    def tag(self, content):
+        resp = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens or tagging_budget(content),
+            messages=[{"role": "user", "content": build_prompt(content)}]
+        )
+        return resp.content[0].text
+
+
+class StubBackend:
+    """네트워크 없이 키워드 규칙으로 응답을 흉내 내는 로컬 백엔드 (개발·테스트용)"""
+
+    name = "stub"
+
+    RULES = [
+        ("변신", "D10-변신"),
+        ("도술", "D1711-도술"),
+        ("호랑이", "B211.2.1-호랑이"),
+        ("용", "B11-용"),
+        ("효", "W27-효행"),
+        ("보물", "N500-보물 발견"),
+    ]
+    # 본문에 이 이름이 보이면 지명으로 낸다
+    PLACES = ("금강산", "지리산", "한라산", "백두산", "해인사", "불국사")
+
+    def tag(self, content):
+        motifs = [m for kw, m in self.RULES if kw in content]
+        units = [s.strip() for s in re.split(r'[.!?。]\s*', content) if s.strip()][:5]
+        return json.dumps({
+            "motifs": motifs,
+            "atu_types": [],
+            "subjects": [kw for kw, _ in self.RULES if kw in content],
+            "places": [name for name in self.PLACES if name in content],
+            "narrative_units": units,
+            "structure": "",
+            "era": "",
+        }, ensure_ascii=False)
+
+
+BACKENDS = {
+    'anthropic': AnthropicBackend,
+    'stub': StubBackend,
+}
+
+
+def get_backend(spec, **kwargs):
+    """'anthropic' / 'stub' 또는 'package.module:ClassName' 으로 백엔드 생성"""
+    if spec in BACKENDS:
+        return BACKENDS[spec](**kwargs)
+    if ':' in spec:
+        module_name, attr = spec.split(':', 1)
+        return getattr(importlib.import_module(module_name), attr)(**kwargs)
+    raise ValueError(f"알 수 없는 백엔드: {spec}")
@@ -0,0 +1,224 @@
+"""
+지명 정규화 — 표기만 다른 places 행(금강산 / 금강 산 / 金剛山)을 canonical_places 하나로 묶고,
+별칭(place_aliases)과 trigram 색인(place_trigrams)을 만든다.
+
+묶는 기준은 지명집 정확·정규화 일치 항목, 없으면 정규화된 이름이다.
+유사 일치(fuzzy)는 산맥·봉우리처럼 다른 장소일 수 있어 묶지 않는다.
+"""
+from utils.db import execute_ddl
+from utils.geocode import geocode_names, get_gazetteer, normalize_place_name, place_trigrams
+
+CANONICAL_DDL = """
+CREATE TABLE IF NOT EXISTS canonical_places (
+    id INTEGER PRIMARY KEY,
+    place_name TEXT,
+    norm_name TEXT UNIQUE,
+    lat REAL,
+    lng REAL,
+    geocode_status TEXT,
+    geocode_confidence REAL,
+    item_count INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS place_aliases (
+    norm_alias TEXT PRIMARY KEY,
+    alias TEXT,
+    canonical_id INTEGER REFERENCES canonical_places(id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS place_trigrams (
+    gram TEXT,
+    canonical_id INTEGER REFERENCES canonical_places(id),
+    PRIMARY KEY (gram, canonical_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_place_aliases_canonical ON place_aliases(canonical_id);
+CREATE INDEX IF NOT EXISTS idx_places_canonical ON places(canonical_id);
+"""
+
+GROUPING_STATUSES = ('exact', 'normalized')
+
+
+def _canonical_key(name, gazetteer):
+    hit = gazetteer.lookup(name)
+    if hit and hit['status'] in GROUPING_STATUSES:
+        return normalize_place_name(hit['matched']), hit['matched']
+    return normalize_place_name(name) or name, None
+
+
+def _coord_rank(place):
+    """좌표 대표값 우선순위 — 좌표가 있고 신뢰도가 높은 것, 같으면 지명집보다 원자료 좌표"""
+    confidence = place['geocode_confidence']
+    from_gazetteer = place['geocode_status'] in ('exact', 'normalized', 'fuzzy')
+    return (place['lat'] is None, -(1.0 if confidence is None else confidence), from_gazetteer)
+
+
+def geocode_item_places(conn, item_ids=None, chunk=500):
+    """좌표 없는 places 를 지명집으로 지오코딩 — 증분 갱신(item_ids)에서는 그 자료에 나오는 지명만"""
+    sql = "SELECT id, place_name FROM places WHERE lat IS NULL OR lng IS NULL"
+    if item_ids is None:
+        rows = conn.execute(sql).fetchall()
+    else:
+        item_ids, rows = list(item_ids), []
+        for i in range(0, len(item_ids), chunk):
+            part = item_ids[i:i + chunk]
+            rows += conn.execute(f"""
+                SELECT DISTINCT p.id, p.place_name
+                FROM items i JOIN item_places ip ON ip.item_no = i.item_no JOIN places p ON p.id = ip.place_id
+                WHERE i.id IN ({','.join('?' * len(part))}) AND (p.lat IS NULL OR p.lng IS NULL)
+            """, part).fetchall()
+    results = geocode_names([name for _, name in rows])
+    conn.executemany(
+        "UPDATE places SET lat = ?, lng = ?, geocode_status = ?, geocode_confidence = ? WHERE id = ?",
+        [(results[name]['lat'], results[name]['lng'], results[name]['status'],
+          results[name]['confidence'], pid) for pid, name in rows]
+    )
+    return len(rows)
+
+
+def recount_place_items(conn, canonical_ids):
+    """대표 지명 canonical_ids 의 item_count 를 다시 센다 (place_id 역방향 인덱스 사용)"""
+    canonical_ids = set(canonical_ids)
+    conn.executemany("""
+        UPDATE canonical_places SET item_count = (
+            SELECT COUNT(DISTINCT ip.item_no)
+            FROM places p JOIN item_places ip ON ip.place_id = p.id
+            WHERE p.canonical_id = canonical_places.id
+        ) WHERE id = ?
+    """, [(cid,) for cid in canonical_ids])
+    return len(canonical_ids)
+
+
+def item_canonical_ids(conn, item_ids, chunk=500):
+    """item_ids 자료가 지금 가리키는 대표 지명 id 집합"""
+    item_ids, found = list(item_ids), set()
+    for i in range(0, len(item_ids), chunk):
+        part = item_ids[i:i + chunk]
+        found.update(r[0] for r in conn.execute(f"""
+            SELECT DISTINCT p.canonical_id
+            FROM items i JOIN item_places ip ON ip.item_no = i.item_no JOIN places p ON p.id = ip.place_id
+            WHERE i.id IN ({','.join('?' * len(part))}) AND p.canonical_id IS NOT NULL
+        """, part))
+    return found
+
+
+def _add_aliases(cur, cid, aliases):
+    """대표 지명 cid 에 별칭과 그 trigram 을 더한다 (이미 있는 별칭은 그대로)"""
+    grams = set()
+    for alias in aliases:
+        norm = normalize_place_name(alias)
+        if not norm:
+            continue
+        cur.execute(
+            "INSERT OR IGNORE INTO place_aliases (norm_alias, alias, canonical_id) VALUES (?,?,?)",
+            (norm, alias, cid)
+        )
+        grams |= place_trigrams(norm)
+    cur.executemany(
+        "INSERT OR IGNORE INTO place_trigrams (gram, canonical_id) VALUES (?,?)",
+        [(gram, cid) for gram in grams]
+    )
+
+
+def _assign_new_places(conn):
+    """아직 묶이지 않은 places 만 기존 대표 지명에 붙이고, 못 찾으면 다음 id 로 새로 만든다.
+
+    기존 대표 지명의 id 는 바뀌지 않는다 (페이지 위젯 키로 쓰인다).
+    """
+    cols = ('id', 'place_name', 'lat', 'lng', 'geocode_status', 'geocode_confidence')
+    places = [dict(zip(cols, r)) for r in conn.execute(
+        f"SELECT {', '.join(cols)} FROM places WHERE canonical_id IS NULL"
+    )]
+    if not places:
+        return 0
+    gazetteer = get_gazetteer()
+    cur = conn.cursor()
+    next_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM canonical_places").fetchone()[0] + 1
+    for p in places:
+        key, matched = _canonical_key(p['place_name'], gazetteer)
+        row = cur.execute(
+            "SELECT id, lat, lng, geocode_status, geocode_confidence FROM canonical_places WHERE norm_name = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            row = cur.execute(
+                "SELECT c.id, c.lat, c.lng, c.geocode_status, c.geocode_confidence "
+                "FROM place_aliases a JOIN canonical_places c ON c.id = a.canonical_id WHERE a.norm_alias = ?",
+                (normalize_place_name(p['place_name']) or key,)
+            ).fetchone()
+        if row is None:
+            cid = next_id
+            next_id += 1
+            cur.execute(
+                "INSERT INTO canonical_places (id, place_name, norm_name, lat, lng, geocode_status, geocode_confidence) "
+                "VALUES (?,?,?,?,?,?,?)",
+                (cid, matched or p['place_name'], key, p['lat'], p['lng'],
+                 p['geocode_status'], p['geocode_confidence'])
+            )
+            aliases = [p['place_name']] + gazetteer.names_for(matched)
+        else:
+            cid = row[0]
+            current = dict(zip(cols[2:], row[1:]))
+            # 새 표기가 더 믿을 만한 좌표를 가졌으면 대표 좌표를 바꾼다
+            if _coord_rank(p) < _coord_rank(current):
+                cur.execute(
+                    "UPDATE canonical_places SET lat = ?, lng = ?, geocode_status = ?, geocode_confidence = ? "
+                    "WHERE id = ?",
+                    (p['lat'], p['lng'], p['geocode_status'], p['geocode_confidence'], cid)
+                )
+            aliases = [p['place_name']]
+        cur.execute("UPDATE places SET canonical_id = ? WHERE id = ?", (cid, p['id']))
+        _add_aliases(cur, cid, aliases)
+    return len(places)
+
+
+def build_canonical_places(conn, item_ids=None, dropped_ids=()):
+    """canonical_places / place_aliases / place_trigrams 재구성.
+
+    item_ids 가 주어지는 증분 갱신에서는 새 places 만 대표 지명에 붙이고 (id 유지),
+    그 자료에 나오는 대표 지명과 dropped_ids (갱신 전에 그 자료가 가리키던 대표 지명)의 설화 수를 다시 센다.
+    """
+    execute_ddl(conn, CANONICAL_DDL)
+    if item_ids is not None:
+        _assign_new_places(conn)
+        return recount_place_items(conn, item_canonical_ids(conn, item_ids) | set(dropped_ids))
+
+    gazetteer = get_gazetteer()
+    cols = ('id', 'place_name', 'lat', 'lng', 'geocode_status', 'geocode_confidence')
+    places = [dict(zip(cols, r)) for r in conn.execute(f"SELECT {', '.join(cols)} FROM places")]
+    usage = dict(conn.execute("SELECT place_id, COUNT(*) FROM item_places GROUP BY place_id").fetchall())
+
+    groups = {}
+    for p in places:
+        key, matched = _canonical_key(p['place_name'], gazetteer)
+        g = groups.setdefault(key, {'matched': matched, 'members': []})
+        g['members'].append(p)
+
+    conn.execute("DELETE FROM place_trigrams")
+    conn.execute("DELETE FROM place_aliases")
+    conn.execute("DELETE FROM canonical_places")
+    cur = conn.cursor()
+    for cid, (key, g) in enumerate(sorted(groups.items()), 1):
+        members = g['members']
+        best = min(members, key=_coord_rank)
+        name = g['matched'] or max(members, key=lambda p: usage.get(p['id'], 0))['place_name']
+        cur.execute(
+            "INSERT INTO canonical_places (id, place_name, norm_name, lat, lng, geocode_status, geocode_confidence) "
+            "VALUES (?,?,?,?,?,?,?)",
+            (cid, name, key, best['lat'], best['lng'], best['geocode_status'], best['geocode_confidence'])
+        )
+        cur.executemany("UPDATE places SET canonical_id = ? WHERE id = ?", [(cid, p['id']) for p in members])
+
+        _add_aliases(cur, cid, [p['place_name'] for p in members] + gazetteer.names_for(g['matched']))
+
+    # 대표 지명별 설화 수 — item_places 를 한 번만 훑는다 (빌드 중에는 place_id 역방향 인덱스가 아직 없다)
+    conn.execute("""
+        UPDATE canonical_places SET item_count = c.n
+        FROM (
+            SELECT p.canonical_id, COUNT(DISTINCT ip.item_no) AS n
+            FROM item_places ip JOIN places p ON p.id = ip.place_id
+            GROUP BY p.canonical_id
+        ) AS c
+        WHERE c.canonical_id = canonical_places.id
+    """)
+    return len(groups)
@@ -0,0 +1,267 @@
+"""
+페이지 성능 계측 — SQL 문별 시간·행 수, 이름 붙인 구간(조회 · 지도 생성 · st_folium · LLM 스트리밍)
+
+켜는 방법 (기본은 꺼져 있고 꺼져 있을 때는 일반 sqlite3 연결을 그대로 쓴다)
+- 주소 뒤에 ?debug=1  → 페이지 하단에 디버그 패널
+- 환경 변수 FOLKLORE_PROFILE=1  → 모든 페이지 계측
+- 환경 변수 FOLKLORE_PROFILE_LOG=경로  → 페이지 실행마다 JSON 한 줄씩 기록 (구조화 로그)
+
+SLOW_SQL_MS 이상 걸린 문장은 같은 인자로 EXPLAIN QUERY PLAN 을 남긴다.
+
+페이지에서는
+    start_page(__file__)            # get_conn() 보다 먼저
+    with section("지도 생성"): ...
+    render_debug_panel()            # conn.close() 전에
+"""
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+SLOW_SQL_MS = float(os.environ.get('FOLKLORE_SLOW_SQL_MS', 50))
+PROFILE_ENV = 'FOLKLORE_PROFILE'
+PROFILE_LOG_ENV = 'FOLKLORE_PROFILE_LOG'
+
+logger = logging.getLogger('folklore.profile')
+
+_current = contextvars.ContextVar('folklore_profiler', default=None)
+
+
+class Profiler:
+    """한 번의 페이지 실행 동안의 SQL 기록과 구간 시간"""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.statements = []
+        self.sections = []
+        self._stack = []
+
+    @property
+    def current_section(self):
+        return self._stack[-1] if self._stack else None
+
+    def record_sql(self, sql, params):
+        entry = {'sql': ' '.join(sql.split()), 'params': params, 'ms': 0.0, 'rows': 0,
+                 'section': self.current_section, 'plan': None}
+        self.statements.append(entry)
+        return entry
+
+    def summary(self):
+        sql_ms = sum(s['ms'] for s in self.statements)
+        return {
+            'page': self.page,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'sql_ms': round(sql_ms, 1),
+            'sql_count': len(self.statements),
+            'sections': [{'name': n, 'ms': round(ms, 1), 'depth': d} for n, ms, d in self.sections],
+            'slow_sql': [
+                {'sql': s['sql'], 'ms': round(s['ms'], 1), 'rows': s['rows'], 'plan': s['plan']}
+                for s in self.statements if s['ms'] >= SLOW_SQL_MS
+            ],
+        }
+
+
+# ─── 계측 연결 ────────────────────────────────────────────────────────────────
+# execute 시간 + fetch 시간을 한 항목에 누적한다 (SQLite 는 fetch 때 실제로 행을 읽는다).
+
+class TracedCursor(sqlite3.Cursor):
+    _entry = None
+    _finished = False
+
+    def execute(self, sql, params=()):
+        profiler = getattr(self.connection, 'profiler', None)
+        self._entry = profiler.record_sql(sql, params) if profiler else None
+        self._finished = False
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._add(t0, 0)
+            if self.description is None:  # 결과 행이 없는 문장
+                self._finish()
+
+    def executemany(self, sql, seq_of_params):
+        profiler = getattr(self.connection, 'profiler', None)
+        self._entry = profiler.record_sql(sql, None) if profiler else None
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            self._add(t0, 0)
+            self._finished = True
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._add(t0, row is not None)
+        self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        self._add(t0, len(rows))
+        if len(rows) < (size if size is not None else self.arraysize):
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._add(t0, len(rows))
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(t0, 0)
+            self._finish()
+            raise
+        self._add(t0, 1)
+        return row
+
+    def _add(self, t0, rows):
+        if self._entry is not None:
+            self._entry['ms'] += (time.perf_counter() - t0) * 1000
+            self._entry['rows'] += rows
+
+    def _finish(self):
+        entry = self._entry
+        if entry is None or self._finished:
+            return
+        self._finished = True
+        if entry['ms'] >= SLOW_SQL_MS and entry['params'] is not None:
+            entry['plan'] = explain(self.connection, entry['sql'], entry['params'])
+
+
+class TracedConnection(sqlite3.Connection):
+    profiler = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def explain(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN 결과를 들여쓴 줄 목록으로 (계측하지 않는 일반 커서 사용)"""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error as e:
+        return [f"(EXPLAIN 실패: {e})"]
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in (tuple(r) for r in rows):
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+def connection_factory():
+    """get_conn() 이 쓸 sqlite3 연결 클래스 — 계측 중일 때만 TracedConnection"""
+    return TracedConnection if _current.get() is not None else sqlite3.Connection
+
+
+def attach(conn):
+    """계측 연결에 현재 실행의 Profiler 를 붙인다"""
+    if isinstance(conn, TracedConnection):
+        conn.profiler = _current.get()
+    return conn
+
+
+# ─── 페이지용 ────────────────────────────────────────────────────────────────
+
+def _enabled():
+    if os.environ.get(PROFILE_ENV) == '1':
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get('debug') == '1'
+    except Exception:
+        return False
+
+
+def start_page(page):
+    """페이지 실행 시작 — 계측이 켜져 있으면 새 Profiler 를 만든다 (이전 실행의 기록은 버림)"""
+    profiler = Profiler(os.path.splitext(os.path.basename(page))[0]) if _enabled() else None
+    _current.set(profiler)
+    return profiler
+
+
+def current_profiler():
+    return _current.get()
+
+
+@contextmanager
+def section(name):
+    """이름 붙인 구간의 시간 측정 (계측이 꺼져 있으면 아무것도 하지 않는다)"""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    slot = len(profiler.sections)
+    profiler.sections.append((name, 0.0, len(profiler._stack)))
+    profiler._stack.append(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler._stack.pop()
+        profiler.sections[slot] = (name, (time.perf_counter() - t0) * 1000, profiler.sections[slot][2])
+
+
+def _log(summary):
+    path = os.environ.get(PROFILE_LOG_ENV)
+    if path and not any(getattr(h, 'baseFilename', None) == os.path.abspath(path) for h in logger.handlers):
+        handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    logger.info(json.dumps({'ts': time.time(), **summary}, ensure_ascii=False))
+
+
+def render_debug_panel():
+    """계측 결과를 구조화 로그로 남기고 디버그 패널에 표시"""
+    profiler = _current.get()
+    if profiler is None:
+        return None
+    summary = profiler.summary()
+    _log(summary)
+
+    import streamlit as st
+    with st.expander(f"⏱ 성능 계측 — 전체 {summary['total_ms']:.0f} ms · "
+                     f"SQL {summary['sql_count']}건 {summary['sql_ms']:.0f} ms", expanded=False):
+        if summary['sections']:
+            st.markdown("**구간**")
+            st.dataframe(
+                [{'구간': '　' * s['depth'] + s['name'], 'ms': s['ms']} for s in summary['sections']],
+                use_container_width=True, hide_index=True,
+            )
+        st.markdown("**SQL** (느린 순)")
+        st.dataframe(
+            [{'ms': round(s['ms'], 2), '행': s['rows'], '구간': s['section'] or '', 'SQL': s['sql'][:200]}
+             for s in sorted(profiler.statements, key=lambda s: -s['ms'])],
+            use_container_width=True, hide_index=True,
+        )
+        for s in summary['slow_sql']:
+            if s['plan']:
+                st.caption(f"{s['ms']:.0f} ms · {s['sql'][:120]}")
+                st.code('\n'.join(s['plan']), language=None)
+    return summary
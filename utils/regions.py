@@ -0,0 +1,163 @@
+"""
+지역 계층 코드 — 자유 입력 지역명('경남' · '경상남도' · '경상남도 ')을 권역 → 시도 → 시군 코드로 맞춘다.
+
+코드는 앞자리가 상위 단위인 숫자 문자열이다.
+    권역 1자리 ('5' 경상) · 시도 3자리 ('548' 경상남도 = 권역 + 행정표준 시도 코드) · 시군 6자리 ('548001')
+그래서 어느 단위로 거르든 items.region_code 의 범위 읽기 한 번이다 (code_range).
+시군 번호는 빌드 때 시도별로 매기므로 folklore.db 밖(기여 저장소)에는 시도 코드까지만 둔다.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from utils.geocode import ADMIN_SUFFIXES, normalize_place_name
+
+REGION_GROUPS = {
+    '1': "수도권", '2': "강원", '3': "충청", '4': "전라", '5': "경상", '6': "제주",
+}
+
+# (코드, 이름, 별칭) — 가운데 두 자리는 행정표준 시도 코드 (특별자치도 개편 전 번호로 고정)
+PROVINCES = [
+    ('111', "서울특별시", ("서울", "서울시")),
+    ('128', "인천광역시", ("인천", "인천시")),
+    ('141', "경기도", ("경기",)),
+    ('242', "강원도", ("강원", "강원특별자치도")),
+    ('330', "대전광역시", ("대전", "대전시")),
+    ('336', "세종특별자치시", ("세종", "세종시")),
+    ('343', "충청북도", ("충북",)),
+    ('344', "충청남도", ("충남",)),
+    ('429', "광주광역시", ("광주", "광주시")),
+    ('445', "전라북도", ("전북", "전북특별자치도")),
+    ('446', "전라남도", ("전남",)),
+    ('526', "부산광역시", ("부산", "부산시")),
+    ('527', "대구광역시", ("대구", "대구시")),
+    ('531', "울산광역시", ("울산", "울산시")),
+    ('547', "경상북도", ("경북",)),
+    ('548', "경상남도", ("경남",)),
+    ('650', "제주특별자치도", ("제주", "제주도")),
+]
+
+UNKNOWN_PROVINCE = '999'
+NO_DISTRICT = '000'     # 시군이 비어 있는 자료의 시군 자리
+
+REGION_DDL = """
+CREATE TABLE IF NOT EXISTS regions (
+    code TEXT PRIMARY KEY,
+    level INTEGER NOT NULL,     -- 0 권역 · 1 시도 · 2 시군
+    name TEXT NOT NULL,
+    parent TEXT NOT NULL,       -- 권역은 ''
+    norm_name TEXT,
+    n_items INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_regions_parent ON regions(parent, code, name, n_items);
+"""
+
+
+def _key(name):
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', name or ''))
+
+
+_PROVINCE_KEYS = {_key(alias): code for code, name, aliases in PROVINCES for alias in (name,) + aliases}
+PROVINCE_NAMES = {code: name for code, name, _ in PROVINCES}
+
+
+def code_range(code):
+    """code 와 그 하위 코드 전체의 [lo, hi) 범위 — 숫자 뒤 문자 ':' 로 끝을 막는다"""
+    return code, code + ':'
+
+
+def province_code(region):
+    """지역명 → 시도 코드. 알 수 없으면 UNKNOWN_PROVINCE ('경상남도 창녕군' 처럼 시군이 붙어도 앞 어절로 찾는다)"""
+    region = unicodedata.normalize('NFKC', region or '').strip()
+    for candidate in (region, region.split(' ')[0]):
+        code = _PROVINCE_KEYS.get(_key(candidate))
+        if code:
+            return code
+    return UNKNOWN_PROVINCE
+
+
+def region_name(code):
+    """코드 → 표시 이름 (권역 · 시도)"""
+    if code == UNKNOWN_PROVINCE:
+        return "미상"
+    return PROVINCE_NAMES.get(code) or REGION_GROUPS.get(code) or code
+
+
+def district_key(district):
+    """시군 이름 비교 키 — '창녕군' · '창녕 군' · '창녕' 이 같은 키"""
+    key = normalize_place_name(district)
+    for suffix in ADMIN_SUFFIXES:
+        if key.endswith(suffix) and len(key) - len(suffix) >= 2:
+            return key[:-len(suffix)]
+    return key
+
+
+def _fixed_rows():
+    rows = [(code, 0, name, '', None) for code, name in REGION_GROUPS.items()]
+    rows += [(code, 1, name, code[0], None) for code, name, _ in PROVINCES]
+    rows.append(('9', 0, "미상", '', None))
+    rows.append((UNKNOWN_PROVINCE, 1, "미상", '9', None))
+    return rows
+
+
+def build_region_codes(conn, item_ids=None, chunk=500):
+    """regions 계층 표와 items.region_code 채우기.
+
+    증분 갱신(item_ids, 문자열 id)에서는 그 자료만 다시 매기고, 처음 보는 시군은 시도별 다음 번호를 받는다.
+    """
+    from utils.db import execute_ddl   # utils.db 가 이 모듈을 불러오므로 여기서
+    execute_ddl(conn, REGION_DDL)
+    if item_ids is None:
+        conn.execute("DELETE FROM regions")
+        rows = conn.execute("SELECT item_no, region, district FROM items").fetchall()
+    else:
+        item_ids, rows = list(item_ids), []
+        for i in range(0, len(item_ids), chunk):
+            part = item_ids[i:i + chunk]
+            rows += conn.execute(
+                f"SELECT item_no, region, district FROM items WHERE id IN ({','.join('?' * len(part))})", part
+            ).fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO regions (code, level, name, parent, norm_name) VALUES (?,?,?,?,?)", _fixed_rows()
+    )
+
+    districts = {(parent, norm): code for code, parent, norm in conn.execute(
+        "SELECT code, parent, norm_name FROM regions WHERE level = 2"
+    )}
+    next_no = Counter()
+    for (parent, _), code in districts.items():
+        next_no[parent] = max(next_no[parent], int(code[3:]))
+
+    # 새 시군은 시도별 이름순으로 번호를 매기고, 표시 이름은 가장 많이 쓰인 표기로 한다
+    spellings = Counter()
+    assigned = []
+    for item_no, region, district in rows:
+        province = province_code(region)
+        norm = district_key(district)
+        assigned.append((item_no, province, norm))
+        if norm and (province, norm) not in districts:
+            spellings[(province, norm, ' '.join((district or '').split()))] += 1
+    names = {}
+    for (province, norm, spelling), n in sorted(spellings.items(), key=lambda kv: -kv[1]):
+        names.setdefault((province, norm), spelling)
+    new_rows = []
+    for province, norm in sorted(names):
+        next_no[province] += 1
+        code = f"{province}{next_no[province]:03d}"
+        districts[(province, norm)] = code
+        new_rows.append((code, 2, names[(province, norm)], province, norm))
+    conn.executemany(
+        "INSERT INTO regions (code, level, name, parent, norm_name) VALUES (?,?,?,?,?)", new_rows
+    )
+
+    conn.executemany(
+        "UPDATE items SET region_code = ? WHERE item_no = ?",
+        [(districts[(province, norm)] if norm else province + NO_DISTRICT, item_no)
+         for item_no, province, norm in assigned]
+    )
+    conn.execute("""
+        UPDATE regions SET n_items = (
+            SELECT COUNT(*) FROM items WHERE region_code >= regions.code AND region_code < regions.code || ':'
+        )
+    """)
+    return len(rows)
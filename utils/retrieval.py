@@ -0,0 +1,169 @@
+"""
+서사단락 · 제목 · 모티프명 검색 인덱스 (SQLite FTS5 + BM25)
+
+한국어는 조사가 붙어 공백 단위 토큰이 맞지 않으므로(금강산에서 ≠ 금강산)
+한글 구간은 음절 unigram + bigram 으로 쪼개 FTS5 에 넣고, 질의도 같은 방식으로 쪼갠다.
+"""
+import re
+import unicodedata
+
+from utils.db import execute_ddl
+from utils.texts import decompress_text, load_zdicts
+
+PASSAGE_DDL = """
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_no INTEGER REFERENCES items(item_no),
+    unit_order INTEGER,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_passages_item ON passages(item_no);
+CREATE VIRTUAL TABLE IF NOT EXISTS passage_fts USING fts5(title, motifs, body);
+"""
+
+# 본문만 있고 서사단락이 없는 자료는 정규화 본문(utils/texts) 앞부분을 한 구절로 색인
+CONTENT_PASSAGE_CHARS = 400
+
+# bm25 컬럼 가중치 (title, motifs, body)
+BM25_WEIGHTS = (2.0, 1.5, 1.0)
+
+_RUN_RE = re.compile(r'[가-힣]+|[0-9a-z]+')
+
+
+def tokenize(text, for_query=False):
+    """한글 구간은 음절 unigram+bigram, 영숫자는 단어 단위 토큰.
+
+    질의에서는 두 글자 이상 한글 구간에 bigram 만 써서 잡음을 줄인다.
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    tokens = []
+    for run in _RUN_RE.findall(text):
+        if not ('가' <= run[0] <= '힣'):
+            tokens.append(run)
+            continue
+        bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+        if for_query:
+            tokens.extend(bigrams or [run])
+        else:
+            tokens.extend(run)
+            tokens.extend(bigrams)
+    return tokens
+
+
+def _motif_names_by_item(conn, item_nos):
+    placeholders = ','.join('?' * len(item_nos))
+    names = {}
+    for row in conn.execute(f"""
+        SELECT im.item_no, m.motif_name FROM item_motifs im
+        JOIN motifs m ON im.motif_id = m.id
+        WHERE im.item_no IN ({placeholders})
+    """, item_nos):
+        names.setdefault(row[0], []).append(row[1] or '')
+    return names
+
+
+def _index_chunk(conn, item_nos):
+    placeholders = ','.join('?' * len(item_nos))
+    titles = dict(conn.execute(
+        f"SELECT item_no, title FROM items WHERE item_no IN ({placeholders})", item_nos
+    ).fetchall())
+    motifs = _motif_names_by_item(conn, item_nos)
+
+    units = {}
+    for item_no, order, unit in conn.execute(f"""
+        SELECT item_no, unit_order, unit_text FROM narrative_units
+        WHERE item_no IN ({placeholders}) ORDER BY item_no, unit_order
+    """, item_nos):
+        if unit:
+            units.setdefault(item_no, []).append((order, unit))
+
+    missing = [i for i in item_nos if i not in units]
+    if missing:
+        ph = ','.join('?' * len(missing))
+        zdicts = load_zdicts(conn)
+        for item_no, dict_id, blob in conn.execute(
+            f"SELECT item_no, dict_id, norm FROM item_texts WHERE item_no IN ({ph}) AND norm IS NOT NULL",
+            missing
+        ):
+            head = decompress_text(blob, zdicts.get(dict_id, b''), max_chars=CONTENT_PASSAGE_CHARS)
+            if head:
+                units[item_no] = [(-1, head)]
+
+    cur = conn.cursor()
+    for item_no, rows in units.items():
+        title_tok = ' '.join(tokenize(titles.get(item_no)))
+        motif_tok = ' '.join(tokenize(' '.join(motifs.get(item_no, []))))
+        for order, text in rows:
+            cur.execute(
+                "INSERT INTO passages (item_no, unit_order, text) VALUES (?,?,?)",
+                (item_no, order, text)
+            )
+            cur.execute(
+                "INSERT INTO passage_fts (rowid, title, motifs, body) VALUES (?,?,?,?)",
+                (cur.lastrowid, title_tok, motif_tok, ' '.join(tokenize(text)))
+            )
+
+
+def build_passage_index(conn, item_ids=None, chunk=500):
+    """passages / passage_fts 구축. item_ids(문자열 id) 가 주어지면 해당 자료만 다시 색인."""
+    execute_ddl(conn, PASSAGE_DDL)
+    if item_ids is None:
+        conn.execute("DELETE FROM passage_fts")
+        conn.execute("DELETE FROM passages")
+        item_nos = [r[0] for r in conn.execute("SELECT item_no FROM items ORDER BY item_no")]
+    else:
+        item_ids = list(item_ids)
+        item_nos = []
+        for i in range(0, len(item_ids), chunk):
+            part = item_ids[i:i + chunk]
+            item_nos += [r[0] for r in conn.execute(
+                f"SELECT item_no FROM items WHERE id IN ({','.join('?' * len(part))})", part
+            )]
+        for i in range(0, len(item_nos), chunk):
+            part = item_nos[i:i + chunk]
+            ph = ','.join('?' * len(part))
+            conn.execute(
+                f"DELETE FROM passage_fts WHERE rowid IN (SELECT id FROM passages WHERE item_no IN ({ph}))",
+                part
+            )
+            conn.execute(f"DELETE FROM passages WHERE item_no IN ({ph})", part)
+    for i in range(0, len(item_nos), chunk):
+        _index_chunk(conn, item_nos[i:i + chunk])
+    return len(item_nos)
+
+
+def search_passages(conn, query, limit=8, per_item=2):
+    """질의와 BM25 점수가 높은 구절 반환 (한 자료당 최대 per_item 개)"""
+    tokens = list(dict.fromkeys(tokenize(query, for_query=True)))
+    if not tokens:
+        return []
+    match = ' OR '.join(f'"{t}"' for t in tokens)
+    rows = conn.execute(f"""
+        SELECT i.id AS item_id, p.unit_order, p.text, i.title, i.region, i.district,
+               bm25(passage_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score
+        FROM passage_fts
+        JOIN passages p ON p.id = passage_fts.rowid
+        JOIN items i ON i.item_no = p.item_no
+        WHERE passage_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+    """, (match, limit * per_item * 4)).fetchall()
+
+    picked, seen = [], {}
+    for r in rows:
+        if seen.get(r['item_id'], 0) >= per_item:
+            continue
+        seen[r['item_id']] = seen.get(r['item_id'], 0) + 1
+        picked.append(r)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def format_passages(rows):
+    """LLM 프롬프트용 근거 구절 목록 문자열"""
+    lines = []
+    for n, r in enumerate(rows, 1):
+        where = " ".join(filter(None, [r['region'], r['district']]))
+        lines.append(f"[{n}] 「{r['title']}」 ({r['item_id']}, {where})\n{r['text']}")
+    return "\n\n".join(lines)
@@ -0,0 +1,65 @@
+"""
+무작위 추천 표본 풀 — 본문 전사가 있는 자료를 조건(전체 · 분류 · 지역 · 모티프)별로 0, 1, 2 … 번 칸에 빽빽하게 채워 둔다.
+
+무작위로 고르는 일은 풀 크기 조회 한 번과 (pool_id, slot) 기본키 조회 한 번이라
+ORDER BY RANDOM() 처럼 자료 전체를 읽고 정렬하지 않는다. 조건별 풀을 하나씩 고르면 층화 추천이 된다.
+"""
+from utils.db import execute_ddl
+from utils.regions import UNKNOWN_PROVINCE
+
+SAMPLER_DDL = """
+CREATE TABLE IF NOT EXISTS sample_pools (
+    pool_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    UNIQUE (kind, value)
+);
+CREATE INDEX IF NOT EXISTS idx_sample_pools_size ON sample_pools(kind, size DESC, value);
+
+CREATE TABLE IF NOT EXISTS sample_pool (
+    pool_id INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    item_no INTEGER NOT NULL,
+    PRIMARY KEY (pool_id, slot)
+) WITHOUT ROWID;
+"""
+
+# 풀 종류 → 본문이 있는 자료의 (value, item_no)
+POOL_SOURCES = {
+    'all': "SELECT '', item_no FROM items WHERE content_len > 0",
+    'category': """
+        SELECT TRIM(category), item_no FROM items
+        WHERE content_len > 0 AND TRIM(COALESCE(category, '')) <> ''
+    """,
+    # 지역은 시도 코드 — 표시 이름은 regions 에서 (get_sample_pools)
+    'region': f"""
+        SELECT SUBSTR(region_code, 1, 3), item_no FROM items
+        WHERE content_len > 0 AND region_code IS NOT NULL AND region_code NOT LIKE '{UNKNOWN_PROVINCE}%'
+    """,
+    'motif': """
+        SELECT m.motif_code, im.item_no
+        FROM item_motifs im JOIN motifs m ON m.id = im.motif_id JOIN items i ON i.item_no = im.item_no
+        WHERE i.content_len > 0
+    """,
+}
+
+
+def build_sample_pools(conn):
+    """sample_pools / sample_pool 재구성 — 칸 번호가 0 부터 빽빽해야 하므로 풀마다 다시 채운다"""
+    execute_ddl(conn, SAMPLER_DDL)
+    conn.execute("DELETE FROM sample_pool")
+    conn.execute("DELETE FROM sample_pools")
+    for kind, source in POOL_SOURCES.items():
+        conn.execute(f"""
+            WITH e(value, item_no) AS ({source})
+            INSERT INTO sample_pools (kind, value, size)
+            SELECT ?, value, COUNT(*) FROM e GROUP BY value
+        """, (kind,))
+        conn.execute(f"""
+            WITH e(value, item_no) AS ({source})
+            INSERT INTO sample_pool (pool_id, slot, item_no)
+            SELECT p.pool_id, ROW_NUMBER() OVER (PARTITION BY p.pool_id ORDER BY e.item_no) - 1, e.item_no
+            FROM e JOIN sample_pools p ON p.kind = ? AND p.value = e.value
+        """, (kind,))
+    return conn.execute("SELECT COUNT(*) FROM sample_pools").fetchone()[0]
@@ -0,0 +1,80 @@
+"""
+반경 검색용 공간 색인 — 채록지(items)와 서사 지명(canonical_places) 좌표를 R*Tree 에 넣어 둔다.
+
+반경 질의는 R*Tree 로 경계 상자 안의 후보만 고른 뒤 대권 거리로 걸러 가까운 순으로 정렬한다.
+R*Tree 좌표는 32비트 실수라 상자는 바깥쪽으로 반올림되므로 후보가 빠지지는 않는다.
+"""
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+SPATIAL_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS item_rtree USING rtree(item_no, min_lat, max_lat, min_lng, max_lng);
+CREATE VIRTUAL TABLE IF NOT EXISTS place_rtree USING rtree(canonical_id, min_lat, max_lat, min_lng, max_lng);
+"""
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표 사이 대권 거리 (km)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlam = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def bounding_box(lat, lng, radius_km):
+    """반경 radius_km 원을 감싸는 (min_lat, max_lat, min_lng, max_lng)"""
+    dlat = radius_km / KM_PER_DEG_LAT
+    # 극 가까이에서 경도 폭이 무한히 커지지 않도록 cos 를 아래에서 막는다
+    dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def within_radius(rows, lat, lng, radius_km, limit):
+    """후보 행 → 반경 안의 [(거리 km, 행)] 가까운 순 limit 개 (None 이면 전부)"""
+    hits = []
+    for r in rows:
+        km = haversine_km(lat, lng, r['lat'], r['lng'])
+        if km <= radius_km:
+            hits.append((km, r))
+    if limit is None:
+        return sorted(hits, key=lambda h: h[0])
+    return heapq.nsmallest(limit, hits, key=lambda h: h[0])
+
+
+def build_spatial_index(conn, item_ids=None, chunk=500):
+    """item_rtree / place_rtree 채우기.
+
+    증분 갱신(item_ids, 문자열 id)에서는 그 자료의 채록지와 그 자료에 나오는 대표 지명만 다시 넣는다
+    (지명 정규화 단계가 증분에서는 대표 지명 id 를 바꾸지 않는다).
+    """
+    from utils.db import execute_ddl   # utils.db 가 이 모듈을 불러오므로 여기서
+    execute_ddl(conn, SPATIAL_DDL)
+    point = "SELECT item_no, lat, lat, lng, lng FROM items WHERE lat IS NOT NULL AND lng IS NOT NULL"
+    place = "SELECT id, lat, lat, lng, lng FROM canonical_places WHERE lat IS NOT NULL AND lng IS NOT NULL"
+    if item_ids is None:
+        conn.execute("DELETE FROM item_rtree")
+        conn.execute(f"INSERT INTO item_rtree {point}")
+        conn.execute("DELETE FROM place_rtree")
+        conn.execute(f"INSERT INTO place_rtree {place}")
+        return conn.execute("SELECT COUNT(*) FROM item_rtree").fetchone()[0]
+
+    item_ids = list(item_ids)
+    for i in range(0, len(item_ids), chunk):
+        part = item_ids[i:i + chunk]
+        marks = ','.join('?' * len(part))
+        conn.execute(
+            f"DELETE FROM item_rtree WHERE item_no IN (SELECT item_no FROM items WHERE id IN ({marks}))", part
+        )
+        conn.execute(f"INSERT INTO item_rtree {point} AND id IN ({marks})", part)
+        canonical = f"""
+            SELECT DISTINCT p.canonical_id
+            FROM items i JOIN item_places ip ON ip.item_no = i.item_no JOIN places p ON p.id = ip.place_id
+            WHERE i.id IN ({marks})
+        """
+        conn.execute(f"DELETE FROM place_rtree WHERE canonical_id IN ({canonical})", part)
+        conn.execute(f"INSERT INTO place_rtree {place} AND id IN ({canonical})", part)
+    return len(item_ids)
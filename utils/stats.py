@@ -0,0 +1,106 @@
+"""
+집계 통계 테이블 (stats_*) — 빌드 때 한 번 계산해 두고 대시보드·지도 요약은 이 테이블만 읽는다.
+
+집계는 모두 GROUP BY 한 번씩이라 승격·보강 후에도 전체를 다시 계산한다.
+"""
+from utils.db import execute_ddl
+
+STATS_DDL = """
+CREATE TABLE IF NOT EXISTS stats_region (
+    region TEXT, district TEXT, category TEXT,
+    n_items INTEGER, n_with_coords INTEGER, n_with_content INTEGER, n_enriched INTEGER,
+    PRIMARY KEY (region, district, category)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_category (
+    category TEXT PRIMARY KEY,
+    n_items INTEGER, n_with_coords INTEGER, n_with_content INTEGER, n_enriched INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_motif (
+    motif_id INTEGER PRIMARY KEY,
+    motif_code TEXT, motif_name TEXT, n_items INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_stats_motif_n ON stats_motif(n_items DESC, motif_code);
+
+CREATE TABLE IF NOT EXISTS stats_atu (
+    atu_type TEXT PRIMARY KEY, n_items INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_era (
+    era TEXT PRIMARY KEY, n_items INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_geocode (
+    geocode_status TEXT PRIMARY KEY, n_places INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_enrichment (
+    provenance TEXT, status TEXT, n_items INTEGER,
+    PRIMARY KEY (provenance, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_totals (
+    key TEXT PRIMARY KEY, value INTEGER
+) WITHOUT ROWID;
+"""
+
+STATS_QUERIES = {
+    'stats_region': """
+        INSERT INTO stats_region
+        SELECT COALESCE(TRIM(i.region), ''), COALESCE(TRIM(i.district), ''), COALESCE(i.category, ''),
+               COUNT(*),
+               SUM(i.lat IS NOT NULL AND i.lng IS NOT NULL),
+               SUM(i.content_len > 0),
+               SUM(EXISTS (SELECT 1 FROM item_motifs im WHERE im.item_no = i.item_no))
+        FROM items i
+        GROUP BY 1, 2, 3
+    """,
+    'stats_category': """
+        INSERT INTO stats_category
+        SELECT category, SUM(n_items), SUM(n_with_coords), SUM(n_with_content), SUM(n_enriched)
+        FROM stats_region GROUP BY category
+    """,
+    'stats_motif': """
+        INSERT INTO stats_motif
+        SELECT m.id, m.motif_code, m.motif_name, COUNT(*)
+        FROM motifs m JOIN item_motifs im ON im.motif_id = m.id
+        GROUP BY m.id
+    """,
+    'stats_atu': """
+        INSERT INTO stats_atu
+        SELECT atu_type, COUNT(*) FROM atu_types GROUP BY atu_type
+    """,
+    'stats_era': """
+        INSERT INTO stats_era
+        SELECT COALESCE(NULLIF(TRIM(era), ''), '미상'), COUNT(*) FROM item_meta GROUP BY 1
+    """,
+    'stats_geocode': """
+        INSERT INTO stats_geocode
+        SELECT COALESCE(geocode_status, ''), COUNT(*) FROM places GROUP BY 1
+    """,
+    'stats_enrichment': """
+        INSERT INTO stats_enrichment
+        SELECT provenance, status, COUNT(*) FROM item_enrichment GROUP BY provenance, status
+    """,
+    'stats_totals': """
+        INSERT INTO stats_totals
+        SELECT 'items', COUNT(*) FROM items
+        UNION ALL SELECT 'items_with_coords', COALESCE(SUM(n_with_coords), 0) FROM stats_category
+        UNION ALL SELECT 'items_with_content', COALESCE(SUM(n_with_content), 0) FROM stats_category
+        UNION ALL SELECT 'items_enriched', COALESCE(SUM(n_enriched), 0) FROM stats_category
+        UNION ALL SELECT 'motifs', COUNT(*) FROM stats_motif
+        UNION ALL SELECT 'atu_types', COUNT(*) FROM stats_atu
+        UNION ALL SELECT 'places', COUNT(*) FROM places
+        UNION ALL SELECT 'places_with_coords', COUNT(*) FROM places WHERE lat IS NOT NULL AND lng IS NOT NULL
+    """,
+}
+
+
+def build_stats(conn):
+    """stats_* 테이블 재계산"""
+    execute_ddl(conn, STATS_DDL)
+    for table, sql in STATS_QUERIES.items():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(sql)
+    return len(STATS_QUERIES)
@@ -0,0 +1,182 @@
+"""
+전사본(본문 content · 구연 상황 context) 압축 저장
+
+긴 전사본은 items 메타데이터와 분리해 item_texts 에 zlib(raw deflate)로 압축해 둔다.
+짧은 전사본도 잘 줄도록 코퍼스에서 자주 나오는 어절·구를 모은 공유 사전(zdict)을 text_dict 에 두고
+압축·해제 모두 같은 사전을 쓴다. 해제는 화면에 보이거나 LLM 에 보낼 때만 한다.
+
+LLM · 검색용으로는 조사자 주석·표시 기호·군말을 걷어 낸 정규화 본문(norm)과
+그 글자 수 · 토큰 추정치를 빌드 때 같이 저장해 두어, 요청마다 다시 계산하지 않고 예산을 정한다.
+"""
+import math
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+TEXT_DDL = """
+CREATE TABLE IF NOT EXISTS text_dict (
+    id INTEGER PRIMARY KEY,
+    zdict BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS item_texts (
+    item_no INTEGER PRIMARY KEY REFERENCES items(item_no),
+    dict_id INTEGER REFERENCES text_dict(id),
+    context BLOB,
+    content BLOB,
+    norm BLOB,
+    norm_len INTEGER,
+    token_estimate INTEGER
+);
+"""
+
+ZDICT_BYTES = 32 * 1024   # deflate 창 크기 — 이보다 긴 사전은 앞부분이 쓰이지 않는다
+ZDICT_SAMPLE_DOCS = 1000
+ZDICT_MAX_NGRAM = 3
+COMPRESS_LEVEL = 3        # 사전이 있으면 6 이상은 두 배 가까이 느리고 15% 남짓 더 줄 뿐
+_WBITS = -15              # 헤더·체크섬 없는 raw deflate (짧은 글에서 6바이트씩 아낀다)
+
+
+def train_zdict(texts, size=ZDICT_BYTES, sample_docs=ZDICT_SAMPLE_DOCS):
+    """자주 나오는 어절 1~3-gram 을 (빈도-1)×바이트 길이 순으로 골라 사전을 만든다.
+
+    deflate 는 가까운 위치를 더 짧게 부호화하므로 점수가 높은 구를 사전 끝쪽에 둔다.
+    """
+    texts = [t for t in texts if t]
+    if not texts:
+        return b''
+    step = max(1, len(texts) // sample_docs)
+    counts = Counter()
+    for text in texts[::step]:
+        words = text.split()
+        for n in range(1, ZDICT_MAX_NGRAM + 1):
+            counts.update(' '.join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+    scored = sorted(
+        ((freq - 1) * len(phrase.encode('utf-8')), phrase)
+        for phrase, freq in counts.items() if freq > 1
+    )
+    picked, total = [], 0
+    for _, phrase in reversed(scored):
+        encoded = phrase.encode('utf-8') + b' '
+        if total + len(encoded) > size:
+            continue
+        picked.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(picked))
+
+
+@lru_cache(maxsize=4)
+def _primed_compressor(zdict):
+    # 사전을 읽어 들이는 데 압축 한 번보다 오래 걸리므로, 사전을 넣은 압축기를 하나 두고 복사해 쓴다
+    if zdict:
+        return zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _WBITS, zdict=zdict)
+    return zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _WBITS)
+
+
+def compress_text(text, zdict=b''):
+    """문자열 → 압축 BLOB (빈 값은 None)"""
+    if not text:
+        return None
+    comp = _primed_compressor(zdict).copy()
+    return comp.compress(text.encode('utf-8')) + comp.flush()
+
+
+def decompress_text(blob, zdict=b'', max_chars=None):
+    """압축 BLOB → 문자열 (None 은 빈 문자열). max_chars 를 주면 앞부분만 푼다."""
+    if blob is None:
+        return ''
+    dec = zlib.decompressobj(_WBITS, zdict=zdict) if zdict else zlib.decompressobj(_WBITS)
+    if max_chars is not None:
+        # UTF-8 한 글자는 최대 4바이트 — 잘린 마지막 글자는 버린다
+        head = dec.decompress(blob, max_chars * 4).decode('utf-8', errors='ignore')
+        return head[:max_chars]
+    return (dec.decompress(blob) + dec.flush()).decode('utf-8')
+
+
+def store_zdict(conn, zdict):
+    """새 사전을 등록하고 dict_id 반환"""
+    return conn.execute("INSERT INTO text_dict (zdict) VALUES (?)", (zdict,)).lastrowid
+
+
+def current_zdict(conn):
+    """새로 압축할 때 쓸 (dict_id, zdict) — 가장 최근 사전. 없으면 (None, b'')"""
+    row = conn.execute("SELECT id, zdict FROM text_dict ORDER BY id DESC LIMIT 1").fetchone()
+    return (row[0], bytes(row[1])) if row else (None, b'')
+
+
+def load_zdicts(conn):
+    """일괄 해제용 {dict_id: zdict}"""
+    return {r[0]: bytes(r[1]) for r in conn.execute("SELECT id, zdict FROM text_dict")}
+
+
+# ─── 정규화 본문 · 토큰 추정 ─────────────────────────────────────────────────
+
+# 조사자·청중 주석과 표시 기호: [웃음] (청중: …) <br> {…}
+_MARKUP_RE = re.compile(
+    r'<[^<>]{0,40}>|\[[^\[\]]{0,40}\]|\{[^{}]{0,40}\}'
+    r'|\((?:조사자|청중|제보자|구연자|웃음|박수|침묵|중략|청취 ?불능|\?)[^()]{0,40}\)'
+)
+# 뜻 없이 끼어드는 군말 (어절 단위로만 지운다)
+FILLERS = {'음', '어', '으', '에', '저', '인자', '인제', '머'}
+# 담화 표지의 방언 표기 → 표준 표기. 어휘·지명 방언은 구비문학 자료라 그대로 둔다
+DIALECT_MARKERS = {
+    '그런께': '그러니까', '그란께': '그러니까', '그랑께': '그러니까', '그러니께': '그러니까',
+    '그래가지고': '그래서', '그래갖고': '그래서',
+    '카대': '하더라', '카더라': '하더라', '카이': '하니',
+}
+# 공백을 한 칸으로 정리한 뒤 ' 어절' 단위로 찾는다 — 어절마다 콜백을 부르지 않고, 일치한 곳에서만 바꾼다
+_FILLER_RE = re.compile(' (?:' + '|'.join(sorted(FILLERS, key=len, reverse=True)) + ')[,~]*(?=[ .!?…])')
+_DIALECT_RE = re.compile(' (' + '|'.join(sorted(DIALECT_MARKERS, key=len, reverse=True)) + ')(?=[ .,!?…~])')
+_SPACED_PUNCT_RE = re.compile(r' ([.,!?…])')
+_REPEATED_PUNCT_RE = re.compile(r'([.,!?])\1+')
+
+HANGUL_TOKENS_PER_CHAR = 1.0     # 한글은 음절당 대략 한 토큰 (넉넉하게)
+OTHER_CHARS_PER_TOKEN = 3.5      # 영문·숫자·기호
+
+
+def normalize_transcript(text):
+    """LLM · 검색용 정규화 본문 — NFKC, 주석·표시 기호 제거, 군말 제거, 담화 표지 방언 표준화, 공백 정리"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = ' ' + ' '.join(_MARKUP_RE.sub(' ', text).split()) + ' '
+    text = _FILLER_RE.sub('', text)      # 뒤의 쉼표까지 지우고 문장 끝 부호는 남긴다
+    text = _DIALECT_RE.sub(lambda m: ' ' + DIALECT_MARKERS[m.group(1)], text)
+    text = _SPACED_PUNCT_RE.sub(r'\1', text)
+    return _REPEATED_PUNCT_RE.sub(r'\1', text).strip()
+
+
+def estimate_tokens(text):
+    """모델 토큰 수 추정 (토크나이저 없이 넉넉하게).
+
+    한글 음절은 UTF-8 로 3바이트라 (바이트 수 - 글자 수) / 2 가 대략의 음절 수다 — 글자를 하나씩 세지 않는다.
+    """
+    if not text:
+        return 0
+    hangul = (len(text.encode('utf-8')) - len(text)) // 2
+    other = max(0, len(text) - hangul - text.count(' '))
+    return math.ceil(hangul * HANGUL_TOKENS_PER_CHAR + other / OTHER_CHARS_PER_TOKEN)
+
+
+def build_normalized_texts(conn, item_ids=None, chunk=1000):
+    """item_texts 의 norm · norm_len · token_estimate 채우기.
+
+    증분 갱신(item_ids)에서는 아직 정규화되지 않은 행만 — 전사본을 다시 넣으면(INSERT OR REPLACE) 비워진다.
+    """
+    zdicts = load_zdicts(conn)
+    sql = "SELECT item_no, dict_id, content FROM item_texts"
+    if item_ids is not None:
+        sql += " WHERE norm_len IS NULL"
+    rows = conn.execute(sql).fetchall()
+    for i in range(0, len(rows), chunk):
+        updates = []
+        for item_no, dict_id, blob in rows[i:i + chunk]:
+            # 정규화 본문도 원문과 같은 사전(dict_id)으로 압축해 한 번에 풀 수 있게 한다
+            zdict = zdicts.get(dict_id, b'')
+            norm = normalize_transcript(decompress_text(blob, zdict))
+            updates.append((compress_text(norm, zdict), len(norm), estimate_tokens(norm), item_no))
+        conn.executemany(
+            "UPDATE item_texts SET norm = ?, norm_len = ?, token_estimate = ? WHERE item_no = ?", updates
+        )
+    return len(rows)